@@ -2,15 +2,29 @@
 Admin Routes for Dataset Management and Model Training
 Provides endpoints for dataset upload, generation, and model retraining
 """
-from fastapi import APIRouter, UploadFile, File, BackgroundTasks, HTTPException
+from fastapi import APIRouter, UploadFile, File, BackgroundTasks, HTTPException, Query
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from collections import deque
 from pathlib import Path
 import subprocess
 import json
 import os
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import shutil
+import time
+
+from app.config import DATA_PATH, DATASET_FILE
+from app.dataset_format import COLUMNAR_SUFFIX, columnar_info, convert_dataset, is_columnar
+from app.ml_models import model_manager
+from app.inference import inference_executor
+from app.batching import micro_batcher
+from app.metrics import JOB_DURATION
+from app.startup import startup_report
+from app.dataset import dataset_monitor
+from app.insights import insight_store
+from app.history import history_store
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -29,6 +43,16 @@ dataset_status = {
   "is_generating": False,
   "progress": 0,
   "message": "",
+  "shards": [],
+  "started_at": None,
+  "completed_at": None,
+  "error": None
+}
+
+reload_status = {
+  "is_reloading": False,
+  "message": "",
+  "model_version": None,
   "started_at": None,
   "completed_at": None,
   "error": None
@@ -68,15 +92,19 @@ def get_model_info() -> Dict[str, Any]:
       }
   
   # Check dataset
-  dataset_path = data_dir / "agricultural_data.csv"
+  dataset_path = data_dir / DATASET_FILE
   if dataset_path.exists():
     stat = dataset_path.stat()
     info["dataset"] = {
       "exists": True,
+      "format": "columnar" if is_columnar(dataset_path) else "csv",
       "size": f"{stat.st_size / 1024 / 1024:.2f} MB",
       "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
       "path": str(dataset_path)
     }
+    if is_columnar(dataset_path):
+      # Row count and column types come from the array headers, no data is read
+      info["dataset"].update(columnar_info(dataset_path))
   else:
     info["dataset"] = {"exists": False}
   
@@ -105,37 +133,145 @@ async def get_dataset_generation_status():
   return JSONResponse(content=dataset_status)
 
 
-def run_dataset_generation():
-  """Background task to generate dataset"""
+@router.get("/cache-status")
+async def get_cache_status():
+  """Get prediction cache statistics"""
+  return JSONResponse(content=model_manager.get_cache_stats())
+
+
+@router.get("/model-memory")
+async def get_model_memory():
+  """Get per-model load time and memory usage"""
+  return JSONResponse(content=model_manager.get_memory_report())
+
+
+@router.get("/startup-report")
+async def get_startup_report():
+  """Get the startup time of this server process broken down by phase"""
+  report = startup_report.to_dict()
+  if model_manager.is_initialized:
+    report["model_load_ms"] = {
+      key: stats["load_time_ms"] for key, stats in model_manager.model_stats.items()
+    }
+    report["model_load_mode"] = model_manager.load_mode
+  return JSONResponse(content=report)
+
+
+@router.get("/insights-status")
+async def get_insights_status():
+  """Get the dataset version and size of the precomputed insight statistics"""
+  return JSONResponse(content={"dataset_version": dataset_monitor.version, **insight_store.status()})
+
+
+@router.get("/history-status")
+async def get_history_status():
+  """Get the size and build time of the in-memory price history"""
+  return JSONResponse(content={"dataset_version": dataset_monitor.version, **history_store.status()})
+
+
+@router.get("/inference-status")
+async def get_inference_status():
+  """Get inference pool queue depth and counters"""
+  return JSONResponse(content=inference_executor.stats())
+
+
+@router.get("/batching-status")
+async def get_batching_status():
+  """Get micro-batching batch-size and wait-time histograms"""
+  if micro_batcher is None:
+    return JSONResponse(content={"enabled": False})
+  return JSONResponse(content=micro_batcher.stats())
+
+
+def _track_generation_progress(line: str):
+  """Update dataset_status from a "PROGRESS {json}" line of the generator"""
+  try:
+    event = json.loads(line[len("PROGRESS "):])
+  except ValueError:
+    return
+  
+  if event.get("stage") == "plan":
+    # The script clamps the shard count to the sample count
+    dataset_status["shards"] = [
+      {"shard": index, "rows": 0, "total": None} for index in range(event["shards"])
+    ]
+    return
+  if event.get("stage") == "join":
+    dataset_status["progress"] = 92
+    dataset_status["message"] = "Joining shards into the dataset file..."
+    return
+  
+  shards = dataset_status["shards"]
+  shards[event["shard"]].update(rows=event["rows"], total=event["total"])
+  done = sum(shard["rows"] for shard in shards)
+  finished = sum(1 for shard in shards if shard["rows"] == shard["total"])
+  # Shards that have not reported yet count as 0% done
+  fraction = sum(shard["rows"] / shard["total"] for shard in shards if shard["total"]) / len(shards)
+  dataset_status["progress"] = 10 + int(80 * fraction)
+  dataset_status["message"] = f"Generated {done:,} rows ({finished}/{len(shards)} shards done)"
+
+
+def run_dataset_generation(
+  samples: Optional[int] = None,
+  shards: int = 0,
+  seed: Optional[int] = None,
+  workers: int = 0
+):
+  """Background task to generate dataset (sharded across processes when shards > 0)"""
   global dataset_status
+  start = time.perf_counter()
+  outcome = "failure"
   
   try:
     dataset_status["is_generating"] = True
     dataset_status["progress"] = 0
     dataset_status["message"] = "Starting dataset generation..."
+    dataset_status["shards"] = [{"shard": index, "rows": 0, "total": None} for index in range(shards)]
     dataset_status["started_at"] = datetime.now().isoformat()
     dataset_status["completed_at"] = None
     dataset_status["error"] = None
     
     # Run dataset generation script
     script_path = Path(__file__).parent.parent / "scripts" / "generate_dataset.py"
+    command = ["python", str(script_path)]
+    if samples is not None:
+      command += ["--samples", str(samples)]
+    if seed is not None:
+      command += ["--seed", str(seed)]
+    if shards > 0:
+      command += ["--shards", str(shards), "--workers", str(workers)]
     
     dataset_status["progress"] = 10
-    dataset_status["message"] = "Generating 500,000 samples..."
+    dataset_status["message"] = (
+      f"Generating {samples:,} samples..." if samples is not None else "Generating dataset..."
+    )
     
-    result = subprocess.run(
-      ["python", str(script_path)],
-      capture_output=True,
+    # Follow the script's output line by line for shard progress
+    output = deque(maxlen=20)
+    process = subprocess.Popen(
+      command,
+      stdout=subprocess.PIPE,
+      stderr=subprocess.STDOUT,
       text=True,
+      bufsize=1,
       cwd=str(script_path.parent.parent)
     )
+    for line in process.stdout:
+      line = line.rstrip()
+      if line.startswith("PROGRESS "):
+        _track_generation_progress(line)
+      elif line:
+        output.append(line)
+    process.wait()
     
-    if result.returncode == 0:
+    if process.returncode == 0:
       dataset_status["progress"] = 100
       dataset_status["message"] = "Dataset generated successfully!"
       dataset_status["completed_at"] = datetime.now().isoformat()
+      outcome = "success"
+      dataset_monitor.notify_changed()
     else:
-      dataset_status["error"] = result.stderr or "Dataset generation failed"
+      dataset_status["error"] = "\n".join(output) or "Dataset generation failed"
       dataset_status["message"] = "Dataset generation failed"
     
   except Exception as e:
@@ -143,11 +279,14 @@ def run_dataset_generation():
     dataset_status["message"] = f"Error: {str(e)}"
   finally:
     dataset_status["is_generating"] = False
+    JOB_DURATION.observe(time.perf_counter() - start, job="generate_dataset", outcome=outcome)
 
 
 def run_model_training():
   """Background task to train models"""
   global training_status
+  start = time.perf_counter()
+  outcome = "failure"
   
   try:
     training_status["is_training"] = True
@@ -177,10 +316,17 @@ def run_model_training():
     )
     
     if result.returncode == 0:
+      # Hot-swap the new models; this also invalidates cached predictions
+      training_status["progress"] = 95
+      training_status["current_step"] = "Reloading Models"
+      training_status["message"] = "Loading retrained models..."
+      run_model_reload()
+      
       training_status["progress"] = 100
       training_status["current_step"] = "Complete"
       training_status["message"] = "All models trained successfully!"
       training_status["completed_at"] = datetime.now().isoformat()
+      outcome = "success"
     else:
       training_status["error"] = result.stderr or "Training failed"
       training_status["message"] = "Training failed"
@@ -192,11 +338,78 @@ def run_model_training():
     training_status["current_step"] = "Failed"
   finally:
     training_status["is_training"] = False
+    JOB_DURATION.observe(time.perf_counter() - start, job="train_models", outcome=outcome)
+
+
+def run_model_reload():
+  """Background task to load new model artifacts and swap them in"""
+  global reload_status
+  start = time.perf_counter()
+  outcome = "failure"
+  
+  try:
+    reload_status["is_reloading"] = True
+    reload_status["message"] = "Loading models..."
+    reload_status["started_at"] = datetime.now().isoformat()
+    reload_status["completed_at"] = None
+    reload_status["error"] = None
+    
+    # Requests keep being served by the current models until the swap
+    version = model_manager.load_models()
+    # Process workers hold their own models and must be recycled
+    inference_executor.restart()
+    # Other server worker processes notice the new version on their next
+    # model_manager.poll() and reload themselves
+    
+    reload_status["model_version"] = version
+    reload_status["message"] = f"Serving model version {version}"
+    reload_status["completed_at"] = datetime.now().isoformat()
+    outcome = "success"
+  
+  except Exception as e:
+    reload_status["error"] = str(e)
+    reload_status["message"] = f"Error: {str(e)}"
+  finally:
+    reload_status["is_reloading"] = False
+    JOB_DURATION.observe(time.perf_counter() - start, job="reload_models", outcome=outcome)
+
+
+@router.get("/reload-status")
+async def get_reload_status():
+  """Get current model reload status"""
+  return JSONResponse(content={
+    **reload_status,
+    "model_version": model_manager.model_version
+  })
+
+
+@router.post("/reload-models")
+async def reload_models(background_tasks: BackgroundTasks):
+  """Reload model artifacts from disk without restarting the server"""
+  if reload_status["is_reloading"]:
+    raise HTTPException(status_code=400, detail="Model reload already in progress")
+  
+  if training_status["is_training"]:
+    raise HTTPException(status_code=400, detail="Cannot reload models while training is in progress")
+  
+  background_tasks.add_task(run_model_reload)
+  
+  return JSONResponse(content={
+    "message": "Model reload started",
+    "status": "started",
+    "model_version": model_manager.model_version
+  })
 
 
 @router.post("/generate-dataset")
-async def generate_dataset(background_tasks: BackgroundTasks):
-  """Trigger dataset generation"""
+async def generate_dataset(
+  background_tasks: BackgroundTasks,
+  samples: Optional[int] = Query(None, ge=1, description="Rows to generate (default: the script's default)"),
+  shards: int = Query(0, ge=0, le=1024, description="Generate out of core in this many shards (0 = in memory)"),
+  workers: int = Query(0, ge=0, description="Worker processes for shards (0 = one per CPU)"),
+  seed: Optional[int] = Query(None, ge=0, description="Random seed for a reproducible dataset")
+):
+  """Trigger dataset generation; per-shard progress is reported by /dataset-status"""
   global dataset_status
   
   if dataset_status["is_generating"]:
@@ -206,7 +419,7 @@ async def generate_dataset(background_tasks: BackgroundTasks):
     raise HTTPException(status_code=400, detail="Cannot generate dataset while training is in progress")
   
   # Start background task
-  background_tasks.add_task(run_dataset_generation)
+  background_tasks.add_task(run_dataset_generation, samples, shards, seed, workers)
   
   return JSONResponse(content={
     "message": "Dataset generation started",
@@ -226,8 +439,7 @@ async def train_models(background_tasks: BackgroundTasks):
     raise HTTPException(status_code=400, detail="Cannot train while dataset generation is in progress")
   
   # Check if dataset exists
-  data_dir = Path(__file__).parent.parent / "data"
-  dataset_path = data_dir / "agricultural_data.csv"
+  dataset_path = DATA_PATH / DATASET_FILE
   
   if not dataset_path.exists():
     raise HTTPException(status_code=400, detail="Dataset not found. Please generate or upload dataset first.")
@@ -243,7 +455,11 @@ async def train_models(background_tasks: BackgroundTasks):
 
 @router.post("/upload-dataset")
 async def upload_dataset(file: UploadFile = File(...)):
-  """Upload custom dataset CSV file"""
+  """
+  Upload a custom dataset as CSV or columnar .npz
+  
+  A file in the other format than DATASET_FILE is converted on upload.
+  """
   global dataset_status
   
   if dataset_status["is_generating"]:
@@ -253,25 +469,39 @@ async def upload_dataset(file: UploadFile = File(...)):
     raise HTTPException(status_code=400, detail="Training in progress")
   
   # Validate file type
-  if not file.filename.endswith('.csv'):
-    raise HTTPException(status_code=400, detail="Only CSV files are allowed")
+  suffix = Path(file.filename).suffix.lower()
+  if suffix not in (".csv", COLUMNAR_SUFFIX):
+    raise HTTPException(status_code=400, detail=f"Only CSV or {COLUMNAR_SUFFIX} files are allowed")
   
+  upload_path = None
   try:
     # Save uploaded file
-    data_dir = Path(__file__).parent.parent / "data"
+    data_dir = DATA_PATH
     data_dir.mkdir(parents=True, exist_ok=True)
     
-    dataset_path = data_dir / "agricultural_data.csv"
+    dataset_path = data_dir / DATASET_FILE
+    upload_path = data_dir / f".upload-{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}{suffix}"
+    with open(upload_path, "wb") as buffer:
+      await run_in_threadpool(shutil.copyfileobj, file.file, buffer, 16 * 1024 * 1024)
+    
+    if is_columnar(upload_path):
+      try:
+        await run_in_threadpool(columnar_info, upload_path)
+      except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid columnar dataset: {str(e)}")
     
     # Backup existing dataset if it exists
     if dataset_path.exists():
-      backup_path = data_dir / f"agricultural_data_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+      backup_path = data_dir / f"{dataset_path.stem}_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}{dataset_path.suffix}"
       shutil.copy(dataset_path, backup_path)
     
-    # Save new dataset
-    with open(dataset_path, "wb") as buffer:
-      content = await file.read()
-      buffer.write(content)
+    # Save new dataset, converting when the upload is in the other format
+    if upload_path.suffix == dataset_path.suffix.lower():
+      os.replace(upload_path, dataset_path)
+    else:
+      await run_in_threadpool(convert_dataset, upload_path, dataset_path)
+    
+    dataset_monitor.notify_changed()
     
     # Get file info
     stat = dataset_path.stat()
@@ -279,12 +509,18 @@ async def upload_dataset(file: UploadFile = File(...)):
     return JSONResponse(content={
       "message": "Dataset uploaded successfully",
       "filename": file.filename,
+      "format": "columnar" if is_columnar(dataset_path) else "csv",
       "size": f"{stat.st_size / 1024 / 1024:.2f} MB",
       "path": str(dataset_path)
     })
     
+  except HTTPException:
+    raise
   except Exception as e:
     raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+  finally:
+    if upload_path is not None and upload_path.exists():
+      upload_path.unlink()
 
 
 @router.delete("/delete-models")
@@ -325,11 +561,12 @@ async def delete_dataset():
     raise HTTPException(status_code=400, detail="Cannot delete dataset while training is in progress")
   
   try:
-    data_dir = Path(__file__).parent.parent / "data"
-    dataset_path = data_dir / "agricultural_data.csv"
+    dataset_path = DATA_PATH / DATASET_FILE
     
     if dataset_path.exists():
       dataset_path.unlink()
+      shutil.rmtree(DATA_PATH / "shards", ignore_errors=True)
+      dataset_monitor.notify_changed()
       return JSONResponse(content={"message": "Dataset deleted successfully"})
     else:
       raise HTTPException(status_code=404, detail="Dataset not found")
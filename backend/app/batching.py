@@ -0,0 +1,114 @@
+"""
+Micro-Batching
+Coalesces concurrent single predictions into vectorized batch calls
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.config import MICRO_BATCHING, MICRO_BATCH_MAX_SIZE, MICRO_BATCH_WAIT_MS
+from app.inference import InferenceExecutor, inference_executor
+from app.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512]
+WAIT_TIME_BUCKETS_MS = [0.5, 1, 2, 5, 10, 20, 50, 100]
+
+
+class MicroBatcher:
+  """
+  Collects /api/predict scenarios per model for a short window
+
+  A batch is flushed when it reaches max_batch_size or when the oldest
+  scenario has waited max_wait_ms. Each flush makes one
+  ModelManager.predict_batch call and fans the results back out.
+  """
+
+  def __init__(
+    self,
+    executor: InferenceExecutor,
+    max_batch_size: int = MICRO_BATCH_MAX_SIZE,
+    max_wait_ms: float = MICRO_BATCH_WAIT_MS
+  ):
+    self.executor = executor
+    self.max_batch_size = max_batch_size
+    self.max_wait_ms = max_wait_ms
+    self._pending: Dict[str, List[Tuple[Dict[str, Any], asyncio.Future, float]]] = {}
+    self._timers: Dict[str, asyncio.TimerHandle] = {}
+    # In-flight batch tasks; the loop only keeps weak references to tasks
+    self._tasks: Set[asyncio.Task] = set()
+    self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+    self.wait_times_ms = Histogram(WAIT_TIME_BUCKETS_MS)
+    self.batches = 0
+
+  async def predict(self, scenario: Dict[str, Any]) -> Dict[str, Any]:
+    """Queue one scenario and wait for its batched result"""
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    model_key = scenario["model"]
+
+    pending = self._pending.setdefault(model_key, [])
+    pending.append((scenario, future, loop.time()))
+
+    if len(pending) >= self.max_batch_size:
+      self._flush(model_key)
+    elif len(pending) == 1:
+      self._timers[model_key] = loop.call_later(
+        self.max_wait_ms / 1000, self._flush, model_key
+      )
+
+    return await future
+
+  def _flush(self, model_key: str):
+    """Send the pending scenarios for a model as one batch"""
+    timer = self._timers.pop(model_key, None)
+    if timer is not None:
+      timer.cancel()
+
+    batch = self._pending.pop(model_key, [])
+    if not batch:
+      return
+
+    now = asyncio.get_running_loop().time()
+    self.batches += 1
+    self.batch_sizes.observe(len(batch))
+    for _, _, enqueued_at in batch:
+      self.wait_times_ms.observe((now - enqueued_at) * 1000)
+
+    task = asyncio.ensure_future(self._run(batch))
+    self._tasks.add(task)
+    task.add_done_callback(self._tasks.discard)
+
+  async def _run(self, batch: List[Tuple[Dict[str, Any], asyncio.Future, float]]):
+    """Score a batch and resolve the waiting requests"""
+    try:
+      results = await self.executor.run(
+        "predict_batch", scenarios=[scenario for scenario, _, _ in batch]
+      )
+    except Exception as e:
+      for _, future, _ in batch:
+        if not future.done():
+          future.set_exception(e)
+      return
+
+    for (_, future, _), result in zip(batch, results):
+      if not future.done():
+        future.set_result(result)
+
+  def stats(self) -> Dict[str, Any]:
+    """Get batching configuration and batch-size / wait-time histograms"""
+    return {
+      "enabled": True,
+      "max_batch_size": self.max_batch_size,
+      "max_wait_ms": self.max_wait_ms,
+      "batches": self.batches,
+      "batch_size": self.batch_sizes.snapshot(),
+      "wait_time_ms": self.wait_times_ms.snapshot()
+    }
+
+
+# Global micro-batcher instance (None when micro-batching is disabled)
+micro_batcher: Optional[MicroBatcher] = (
+  MicroBatcher(inference_executor) if MICRO_BATCHING else None
+)
@@ -0,0 +1,222 @@
+"""
+Bulk Scoring
+Incremental CSV / NDJSON scenario parsing and streamed result formatting
+for /api/predict/stream
+"""
+import asyncio
+import csv
+import io
+import json
+import logging
+import math
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi.responses import StreamingResponse
+
+from app.config import DEFAULT_ARRIVALS, DEFAULT_RAINFALL, DEFAULT_TEMPERATURE
+from app.inference import inference_executor
+
+logger = logging.getLogger(__name__)
+
+# Column names match the training dataset
+INPUT_COLUMNS = ["city", "variety", "month", "arrivals", "rainfall", "temperature"]
+REQUIRED_COLUMNS = ["city", "variety", "month"]
+OUTPUT_COLUMNS = ["row"] + INPUT_COLUMNS + ["predicted_price", "error"]
+COVARIATE_DEFAULTS = {
+  "arrivals": DEFAULT_ARRIVALS,
+  "rainfall": DEFAULT_RAINFALL,
+  "temperature": DEFAULT_TEMPERATURE
+}
+
+# A single line longer than this is rejected, which keeps the read buffer bounded
+MAX_LINE_BYTES = 64 * 1024
+
+
+class BulkInputError(Exception):
+  """Raised when the upload cannot be parsed any further"""
+
+
+class UploadStreamingResponse(StreamingResponse):
+  """
+  StreamingResponse for bodies produced while the request is still uploading
+
+  The stock response listens on receive() for a client disconnect, which
+  would swallow request body messages the generator is still reading.
+  Disconnects surface instead as a failed send.
+  """
+
+  async def __call__(self, scope, receive, send):
+    await self.stream_response(send)
+    if self.background is not None:
+      await self.background()
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int = MAX_LINE_BYTES) -> AsyncIterator[str]:
+  """Split a byte stream into text lines without buffering the whole body"""
+  buffer = b""
+  async for chunk in chunks:
+    buffer += chunk
+    if b"\n" not in buffer:
+      if len(buffer) > max_line_bytes:
+        raise BulkInputError(f"Line longer than {max_line_bytes} bytes")
+      continue
+    *lines, buffer = buffer.split(b"\n")
+    for line in lines:
+      yield line.decode("utf-8").rstrip("\r")
+  if buffer.strip():
+    yield buffer.decode("utf-8").rstrip("\r")
+
+
+def _coerce(record: Dict[str, Any]) -> Dict[str, Any]:
+  """Validate one input record into a scenario (raises ValueError)"""
+  missing = [column for column in REQUIRED_COLUMNS if record.get(column) in (None, "")]
+  if missing:
+    raise ValueError(f"Missing values for: {', '.join(missing)}")
+
+  month = int(float(record["month"]))
+  if not 1 <= month <= 12:
+    raise ValueError(f"Invalid month: {record['month']}")
+
+  scenario = {
+    "city": str(record["city"]).strip(),
+    "variety": str(record["variety"]).strip(),
+    "month": month
+  }
+  for column, default in COVARIATE_DEFAULTS.items():
+    value = record.get(column)
+    scenario[column] = default if value in (None, "") else float(value)
+    if not math.isfinite(scenario[column]):
+      raise ValueError(f"Invalid {column}: {value}")
+  return scenario
+
+
+class ScenarioParser:
+  """Turns CSV or NDJSON lines into scenarios"""
+
+  def __init__(self, input_format: str):
+    self.input_format = input_format
+    self.header: Optional[List[str]] = None
+
+  def read_header(self, line: str):
+    """Parse the CSV header line (raises BulkInputError)"""
+    self.header = [name.strip().lower() for name in next(csv.reader([line.lstrip("\ufeff")]))]
+    missing = [column for column in REQUIRED_COLUMNS if column not in self.header]
+    if missing:
+      raise BulkInputError(f"Missing required columns: {', '.join(missing)}")
+
+  def parse(self, line: str) -> Dict[str, Any]:
+    """Parse one data line into a scenario (raises ValueError)"""
+    if self.input_format == "csv":
+      values = next(csv.reader([line]))
+      if len(values) != len(self.header):
+        raise ValueError(f"Expected {len(self.header)} fields, got {len(values)}")
+      record = dict(zip(self.header, values))
+    else:
+      try:
+        record = json.loads(line)
+      except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {e.msg}")
+      if not isinstance(record, dict):
+        raise ValueError("Expected a JSON object")
+    return _coerce(record)
+
+
+class _Chunk:
+  """Rows read from the upload and scored together"""
+
+  def __init__(self):
+    # (row number, scenario or None, error or None) in input order
+    self.entries: List[Tuple[int, Optional[Dict[str, Any]], Optional[str]]] = []
+    self.scenarios: List[Dict[str, Any]] = []
+
+  def add(self, row: int, scenario: Optional[Dict[str, Any]], error: Optional[str] = None):
+    self.entries.append((row, scenario, error))
+    if scenario is not None:
+      self.scenarios.append(scenario)
+
+
+async def _score(chunk: _Chunk, model_key: str) -> Tuple[_Chunk, Optional[List[float]], Optional[str]]:
+  """Score a chunk's valid rows with one vectorized predict call"""
+  if not chunk.scenarios:
+    return chunk, [], None
+  columns = {column: [s[column] for s in chunk.scenarios] for column in INPUT_COLUMNS}
+  try:
+    result = await inference_executor.run(
+      "predict_columns",
+      model_key=model_key,
+      months=columns["month"],
+      cities=columns["city"],
+      varieties=columns["variety"],
+      arrivals=columns["arrivals"],
+      rainfall=columns["rainfall"],
+      temperature=columns["temperature"]
+    )
+    return chunk, result["prices"].tolist(), None
+  except Exception as e:
+    logger.error(f"Bulk scoring error: {e}")
+    return chunk, None, f"Scoring failed: {e}"
+
+
+def _format(chunk: _Chunk, prices: Optional[List[float]], chunk_error: Optional[str], output_format: str) -> str:
+  """Render a scored chunk as NDJSON lines or CSV rows"""
+  records = []
+  price_iter = iter(prices or [])
+  for row, scenario, error in chunk.entries:
+    if scenario is None:
+      records.append({"row": row, "error": error})
+    elif chunk_error is not None:
+      records.append({"row": row, **scenario, "error": chunk_error})
+    else:
+      records.append({"row": row, **scenario, "predicted_price": round(next(price_iter), 2)})
+
+  if output_format == "ndjson":
+    return "".join(json.dumps(record) + "\n" for record in records)
+
+  buffer = io.StringIO()
+  writer = csv.DictWriter(buffer, fieldnames=OUTPUT_COLUMNS, lineterminator="\n")
+  writer.writerows(records)
+  return buffer.getvalue()
+
+
+async def score_stream(
+  lines: AsyncIterator[str],
+  parser: ScenarioParser,
+  model_key: str,
+  chunk_size: int,
+  output_format: str
+) -> AsyncIterator[str]:
+  """
+  Read, score and emit the upload chunk by chunk
+
+  While one chunk is being scored the next one is read, so at most two
+  chunks are held in memory regardless of the upload size.
+  """
+  if output_format == "csv":
+    yield ",".join(OUTPUT_COLUMNS) + "\n"
+
+  pending: Optional[asyncio.Task] = None
+  chunk = _Chunk()
+  row = 0
+  try:
+    async for line in lines:
+      if not line.strip():
+        continue
+      row += 1
+      try:
+        chunk.add(row, parser.parse(line))
+      except ValueError as e:
+        chunk.add(row, None, str(e))
+
+      if len(chunk.entries) >= chunk_size:
+        if pending is not None:
+          yield _format(*await pending, output_format)
+        pending = asyncio.create_task(_score(chunk, model_key))
+        chunk = _Chunk()
+  except (BulkInputError, UnicodeDecodeError) as e:
+    # Headers are already sent, so the error is reported in the stream
+    chunk.add(row + 1, None, f"Upload aborted: {e}")
+
+  if pending is not None:
+    yield _format(*await pending, output_format)
+  if chunk.entries:
+    yield _format(*await _score(chunk, model_key), output_format)
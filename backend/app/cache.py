@@ -0,0 +1,120 @@
+"""
+Prediction Result Cache
+In-process LRU cache with TTL expiry and single-flight request coalescing
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Flight:
+  """A computation in progress that concurrent callers can wait on"""
+
+  def __init__(self):
+    self.event = threading.Event()
+    self.value: Any = None
+    self.error: Optional[BaseException] = None
+
+
+class PredictionCache:
+  """Thread-safe LRU cache for prediction results"""
+
+  def __init__(self, max_size: int = 10000, ttl_seconds: float = 3600):
+    self.max_size = max_size
+    self.ttl_seconds = ttl_seconds
+    self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+    self._inflight: Dict[Hashable, _Flight] = {}
+    self._lock = threading.Lock()
+
+    self.hits = 0
+    self.misses = 0
+    self.coalesced = 0
+    self.evictions = 0
+    self.expirations = 0
+    self.invalidations = 0
+
+  def get_or_compute(
+    self,
+    key: Hashable,
+    compute: Callable[[], Any],
+    cacheable: Optional[Callable[[Any], bool]] = None
+  ) -> Any:
+    """
+    Return the cached value for key, computing it on a miss
+
+    Concurrent callers that miss on the same key wait for the first
+    caller's computation instead of running their own. Values for which
+    cacheable returns False are handed to those callers but not stored.
+    """
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is not None:
+        expires_at, value = entry
+        if expires_at > time.monotonic():
+          self._entries.move_to_end(key)
+          self.hits += 1
+          return value
+        del self._entries[key]
+        self.expirations += 1
+
+      flight = self._inflight.get(key)
+      if flight is not None:
+        self.coalesced += 1
+        is_leader = False
+      else:
+        flight = _Flight()
+        self._inflight[key] = flight
+        self.misses += 1
+        is_leader = True
+
+    if not is_leader:
+      flight.event.wait()
+      if flight.error is not None:
+        raise flight.error
+      return flight.value
+
+    try:
+      flight.value = compute()
+    except BaseException as e:
+      flight.error = e
+      raise
+    finally:
+      with self._lock:
+        if flight.error is None and (cacheable is None or cacheable(flight.value)):
+          self._store(key, flight.value)
+        self._inflight.pop(key, None)
+      flight.event.set()
+
+    return flight.value
+
+  def _store(self, key: Hashable, value: Any):
+    """Insert a value and evict least-recently-used entries (lock held)"""
+    self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+    self._entries.move_to_end(key)
+    while len(self._entries) > self.max_size:
+      self._entries.popitem(last=False)
+      self.evictions += 1
+
+  def clear(self):
+    """Drop all cached entries"""
+    with self._lock:
+      self._entries.clear()
+      self.invalidations += 1
+
+  def stats(self) -> Dict[str, Any]:
+    """Get cache size and hit/miss counters"""
+    with self._lock:
+      lookups = self.hits + self.misses + self.coalesced
+      return {
+        "size": len(self._entries),
+        "max_size": self.max_size,
+        "ttl_seconds": self.ttl_seconds,
+        "hits": self.hits,
+        "misses": self.misses,
+        "coalesced": self.coalesced,
+        "evictions": self.evictions,
+        "expirations": self.expirations,
+        "invalidations": self.invalidations,
+        "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0
+      }
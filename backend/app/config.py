@@ -26,11 +26,92 @@ ALLOWED_ORIGINS = [
 
 # Model Settings
 MODEL_PATH = BASE_DIR / "data" / "models"
+COMPILED_MODEL_PATH = MODEL_PATH / "compiled"
 DEFAULT_MODEL = os.getenv("DEFAULT_MODEL", "random_forest")
 
+# Model Loading Settings
+# "eager" loads every model at startup, "lazy" loads each model on first use
+MODEL_LOAD_MODE = os.getenv("MODEL_LOAD_MODE", "eager").lower()
+# Memory budget for loaded models in MB (0 = unlimited); least-recently-used
+# models are evicted when the budget is exceeded
+MODEL_MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", 0))
+# Seconds between checks for model artifacts replaced on disk (0 = never);
+# every worker process reloads on its own when the artifact version changes
+MODEL_CHECK_INTERVAL = float(os.getenv("MODEL_CHECK_INTERVAL", 5))
+
+# Inference backend per model, e.g. "random_forest=auto,xgboost=compiled"
+# native   = the unpickled sklearn/XGBoost model
+# compiled = flattened NumPy tree arrays (app/tree_engine.py)
+# auto     = compiled for batches up to COMPILED_MAX_ROWS rows, native above
+# Every model is native unless listed; compiled and auto compile the trees
+# and check parity at load time, and auto keeps both copies in memory
+MODEL_BACKENDS = {
+  key.strip(): value.strip().lower()
+  for key, value in (
+    item.split("=", 1)
+    for item in os.getenv("MODEL_BACKENDS", "").split(",")
+    if "=" in item
+  )
+}
+COMPILED_MAX_ROWS = int(os.getenv("COMPILED_MAX_ROWS", 32))
+
+# Model artifact format
+# pickle = unpickle data/models/<model>.pkl in every process
+# mmap   = memory-map data/models/compiled/<model>/*.npy (written by the
+#          training script) so all worker processes share one copy; models
+#          are then always served by the compiled backend
+MODEL_ARTIFACT_FORMAT = os.getenv("MODEL_ARTIFACT_FORMAT", "pickle").lower()
+
+# Batch Prediction Settings
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", 5000))
+MAX_FORECAST_HORIZON = int(os.getenv("MAX_FORECAST_HORIZON", 36))
+# Upper bound on cities x varieties x horizon for one forecast grid
+MAX_FORECAST_POINTS = int(os.getenv("MAX_FORECAST_POINTS", 20000))
+# Rows scored per vectorized call by the streaming bulk endpoint
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", 1000))
+
+# Inference Executor Settings
+# Model inference runs in a "thread" or "process" pool off the event loop
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread").lower()
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", 4))
+# Requests allowed to wait for a free worker before returning 503
+INFERENCE_QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", 64))
+# Seconds before an inference call returns 504
+INFERENCE_TIMEOUT = float(os.getenv("INFERENCE_TIMEOUT", 10))
+
+# Micro-Batching Settings
+# Coalesce concurrent /api/predict calls into one vectorized predict per model.
+# Batched calls bypass the prediction cache; default-covariate scenarios are
+# still answered from the price table.
+MICRO_BATCHING = os.getenv("MICRO_BATCHING", "False").lower() == "true"
+MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", 64))
+MICRO_BATCH_WAIT_MS = float(os.getenv("MICRO_BATCH_WAIT_MS", 2))
+
+# Profiling Settings
+# When enabled, requests sent with an "X-Debug-Timing: 1" header or
+# "?debug_timing=1" get a stage-by-stage Server-Timing header
+DEBUG_TIMING_ENABLED = os.getenv("DEBUG_TIMING_ENABLED", "False").lower() == "true"
+# Let "X-Debug-Timing: profile" capture a cProfile of the inference call into
+# PROFILE_DIR (otherwise it is treated as plain timing). Any client can send
+# the header, so only enable this where the API is not publicly reachable.
+DEBUG_PROFILE_ENABLED = os.getenv("DEBUG_PROFILE_ENABLED", "False").lower() == "true"
+# Profile 1 in N inference calls with cProfile (0 disables sampling)
+PROFILE_SAMPLE_RATE = int(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", BASE_DIR / "data" / "profiles"))
+
+# Prediction Cache Settings (size 0 disables the cache)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", 10000))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", 3600))
+
 # Data Settings
 DATA_PATH = BASE_DIR / "data"
 DATASET_FILE = os.getenv("DATASET_FILE", "agricultural_data.csv")
+# Seconds between checks for a dataset replaced outside the API; the
+# insights aggregates are rebuilt (or extended, for appends) on change
+DATASET_CHECK_INTERVAL = float(os.getenv("DATASET_CHECK_INTERVAL", 5))
+# Rows per page returned by /api/history (default and maximum)
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", 500))
+HISTORY_MAX_PAGE_SIZE = int(os.getenv("HISTORY_MAX_PAGE_SIZE", 5000))
 
 # Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -55,6 +136,27 @@ FEATURE_COLUMNS = [
 # Target column
 TARGET_COLUMN = "price"
 
-# Create directories if they don't exist
-MODEL_PATH.mkdir(parents=True, exist_ok=True)
-DATA_PATH.mkdir(parents=True, exist_ok=True)
+# Default covariates used when a request does not specify them
+DEFAULT_ARRIVALS = 2000.0
+DEFAULT_RAINFALL = 50.0
+DEFAULT_TEMPERATURE = 28.0
+
+# Price lookup table precomputed at training time for default covariates
+PRICE_TABLE_FILE = "price_table.npz"
+
+# Prediction intervals
+# Held-out residual quantiles written at training time (XGBoost, linear
+# regression, and random forests served without the compiled backend)
+INTERVALS_FILE = "intervals.json"
+# Share of outcomes the [lower_bound, upper_bound] interval should cover
+PREDICTION_INTERVAL_COVERAGE = float(os.getenv("PREDICTION_INTERVAL_COVERAGE", 0.9))
+
+# Measured fit cost per model, used by `train_models.py --parallel` to
+# allocate cores on the next run
+TRAINING_PROFILE_FILE = "training_profile.json"
+
+
+def ensure_directories():
+  """Create data directories if they don't exist (called at server startup)"""
+  MODEL_PATH.mkdir(parents=True, exist_ok=True)
+  DATA_PATH.mkdir(parents=True, exist_ok=True)
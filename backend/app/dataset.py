@@ -0,0 +1,82 @@
+"""
+Dataset Monitor
+Detects when the dataset file is written or replaced and notifies the
+in-memory views built from it
+"""
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from app.config import DATA_PATH, DATASET_FILE, DATASET_CHECK_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+Signature = Tuple[int, int, int]
+
+
+class DatasetMonitor:
+  """
+  Watches one dataset file and refreshes subscribers when it changes
+
+  Changes are picked up from explicit notify_changed() calls (admin
+  upload / generation) and from a throttled stat() in poll(), so files
+  replaced outside the API are noticed too. Refreshes run on a
+  background thread; readers keep the previous view until it finishes.
+  """
+
+  def __init__(self, path: Path, check_interval: float = 5.0):
+    self.path = path
+    self.check_interval = check_interval
+    self.version = 0
+    self._signature: Optional[Signature] = None
+    self._last_check = 0.0
+    self._listeners: List[Callable[[Path], None]] = []
+    self._refresh_lock = threading.Lock()
+    self._pending = False
+
+  def subscribe(self, callback: Callable[[Path], None]):
+    """Register a callback run with the dataset path after every change"""
+    self._listeners.append(callback)
+
+  def signature(self) -> Optional[Signature]:
+    """(inode, size, mtime) of the file, or None if it does not exist"""
+    try:
+      stat = self.path.stat()
+    except FileNotFoundError:
+      return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+  def refresh(self):
+    """Run every subscriber against the current file (blocking)"""
+    with self._refresh_lock:
+      self._pending = False
+      self._signature = self.signature()
+      self._last_check = time.monotonic()
+      self.version += 1
+      for callback in self._listeners:
+        try:
+          callback(self.path)
+        except Exception as e:
+          logger.error(f"✗ Dataset refresh failed in {callback.__qualname__}: {e}")
+
+  def notify_changed(self):
+    """Schedule a refresh after the dataset was written"""
+    if self._pending:
+      return
+    self._pending = True
+    threading.Thread(target=self.refresh, name="dataset-refresh", daemon=True).start()
+
+  def poll(self):
+    """Cheap staleness check for the request path (at most one stat per interval)"""
+    now = time.monotonic()
+    if now - self._last_check < self.check_interval:
+      return
+    self._last_check = now
+    if self.signature() != self._signature:
+      self.notify_changed()
+
+
+# Global dataset monitor instance
+dataset_monitor = DatasetMonitor(DATA_PATH / DATASET_FILE, DATASET_CHECK_INTERVAL)
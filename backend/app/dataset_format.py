@@ -0,0 +1,296 @@
+"""
+Dataset Storage Formats
+Reads and writes the dataset either as CSV or as a columnar NumPy archive
+(.npz) with categorical codes, float32 measurements and the smallest
+integer type that fits each integer column
+
+CSV stays the import/export format; the columnar file is read column by
+column without parsing text.
+"""
+import os
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+  import pandas as pd
+
+COLUMNAR_SUFFIX = ".npz"
+FORMAT_VERSION = 1
+# Rows converted at a time when importing or exporting CSV
+CONVERT_CHUNK_ROWS = 500_000
+
+INT_TYPES = [np.int8, np.int16, np.int32, np.int64]
+
+
+def is_columnar(path: Union[str, Path]) -> bool:
+  """True if the path uses the columnar format (by suffix)"""
+  return Path(path).suffix.lower() == COLUMNAR_SUFFIX
+
+
+def _smallest_int(low: int, high: int) -> np.dtype:
+  for dtype in INT_TYPES:
+    info = np.iinfo(dtype)
+    if info.min <= low and high <= info.max:
+      return np.dtype(dtype)
+  return np.dtype(np.int64)
+
+
+class ColumnarWriter:
+  """
+  Writes DataFrame chunks to a columnar .npz without holding the dataset
+
+  Each appended chunk is encoded and spilled to a temporary .npy per
+  column; close() streams the parts into one uncompressed archive member
+  per column, with integer and code columns narrowed to the smallest type
+  that fits the whole dataset. Category codes stay stable across chunks.
+  The archive is swapped in atomically.
+  """
+
+  def __init__(self, path: Union[str, Path]):
+    self.path = Path(path)
+    self.path.parent.mkdir(parents=True, exist_ok=True)
+    self.rows = 0
+    self._tmp_dir = Path(tempfile.mkdtemp(prefix=".columnar-", dir=self.path.parent))
+    self._columns: Optional[List[str]] = None
+    self._parts: Dict[str, List[Path]] = {}
+    self._dtypes: Dict[str, np.dtype] = {}
+    self._ranges: Dict[str, List[int]] = {}
+    self._categories: Dict[str, Dict[Any, int]] = {}
+
+  def _encode(self, column: str, series: "pd.Series") -> np.ndarray:
+    import pandas as pd
+
+    if column in self._categories or not (
+      pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series)
+    ) or isinstance(series.dtype, pd.CategoricalDtype):
+      # Strings / categoricals: codes into categories kept across chunks
+      index = self._categories.setdefault(column, {})
+      categorical = pd.Categorical(series)
+      for category in categorical.categories:
+        if category not in index:
+          index[category] = len(index)
+      mapping = np.array([index[category] for category in categorical.categories], dtype=np.int64)
+      codes = categorical.codes
+      return np.where(codes >= 0, mapping[np.maximum(codes, 0)] if len(mapping) else -1, -1)
+
+    values = series.to_numpy()
+    if values.dtype.kind == "f":
+      return values.astype(np.float32)
+    if values.dtype.kind in "iu":
+      if len(values):
+        low, high = self._ranges.setdefault(column, [int(values.min()), int(values.max())])
+        self._ranges[column] = [min(low, int(values.min())), max(high, int(values.max()))]
+      return values.astype(np.int64)
+    return values
+
+  def append(self, df: "pd.DataFrame"):
+    """Encode and spill one chunk (columns must match the first chunk)"""
+    if self._columns is None:
+      self._columns = [str(column) for column in df.columns]
+      self._parts = {column: [] for column in self._columns}
+    elif [str(column) for column in df.columns] != self._columns:
+      raise ValueError("All chunks must have the same columns")
+
+    for position, column in enumerate(self._columns):
+      array = self._encode(column, df.iloc[:, position])
+      dtype = self._dtypes.get(column)
+      self._dtypes[column] = array.dtype if dtype is None else np.promote_types(dtype, array.dtype)
+      part = self._tmp_dir / f"{position}-{len(self._parts[column])}.npy"
+      np.save(part, array)
+      self._parts[column].append(part)
+    self.rows += len(df)
+
+  def _final_dtype(self, column: str) -> np.dtype:
+    if column in self._categories:
+      return _smallest_int(-1, len(self._categories[column]))
+    if column in self._ranges:
+      return _smallest_int(*self._ranges[column])
+    return self._dtypes[column]
+
+  def close(self) -> Path:
+    """Assemble the archive and replace the target file"""
+    tmp_path = self._tmp_dir / "dataset.npz"
+    try:
+      with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for column in self._columns or []:
+          dtype = self._final_dtype(column)
+          with archive.open(f"{column}.npy", "w", force_zip64=True) as member:
+            np.lib.format.write_array_header_1_0(member, {
+              "descr": np.lib.format.dtype_to_descr(dtype),
+              "fortran_order": False,
+              "shape": (self.rows,)
+            })
+            for part in self._parts[column]:
+              member.write(np.load(part).astype(dtype, copy=False).tobytes())
+          if column in self._categories:
+            categories = np.array([str(category) for category in self._categories[column]])
+            with archive.open(f"{column}.categories.npy", "w") as member:
+              np.lib.format.write_array(member, categories)
+        with archive.open("__columns__.npy", "w") as member:
+          np.lib.format.write_array(member, np.array(self._columns or []))
+        with archive.open("__format__.npy", "w") as member:
+          np.lib.format.write_array(member, np.array([FORMAT_VERSION, self.rows], dtype=np.int64))
+      os.replace(tmp_path, self.path)
+    finally:
+      shutil.rmtree(self._tmp_dir, ignore_errors=True)
+    return self.path
+
+
+def widen_float32(values: np.ndarray) -> np.ndarray:
+  """
+  float64 copy of float32 values rounded to the 7 significant digits
+  float32 holds
+
+  A plain cast turns 27848.49 (float32) into 27848.490234375; rounding
+  gives back 27848.49 for JSON responses.
+  """
+  wide = values.astype(np.float64)
+  if values.dtype != np.float32:
+    return wide
+  magnitude = np.floor(np.log10(np.abs(wide), where=wide != 0, out=np.zeros_like(wide)))
+  scale = 10.0 ** (6 - magnitude)
+  return np.round(wide * scale) / scale
+
+
+def write_columnar(df: "pd.DataFrame", path: Union[str, Path]) -> Path:
+  """Write a DataFrame as a columnar .npz"""
+  writer = ColumnarWriter(path)
+  writer.append(df)
+  return writer.close()
+
+
+def columnar_info(path: Union[str, Path]) -> Dict[str, Any]:
+  """Columns, row count and stored dtypes of a columnar file (reads headers only)"""
+  with np.load(path) as data:
+    columns = data["__columns__"].tolist()
+    rows = int(data["__format__"][1])
+    dtypes = {}
+    for column in columns:
+      with data.zip.open(f"{column}.npy") as member:
+        np.lib.format.read_magic(member)
+        _, _, dtype = np.lib.format.read_array_header_1_0(member)
+      dtypes[column] = "category" if f"{column}.categories" in data.files else str(dtype)
+  return {"columns": columns, "rows": rows, "dtypes": dtypes}
+
+
+def read_columnar(path: Union[str, Path], columns: Optional[List[str]] = None) -> "pd.DataFrame":
+  """Load (a projection of) a columnar file; coded columns come back as pandas categoricals"""
+  import pandas as pd
+
+  with np.load(path) as data:
+    available = data["__columns__"].tolist()
+    columns = [column for column in available if column in columns] if columns is not None else available
+    frame = {}
+    for column in columns:
+      values = data[column]
+      if f"{column}.categories" in data.files:
+        values = pd.Categorical.from_codes(values, categories=data[f"{column}.categories"].tolist())
+      frame[column] = values
+  return pd.DataFrame(frame)
+
+
+def _column_layout(path: Union[str, Path], columns: Optional[List[str]] = None) -> tuple:
+  """
+  Where each column's array starts in a columnar file
+
+  Members are stored uncompressed, so a column's rows can be read
+  straight from the archive at data offset + row * itemsize. Returns
+  (columns, rows, {column: (offset, dtype)}, categories) with categories
+  only for coded columns. Compressed members (not written by
+  ColumnarWriter) are loaded whole and mapped to the array instead.
+  """
+  layout = {}
+  categories = {}
+  with np.load(path) as data, open(path, "rb") as f:
+    available = data["__columns__"].tolist()
+    rows = int(data["__format__"][1])
+    columns = [column for column in available if column in columns] if columns is not None else available
+    for column in columns:
+      if f"{column}.categories" in data.files:
+        categories[column] = data[f"{column}.categories"].tolist()
+      info = data.zip.getinfo(f"{column}.npy")
+      if info.compress_type != zipfile.ZIP_STORED:
+        layout[column] = data[column]
+        continue
+      # Local file header: 30 fixed bytes, then the name and extra field
+      f.seek(info.header_offset + 26)
+      name_length, extra_length = np.frombuffer(f.read(4), dtype="<u2")
+      f.seek(info.header_offset + 30 + int(name_length) + int(extra_length))
+      np.lib.format.read_magic(f)
+      _, _, dtype = np.lib.format.read_array_header_1_0(f)
+      layout[column] = (f.tell(), dtype)
+  return columns, rows, layout, categories
+
+
+def dataset_columns(path: Union[str, Path]) -> List[str]:
+  """Column names of a CSV or columnar dataset"""
+  if is_columnar(path):
+    with np.load(path) as data:
+      return data["__columns__"].tolist()
+  import pandas as pd
+  return list(pd.read_csv(path, nrows=0).columns)
+
+
+def read_dataset(path: Union[str, Path], columns: Optional[List[str]] = None) -> "pd.DataFrame":
+  """Load a CSV or columnar dataset, optionally only some columns"""
+  if is_columnar(path):
+    return read_columnar(path, columns)
+  import pandas as pd
+  return pd.read_csv(path, usecols=columns)
+
+
+def iter_dataset(
+  path: Union[str, Path],
+  columns: Optional[List[str]] = None,
+  chunk_size: int = CONVERT_CHUNK_ROWS
+) -> Iterator["pd.DataFrame"]:
+  """Read a CSV or columnar dataset in chunks of rows"""
+  if is_columnar(path):
+    import pandas as pd
+
+    # Read each chunk's rows per column, so only one chunk is ever in memory
+    columns, rows, layout, categories = _column_layout(path, columns)
+    with open(path, "rb") as f:
+      for start in range(0, rows, chunk_size):
+        stop = min(start + chunk_size, rows)
+        frame = {}
+        for column in columns:
+          entry = layout[column]
+          if isinstance(entry, np.ndarray):
+            values = entry[start:stop]
+          else:
+            offset, dtype = entry
+            f.seek(offset + start * dtype.itemsize)
+            values = np.fromfile(f, dtype=dtype, count=stop - start)
+          if column in categories:
+            values = pd.Categorical.from_codes(values, categories=categories[column])
+          frame[column] = values
+        yield pd.DataFrame(frame, index=pd.RangeIndex(start, stop))
+    return
+  import pandas as pd
+  yield from pd.read_csv(path, usecols=columns, chunksize=chunk_size)
+
+
+def convert_dataset(source: Union[str, Path], target: Union[str, Path]) -> int:
+  """Convert between CSV and columnar by suffix, in chunks; returns the row count"""
+  if is_columnar(target):
+    writer = ColumnarWriter(target)
+    for chunk in iter_dataset(source):
+      writer.append(chunk)
+    writer.close()
+    return writer.rows
+
+  target = Path(target)
+  tmp_path = target.with_name(target.name + ".tmp")
+  rows = 0
+  with open(tmp_path, "w", newline="") as f:
+    for chunk in iter_dataset(source):
+      chunk.to_csv(f, index=False, header=rows == 0)
+      rows += len(chunk)
+  os.replace(tmp_path, target)
+  return rows
@@ -0,0 +1,224 @@
+"""
+Historical Price Store
+In-memory columnar copy of the dataset, sorted by (city, variety, date)
+so that market and date-range filters are binary searches over
+contiguous arrays
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.dataset_format import dataset_columns, read_dataset, widen_float32
+
+logger = logging.getLogger(__name__)
+
+KEY_COLUMNS = ["city", "variety", "year", "month"]
+VALUE_COLUMNS = ["price", "arrivals", "rainfall", "temperature"]
+HISTORY_COLUMNS = ["year", "month", "city", "variety"] + VALUE_COLUMNS
+
+
+class HistoryQueryError(ValueError):
+  """Raised for an invalid history query (unknown column, bad range)"""
+
+
+class ColumnarTable:
+  """
+  One dataset version as sorted column arrays
+
+  Rows of a (city, variety) market are contiguous and ordered by date,
+  with `partitions` mapping each market to its [start, end) row range.
+  Cities and varieties are stored as codes into sorted category lists.
+  """
+
+  def __init__(self, df=None):
+    self.cities: List[str] = []
+    self.varieties: List[str] = []
+    self.columns: Dict[str, np.ndarray] = {}
+    self.dates = np.empty(0, dtype=np.int32)
+    self.partitions: Dict[Tuple[str, str], Tuple[int, int]] = {}
+    self.rows = 0
+    if df is not None:
+      self._build(df)
+
+  def _build(self, df):
+    import pandas as pd
+
+    df = df.dropna(subset=KEY_COLUMNS)
+    city = pd.Categorical(df["city"].astype(str))
+    variety = pd.Categorical(df["variety"].astype(str))
+    year = df["year"].to_numpy(dtype=np.int32)
+    month = df["month"].to_numpy(dtype=np.int32)
+    # Months since year 0, so a (year, month) range is one integer range
+    dates = year * 12 + (month - 1)
+
+    order = np.lexsort((dates, variety.codes, city.codes))
+    self.cities = list(city.categories)
+    self.varieties = list(variety.categories)
+    self.dates = np.ascontiguousarray(dates[order])
+    self.columns = {
+      "year": year[order].astype(np.int16),
+      "month": month[order].astype(np.int8),
+      "city": np.ascontiguousarray(city.codes[order]),
+      "variety": np.ascontiguousarray(variety.codes[order])
+    }
+    for column in VALUE_COLUMNS:
+      if column in df.columns:
+        values = df[column].to_numpy()
+        values = widen_float32(values) if values.dtype == np.float32 else values.astype(np.float64)
+        self.columns[column] = np.ascontiguousarray(values[order])
+    self.rows = len(order)
+
+    # Market boundaries are where the (city, variety) code pair changes
+    pair = self.columns["city"].astype(np.int64) * len(self.varieties) + self.columns["variety"]
+    bounds = np.concatenate(([0], np.flatnonzero(np.diff(pair)) + 1, [self.rows]))
+    for start, end in zip(bounds[:-1], bounds[1:]):
+      if end > start:
+        key = (self.cities[self.columns["city"][start]], self.varieties[self.columns["variety"][start]])
+        self.partitions[key] = (int(start), int(end))
+
+  def _column_values(self, column: str, index: np.ndarray) -> List[Any]:
+    """Python values of a column at the given row positions"""
+    values = self.columns[column][index]
+    if column == "city":
+      return np.asarray(self.cities, dtype=object)[values].tolist()
+    if column == "variety":
+      return np.asarray(self.varieties, dtype=object)[values].tolist()
+    return values.tolist()
+
+  def query(
+    self,
+    city: Optional[str],
+    variety: Optional[str],
+    start: Optional[int],
+    end: Optional[int],
+    columns: List[str],
+    offset: int,
+    limit: int
+  ) -> Tuple[int, List[Dict[str, Any]]]:
+    """Total matching rows and one page of projected rows"""
+    if city is not None and variety is not None:
+      market = self.partitions.get((city, variety))
+      markets = [((city, variety), market)] if market else []
+    else:
+      markets = self.partitions.items()
+
+    ranges = []
+    for (market_city, market_variety), (lo, hi) in markets:
+      if (city is not None and market_city != city) or (variety is not None and market_variety != variety):
+        continue
+      dates = self.dates[lo:hi]
+      first = lo + (int(np.searchsorted(dates, start, "left")) if start is not None else 0)
+      last = lo + (int(np.searchsorted(dates, end, "right")) if end is not None else hi - lo)
+      if last > first:
+        ranges.append((first, last))
+
+    total = sum(last - first for first, last in ranges)
+    # Row positions of the requested page, walking the ranges in order
+    page = []
+    skip, remaining = offset, limit
+    for first, last in ranges:
+      if remaining <= 0:
+        break
+      size = last - first
+      if skip >= size:
+        skip -= size
+        continue
+      take = min(size - skip, remaining)
+      page.append(np.arange(first + skip, first + skip + take))
+      skip = 0
+      remaining -= take
+
+    if not page:
+      return total, []
+    index = np.concatenate(page)
+    values = {column: self._column_values(column, index) for column in columns}
+    rows = [dict(zip(columns, row)) for row in zip(*values.values())]
+    return total, rows
+
+
+class HistoryStore:
+  """Historical price table kept in sync with the dataset file"""
+
+  def __init__(self):
+    self._table = ColumnarTable()
+    self._lock = threading.Lock()
+    self.built_at: Optional[str] = None
+    self.build_ms = 0.0
+
+  def refresh(self, path: Path):
+    """Rebuild the table after the dataset changed (DatasetMonitor listener)"""
+    with self._lock:
+      start = time.perf_counter()
+      if not path.exists():
+        self._table = ColumnarTable()
+        logger.info("⚠ Dataset not found, price history cleared")
+        return
+
+      header = dataset_columns(path)
+      missing = [column for column in KEY_COLUMNS if column not in header]
+      if missing:
+        raise ValueError(f"Dataset is missing columns: {', '.join(missing)}")
+      usecols = [column for column in HISTORY_COLUMNS if column in header]
+      table = ColumnarTable(read_dataset(path, usecols))
+
+      self._table = table
+      self.build_ms = round((time.perf_counter() - start) * 1000, 2)
+      self.built_at = datetime.now().isoformat()
+      logger.info(
+        f"✓ Price history loaded: {table.rows:,} rows, {len(table.partitions)} markets in {self.build_ms:.0f}ms"
+      )
+
+  def query(
+    self,
+    city: Optional[str] = None,
+    variety: Optional[str] = None,
+    start_year: Optional[int] = None,
+    start_month: int = 1,
+    end_year: Optional[int] = None,
+    end_month: int = 12,
+    columns: Optional[List[str]] = None,
+    offset: int = 0,
+    limit: int = 500
+  ) -> Dict[str, Any]:
+    """Filter by market and inclusive (year, month) range, with pagination and projection"""
+    table = self._table
+    available = [column for column in HISTORY_COLUMNS if column in table.columns] or HISTORY_COLUMNS
+    columns = columns or available
+    unknown = [column for column in columns if column not in available]
+    if unknown:
+      raise HistoryQueryError(f"Unknown columns: {', '.join(unknown)}. Available: {', '.join(available)}")
+
+    start = start_year * 12 + (start_month - 1) if start_year is not None else None
+    end = end_year * 12 + (end_month - 1) if end_year is not None else None
+    if start is not None and end is not None and start > end:
+      raise HistoryQueryError("Start date is after end date")
+
+    total, rows = table.query(city, variety, start, end, columns, offset, limit)
+    next_offset = offset + len(rows)
+    return {
+      "total": total,
+      "offset": offset,
+      "limit": limit,
+      "next_offset": next_offset if next_offset < total else None,
+      "columns": columns,
+      "rows": rows
+    }
+
+  def status(self) -> Dict[str, Any]:
+    table = self._table
+    return {
+      "rows": table.rows,
+      "markets": len(table.partitions),
+      "memory_mb": round((table.dates.nbytes + sum(array.nbytes for array in table.columns.values())) / 1024 / 1024, 2),
+      "build_ms": self.build_ms,
+      "built_at": self.built_at
+    }
+
+
+# Global history store instance
+history_store = HistoryStore()
@@ -0,0 +1,181 @@
+"""
+Inference Executor
+Runs CPU-bound model inference off the asyncio event loop
+"""
+import asyncio
+import contextvars
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Tuple
+
+from app.config import (
+  INFERENCE_EXECUTOR,
+  INFERENCE_WORKERS,
+  INFERENCE_QUEUE_SIZE,
+  INFERENCE_TIMEOUT
+)
+from app.metrics import drain_worker_metrics, merge_worker_metrics
+from app.profiling import current_timer, should_profile, run_profiled
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceQueueFull(Exception):
+  """Raised when the inference queue has no room for another request"""
+
+
+class InferenceTimeout(Exception):
+  """Raised when an inference call does not finish within the timeout"""
+
+
+def _call_model_manager(method: str, kwargs: Dict[str, Any], profile: bool = False) -> Any:
+  """Run a ModelManager method (module level so process pools can pickle it)"""
+  from app.ml_models import model_manager
+  if profile:
+    return run_profiled(method, getattr(model_manager, method), **kwargs)
+  return getattr(model_manager, method)(**kwargs)
+
+
+def _call_in_worker(method: str, kwargs: Dict[str, Any], profile: bool = False) -> Tuple[Any, Dict[str, Any]]:
+  """Run a ModelManager method in a pool process and return its metric increments with the result"""
+  result = _call_model_manager(method, kwargs, profile)
+  return result, drain_worker_metrics()
+
+
+class InferenceExecutor:
+  """Bounded thread or process pool for model inference"""
+
+  def __init__(
+    self,
+    kind: str = INFERENCE_EXECUTOR,
+    max_workers: int = INFERENCE_WORKERS,
+    max_queue: int = INFERENCE_QUEUE_SIZE,
+    timeout: float = INFERENCE_TIMEOUT
+  ):
+    self.kind = kind
+    self.max_workers = max_workers
+    self.max_queue = max_queue
+    self.timeout = timeout
+    self._executor = self._create_executor()
+    self._lock = threading.Lock()
+
+    # Calls submitted to the pool and not yet finished (running + queued)
+    self.pending = 0
+    self.max_queue_depth = 0
+    self.submitted = 0
+    self.completed = 0
+    self.failed = 0
+    self.rejected = 0
+    self.timeouts = 0
+
+  def _create_executor(self) -> Executor:
+    """Create the underlying pool"""
+    if self.kind == "process":
+      # Spawned workers load their own ModelManager on first use
+      return ProcessPoolExecutor(
+        max_workers=self.max_workers,
+        mp_context=multiprocessing.get_context("spawn")
+      )
+    return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+
+  async def run(self, method: str, **kwargs) -> Any:
+    """
+    Run model_manager.<method>(**kwargs) in the pool
+
+    Raises InferenceQueueFull when every worker is busy and the queue is
+    full, and InferenceTimeout when the call takes longer than the timeout.
+    """
+    with self._lock:
+      if self.pending >= self.max_workers + self.max_queue:
+        self.rejected += 1
+        raise InferenceQueueFull(
+          f"Inference queue is full ({self.max_queue} waiting requests)"
+        )
+      self.pending += 1
+      self.submitted += 1
+      self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    try:
+      profile = should_profile()
+      if self.kind == "thread" and current_timer() is not None:
+        # Carry the request's stage timer into the worker thread
+        future = self._executor.submit(
+          contextvars.copy_context().run, _call_model_manager, method, kwargs, profile
+        )
+      elif self.kind == "process":
+        future = self._executor.submit(_call_in_worker, method, kwargs, profile)
+      else:
+        future = self._executor.submit(_call_model_manager, method, kwargs, profile)
+    except Exception:
+      with self._lock:
+        self.pending -= 1
+      raise
+    # The slot is released when the work finishes, even after a timeout,
+    # so the queue bound reflects what the pool is really doing
+    future.add_done_callback(self._on_done)
+
+    try:
+      result = await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+    except asyncio.TimeoutError:
+      with self._lock:
+        self.timeouts += 1
+      raise InferenceTimeout(f"Inference did not finish within {self.timeout:.1f}s")
+    return result[0] if self.kind == "process" else result
+
+  def _on_done(self, future):
+    """Release a pool slot, count the outcome and merge a worker's metrics"""
+    with self._lock:
+      self.pending -= 1
+      if future.cancelled() or future.exception() is not None:
+        self.failed += 1
+        return
+      self.completed += 1
+    if self.kind == "process":
+      # Merged here rather than in run() so calls that timed out still count
+      merge_worker_metrics(future.result()[1])
+
+  @property
+  def queue_depth(self) -> int:
+    """Calls waiting for a free worker"""
+    return max(0, self.pending - self.max_workers)
+
+  def restart(self):
+    """
+    Replace the pool with a fresh one
+
+    Process workers hold their own copy of the models, so they are
+    recycled after a reload; in-flight calls finish on the old pool.
+    """
+    if self.kind != "process":
+      return
+    old_executor, self._executor = self._executor, self._create_executor()
+    old_executor.shutdown(wait=False)
+    logger.info("Restarted inference process pool")
+
+  def shutdown(self):
+    """Stop the pool"""
+    self._executor.shutdown(wait=False, cancel_futures=True)
+
+  def stats(self) -> Dict[str, Any]:
+    """Get pool configuration and queue-depth metrics"""
+    with self._lock:
+      return {
+        "executor": self.kind,
+        "max_workers": self.max_workers,
+        "max_queue": self.max_queue,
+        "timeout_seconds": self.timeout,
+        "in_flight": min(self.pending, self.max_workers),
+        "queue_depth": self.queue_depth,
+        "max_queue_depth": self.max_queue_depth,
+        "submitted": self.submitted,
+        "completed": self.completed,
+        "failed": self.failed,
+        "rejected": self.rejected,
+        "timeouts": self.timeouts
+      }
+
+
+# Global inference executor instance
+inference_executor = InferenceExecutor()
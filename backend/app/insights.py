@@ -0,0 +1,343 @@
+"""
+Market Insights
+Seasonal index, volatility, year-over-year change and arrival/price
+elasticity per (city, variety), precomputed from the dataset so that
+/api/insights is a dictionary lookup
+"""
+import calendar
+import csv
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.dataset_format import is_columnar, iter_dataset
+
+if TYPE_CHECKING:
+  import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+STAT_KEYS = ["city", "variety", "year", "month"]
+USED_COLUMNS = STAT_KEYS + ["price", "arrivals"]
+# Rows parsed at a time while building the sufficient statistics
+READ_CHUNK_ROWS = 200_000
+# Bytes before the last read offset compared to tell an append from a rewrite
+TAIL_BYTES = 256
+
+# Thresholds for turning the statistics into sentences
+SEASONAL_NOTE_PCT = 3.0
+HIGH_VOLATILITY = 0.15
+YOY_ALERT_PCT = 10.0
+STRONG_ELASTICITY = -0.3
+MIN_SAMPLES = 3
+
+
+def _sufficient_stats(df: "pd.DataFrame") -> "pd.DataFrame":
+  """
+  Additive sums per (city, variety, year, month)
+
+  Means, variances and the log-log regression slope can all be derived
+  from these sums, and sums over appended rows are simply added on.
+  """
+  import pandas as pd
+
+  df = df[USED_COLUMNS].dropna()
+  df = df[(df["price"] > 0) & (df["arrivals"] > 0)]
+  price = df["price"].to_numpy(dtype=np.float64)
+  log_arrivals = np.log(df["arrivals"].to_numpy(dtype=np.float64))
+  log_price = np.log(price)
+  frame = pd.DataFrame({
+    "city": df["city"].astype(str).to_numpy(),
+    "variety": df["variety"].astype(str).to_numpy(),
+    "year": df["year"].astype(int).to_numpy(),
+    "month": df["month"].astype(int).to_numpy(),
+    "n": 1.0,
+    "p": price,
+    "p2": price ** 2,
+    "x": log_arrivals,
+    "y": log_price,
+    "x2": log_arrivals ** 2,
+    "xy": log_arrivals * log_price
+  })
+  return frame.groupby(STAT_KEYS).sum()
+
+
+def _read_stats(source, **read_kwargs) -> Tuple[Optional["pd.DataFrame"], int]:
+  """Sufficient statistics of a CSV source, parsed chunk by chunk"""
+  import pandas as pd
+
+  return _chunk_stats(pd.read_csv(source, chunksize=READ_CHUNK_ROWS, **read_kwargs))
+
+
+def _chunk_stats(chunks) -> Tuple[Optional["pd.DataFrame"], int]:
+  """Sufficient statistics summed over DataFrame chunks"""
+  total = None
+  rows = 0
+  for chunk in chunks:
+    rows += len(chunk)
+    stats = _sufficient_stats(chunk)
+    total = stats if total is None else total.add(stats, fill_value=0)
+  return total, rows
+
+
+def _finite(value: Any) -> Optional[float]:
+  value = float(value)
+  return value if math.isfinite(value) else None
+
+
+def _moments(sums: "pd.DataFrame") -> Tuple["pd.Series", "pd.Series"]:
+  """Mean price and coefficient of variation from the sums"""
+  mean = sums["p"] / sums["n"]
+  variance = (sums["p2"] / sums["n"] - mean ** 2).clip(lower=0)
+  return mean, np.sqrt(variance) / mean
+
+
+def _aggregate(stats: "pd.DataFrame") -> Dict[Tuple[str, str], Dict[str, Any]]:
+  """Per (city, variety) insight statistics from the sufficient statistics"""
+  months = list(range(1, 13))
+  by_pair = stats.groupby(level=["city", "variety"]).sum()
+  by_month = stats.groupby(level=["city", "variety", "month"]).sum()
+  by_year = stats.groupby(level=["city", "variety", "year"]).sum()
+
+  mean, volatility = _moments(by_pair)
+  month_mean, month_volatility = _moments(by_month)
+  month_mean = month_mean.unstack("month").reindex(columns=months)
+  month_volatility = month_volatility.unstack("month").reindex(columns=months)
+  # Ratio to the average of the monthly means, so uneven month coverage
+  # does not tilt the index towards the best-sampled months
+  seasonal_index = month_mean.div(month_mean.mean(axis=1), axis=0) * 100
+  year_mean = (by_year["p"] / by_year["n"]).unstack("year")
+
+  n = by_pair["n"]
+  denominator = n * by_pair["x2"] - by_pair["x"] ** 2
+  elasticity = (n * by_pair["xy"] - by_pair["x"] * by_pair["y"]) / denominator
+  elasticity = elasticity.where((n >= MIN_SAMPLES) & (denominator > 1e-9))
+
+  aggregates = {}
+  for pair in by_pair.index:
+    index = seasonal_index.loc[pair]
+    years = year_mean.loc[pair].dropna()
+    yoy = None
+    if len(years) >= 2:
+      yoy = _finite((years.iloc[-1] / years.iloc[-2] - 1) * 100)
+    aggregates[pair] = {
+      "samples": int(n[pair]),
+      "mean_price": float(mean[pair]),
+      "volatility": float(volatility[pair]),
+      "seasonal_index": [_finite(value) for value in index],
+      "monthly_mean_price": [_finite(value) for value in month_mean.loc[pair]],
+      "monthly_volatility": [_finite(value) for value in month_volatility.loc[pair]],
+      "peak_month": int(index.idxmax()) if index.notna().any() else None,
+      "trough_month": int(index.idxmin()) if index.notna().any() else None,
+      "latest_year": int(years.index[-1]) if len(years) else None,
+      "previous_year": int(years.index[-2]) if len(years) >= 2 else None,
+      "yoy_change_pct": yoy,
+      "elasticity": _finite(elasticity[pair])
+    }
+  return aggregates
+
+
+class MarketAggregates:
+  """Immutable snapshot of the insight statistics for one dataset version"""
+
+  def __init__(self, pairs: Dict[Tuple[str, str], Dict[str, Any]], rows: int, mode: str, build_ms: float):
+    self.pairs = pairs
+    self.rows = rows
+    self.mode = mode
+    self.build_ms = build_ms
+    self.built_at = datetime.now().isoformat()
+
+
+class InsightStore:
+  """
+  Insight statistics kept in sync with the dataset file
+
+  Rows appended to the file are parsed on their own and added to the
+  stored sums; any other change rebuilds the sums from the whole file.
+  """
+
+  def __init__(self):
+    self._aggregates = MarketAggregates({}, 0, "empty", 0.0)
+    self._stats: Optional["pd.DataFrame"] = None
+    self._rows = 0
+    # Where the last read stopped: (inode, header line, offset, bytes before offset)
+    self._position: Optional[Tuple[int, bytes, int, bytes]] = None
+    self._lock = threading.Lock()
+
+  def _appended_from(self, path: Path) -> Optional[int]:
+    """Offset to continue reading from if the file only grew since the last read"""
+    if self._position is None:
+      return None
+    inode, header, offset, tail = self._position
+    with open(path, "rb") as f:
+      stat = os.fstat(f.fileno())
+      if stat.st_ino != inode or stat.st_size < offset or f.readline() != header:
+        return None
+      f.seek(offset - len(tail))
+      return offset if f.read(len(tail)) == tail else None
+
+  def refresh(self, path: Path):
+    """Update the statistics after the dataset changed (DatasetMonitor listener)"""
+    with self._lock:
+      start = time.perf_counter()
+      if not path.exists():
+        self._stats, self._rows, self._position = None, 0, None
+        self._aggregates = MarketAggregates({}, 0, "empty", 0.0)
+        logger.info("⚠ Dataset not found, market insights cleared")
+        return
+
+      if is_columnar(path):
+        # Columnar files are rewritten as a whole, so there is no append mode
+        self._position = None
+        self._stats, self._rows = _chunk_stats(iter_dataset(path, USED_COLUMNS, READ_CHUNK_ROWS))
+        self._publish("full", start)
+        return
+
+      offset = self._appended_from(path)
+      with open(path, "rb") as f:
+        header = f.readline()
+        if offset is None:
+          mode = "full"
+          f.seek(0)
+          stats, rows = _read_stats(f, usecols=USED_COLUMNS)
+        else:
+          mode = "append"
+          stats, rows = self._stats, self._rows
+          f.seek(offset)
+          if f.read(1):
+            names = next(csv.reader([header.decode("utf-8-sig")]))
+            f.seek(offset)
+            appended, appended_rows = _read_stats(f, header=None, names=names, usecols=USED_COLUMNS)
+            if appended is not None:
+              stats = appended if stats is None else stats.add(appended, fill_value=0)
+            rows += appended_rows
+        end = f.seek(0, os.SEEK_END)
+        f.seek(max(0, end - TAIL_BYTES))
+        self._position = (os.fstat(f.fileno()).st_ino, header, end, f.read())
+
+      self._stats, self._rows = stats, rows
+      self._publish(mode, start)
+
+  def _publish(self, mode: str, start: float):
+    """Swap in aggregates built from the current statistics (lock held)"""
+    pairs = _aggregate(self._stats) if self._stats is not None else {}
+    build_ms = round((time.perf_counter() - start) * 1000, 2)
+    self._aggregates = MarketAggregates(pairs, self._rows, mode, build_ms)
+    logger.info(f"✓ Market insights refreshed ({mode}): {self._rows:,} rows, {len(pairs)} markets in {build_ms:.0f}ms")
+
+  def lookup(self, city: str, variety: str) -> Optional[Dict[str, Any]]:
+    """Statistics for one market, or None without data"""
+    return self._aggregates.pairs.get((city, variety))
+
+  def status(self) -> Dict[str, Any]:
+    aggregates = self._aggregates
+    return {
+      "rows": aggregates.rows,
+      "markets": len(aggregates.pairs),
+      "mode": aggregates.mode,
+      "build_ms": aggregates.build_ms,
+      "built_at": aggregates.built_at
+    }
+
+  def insights(self, city: str, variety: str, month: int) -> Dict[str, Any]:
+    """Insight sentences, risk alerts and the statistics behind them"""
+    stats = self.lookup(city, variety)
+    if stats is None:
+      return {
+        "insights": [f"No historical data for {variety} in {city} yet."],
+        "risk_alerts": [],
+        "trend_summary": (
+          f"Not enough history to assess {variety} prices in {city}. "
+          "Upload or generate a dataset covering this market."
+        ),
+        "statistics": None
+      }
+
+    month_name = calendar.month_name[month]
+    insights: List[str] = []
+    risk_alerts: List[str] = []
+
+    index = stats["seasonal_index"][month - 1]
+    month_volatility = stats["monthly_volatility"][month - 1]
+    if index is not None:
+      deviation = index - 100
+      if abs(deviation) >= SEASONAL_NOTE_PCT:
+        direction = "above" if deviation > 0 else "below"
+        insights.append(
+          f"{variety} prices in {city} in {month_name} average {abs(deviation):.1f}% "
+          f"{direction} the yearly norm (seasonal index {index:.0f})."
+        )
+      else:
+        insights.append(f"{month_name} prices for {variety} in {city} are close to the yearly norm.")
+    if stats["peak_month"] is not None:
+      insights.append(
+        f"Prices typically peak in {calendar.month_name[stats['peak_month']]} and are "
+        f"lowest in {calendar.month_name[stats['trough_month']]}."
+      )
+
+    if stats["yoy_change_pct"] is not None:
+      change = stats["yoy_change_pct"]
+      insights.append(
+        f"Average prices in {stats['latest_year']} were {abs(change):.1f}% "
+        f"{'higher' if change >= 0 else 'lower'} than in {stats['previous_year']}."
+      )
+      if abs(change) >= YOY_ALERT_PCT:
+        risk_alerts.append(
+          f"Price Shift Alert: {abs(change):.1f}% year-over-year "
+          f"{'increase' if change >= 0 else 'decrease'} for {variety} in {city}."
+        )
+
+    if stats["elasticity"] is not None:
+      elasticity = stats["elasticity"]
+      insights.append(
+        f"Historically a 10% rise in arrivals has moved prices by {elasticity * 10:+.1f}%."
+      )
+      if elasticity <= STRONG_ELASTICITY:
+        risk_alerts.append(
+          "Supply Alert: prices are highly sensitive to arrivals in this market. "
+          "Watch arrival volumes closely."
+        )
+
+    volatility = month_volatility if month_volatility is not None else stats["volatility"]
+    if volatility >= HIGH_VOLATILITY:
+      risk_alerts.append(
+        f"Volatility Alert: {month_name} prices vary by {volatility:.0%} around their average."
+      )
+
+    trend = "rising" if (stats["yoy_change_pct"] or 0) > 0 else "falling"
+    if stats["yoy_change_pct"] is None or abs(stats["yoy_change_pct"]) < 1:
+      trend = "stable"
+    trend_summary = (
+      f"Based on {stats['samples']:,} historical records, {variety} prices in {city} average "
+      f"₹{stats['mean_price']:,.0f} with {stats['volatility']:.0%} volatility and a {trend} "
+      f"year-over-year trend."
+    )
+
+    return {
+      "insights": insights,
+      "risk_alerts": risk_alerts,
+      "trend_summary": trend_summary,
+      "statistics": {
+        "samples": stats["samples"],
+        "mean_price": round(stats["mean_price"], 2),
+        "volatility": round(stats["volatility"], 4),
+        "seasonal_index": None if index is None else round(index, 2),
+        "month_volatility": None if month_volatility is None else round(month_volatility, 4),
+        "peak_month": stats["peak_month"],
+        "trough_month": stats["trough_month"],
+        "latest_year": stats["latest_year"],
+        "yoy_change_pct": None if stats["yoy_change_pct"] is None else round(stats["yoy_change_pct"], 2),
+        "elasticity": None if stats["elasticity"] is None else round(stats["elasticity"], 4)
+      }
+    }
+
+
+# Global insight store instance
+insight_store = InsightStore()
@@ -0,0 +1,74 @@
+"""
+Prediction Intervals
+Per-prediction price intervals: quantiles across the trees of a random
+forest, or held-out residual quantiles (binned by predicted price) for
+models without a per-tree distribution
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.tree_engine import CompiledTreeEnsemble, RoutedModel
+
+# Residual quantiles are stored on this percentile grid, so the serving
+# coverage can be changed without retraining
+PERCENTILES = np.linspace(0, 100, 101)
+
+
+def leaf_model(model: Any) -> Optional[Any]:
+  """The model if it can return per-tree outputs of an averaging ensemble, else None"""
+  compiled = model.compiled if isinstance(model, RoutedModel) else model
+  if isinstance(compiled, CompiledTreeEnsemble) and compiled.aggregation == "mean":
+    return model
+  return None
+
+
+def tree_quantiles(leaves: np.ndarray, coverage: float) -> Tuple[np.ndarray, np.ndarray]:
+  """Lower and upper quantiles across trees of an (n_rows, n_trees) array"""
+  alpha = (1 - coverage) / 2
+  lower, upper = np.quantile(leaves, [alpha, 1 - alpha], axis=1)
+  return lower, upper
+
+
+def residual_quantile_bins(predictions: np.ndarray, actuals: np.ndarray, n_bins: int = 10) -> Dict[str, Any]:
+  """
+  Residual percentiles per predicted-price bin (computed at training time)
+
+  Bins are equal-count ranges of the held-out predictions, so intervals
+  can widen or narrow with the price level.
+  """
+  predictions = np.asarray(predictions, dtype=np.float64)
+  residuals = np.asarray(actuals, dtype=np.float64) - predictions
+  edges = np.unique(np.quantile(predictions, np.linspace(0, 1, n_bins + 1)))
+  if len(edges) < 2:
+    edges = np.array([predictions.min(), predictions.max()])
+  bins = np.clip(np.searchsorted(edges[1:-1], predictions, "right"), 0, len(edges) - 2)
+
+  percentiles = []
+  for index in range(len(edges) - 1):
+    in_bin = residuals[bins == index]
+    # An empty bin falls back to the residuals of the whole test set
+    percentiles.append(np.percentile(in_bin if len(in_bin) else residuals, PERCENTILES).tolist())
+  return {"edges": edges.tolist(), "percentiles": percentiles, "samples": int(len(residuals))}
+
+
+class ResidualIntervals:
+  """Interval offsets per predicted-price bin for one coverage level"""
+
+  def __init__(self, edges: List[float], percentiles: List[List[float]], coverage: float):
+    self.edges = np.asarray(edges, dtype=np.float64)
+    grid = np.asarray(percentiles, dtype=np.float64)
+    alpha = (1 - coverage) / 2 * 100
+    self.lower = np.array([np.interp(alpha, PERCENTILES, row) for row in grid])
+    self.upper = np.array([np.interp(100 - alpha, PERCENTILES, row) for row in grid])
+
+  def bounds(self, predictions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Lower and upper bounds around raw predictions"""
+    bins = np.clip(np.searchsorted(self.edges[1:-1], predictions, "right"), 0, len(self.lower) - 1)
+    return predictions + self.lower[bins], predictions + self.upper[bins]
+
+
+def interval_confidence(prices: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+  """Percent confidence: 100 minus the interval half-width as a % of the price"""
+  half_width = (upper - lower) / 2
+  return np.clip(100 * (1 - half_width / np.maximum(prices, 1e-9)), 0, 100)
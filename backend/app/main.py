@@ -2,22 +2,63 @@
 AgriAI Backend - FastAPI Application
 Main entry point for the API server
 """
-from fastapi import FastAPI, HTTPException
+# Imported first so the startup report covers the imports below
+from app.startup import startup_report
+
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from typing import Optional
 from datetime import datetime
 import logging
+import time
+
+startup_report.mark("import_framework")
 
-from app.config import ALLOWED_ORIGINS, AVAILABLE_MODELS
+from app.config import (
+  ALLOWED_ORIGINS,
+  AVAILABLE_MODELS,
+  MAX_BATCH_SIZE,
+  MAX_FORECAST_POINTS,
+  HISTORY_PAGE_SIZE,
+  HISTORY_MAX_PAGE_SIZE,
+  DEBUG_TIMING_ENABLED,
+  BULK_CHUNK_SIZE,
+  ensure_directories
+)
 from app.models import (
   PredictionRequest,
   PredictionResponse,
+  BatchPredictionRequest,
+  BatchPredictionItem,
+  BatchPredictionResponse,
+  ForecastRequest,
+  ForecastResponse,
   InsightResponse,
+  HistoryResponse,
   ModelPerformance,
   HealthResponse
 )
 from app.ml_models import model_manager
+from app.inference import inference_executor, InferenceQueueFull, InferenceTimeout
+from app.batching import micro_batcher
+from app.metrics import registry, MetricsMiddleware, MODEL_REQUEST_LATENCY
+from app.profiling import ProfilingMiddleware, checkpoint
+from app.bulk import (
+  BulkInputError,
+  ScenarioParser,
+  UploadStreamingResponse,
+  iter_lines,
+  score_stream
+)
+from app.dataset import dataset_monitor
+from app.insights import insight_store
+from app.history import history_store, HistoryQueryError
 from app.admin_routes import router as admin_router
 
+startup_report.mark("import_app")
+
 # Configure logging
 logging.basicConfig(
   level=logging.INFO,
@@ -25,13 +66,38 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+  """Create directories, load models and dataset views before serving, stop the pool on exit"""
+  with startup_report.phase("ensure_directories"):
+    ensure_directories()
+  
+  # Already done when a pre-fork parent loaded the models before forking
+  with startup_report.phase("load_models"):
+    model_manager.ensure_loaded()
+  
+  # Likewise for the insight statistics and price history
+  if dataset_monitor.version == 0:
+    with startup_report.phase("load_dataset_views"):
+      dataset_monitor.refresh()
+  
+  startup_report.ready()
+  logger.info(f"✓ Startup complete in {startup_report.summary()}")
+  
+  yield
+  
+  inference_executor.shutdown()
+
+
 # Create FastAPI app
 app = FastAPI(
   title="AgriAI Backend API",
   description="AI-powered agricultural price prediction API",
   version="1.0.0",
   docs_url="/docs",
-  redoc_url="/redoc"
+  redoc_url="/redoc",
+  lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -43,6 +109,39 @@ app.add_middleware(
   allow_headers=["*"],
 )
 
+# Opt-in stage timings (X-Debug-Timing header or ?debug_timing=1)
+if DEBUG_TIMING_ENABLED:
+  app.add_middleware(ProfilingMiddleware)
+
+# Count and time every request per route
+app.add_middleware(MetricsMiddleware)
+
+# Scrape-time gauges for the caches and the inference queue
+registry.gauge(
+  "agriai_prediction_cache_size", "Entries in the prediction cache",
+  lambda: model_manager.cache.stats()["size"] if model_manager.cache else 0
+)
+registry.gauge(
+  "agriai_prediction_cache_hit_rate", "Prediction cache hit rate",
+  lambda: model_manager.cache.stats()["hit_rate"] if model_manager.cache else 0
+)
+registry.gauge(
+  "agriai_inference_queue_depth", "Inference calls waiting for a worker",
+  lambda: inference_executor.queue_depth
+)
+registry.gauge(
+  "agriai_models_loaded", "Models currently loaded in memory",
+  lambda: len(model_manager.get_loaded_models())
+)
+
+# Views derived from the dataset are refreshed whenever it changes
+dataset_monitor.subscribe(insight_store.refresh)
+dataset_monitor.subscribe(history_store.refresh)
+
+# Models retrained through another worker are reloaded by poll(); process
+# pool workers hold their own copy and are recycled after the swap
+model_manager.subscribe(lambda version: inference_executor.restart())
+
 # Include admin routes
 app.include_router(admin_router)
 
@@ -59,14 +158,25 @@ async def root():
   }
 
 
+@app.get("/metrics", response_class=PlainTextResponse, tags=["Health"])
+async def metrics():
+  """Prometheus metrics in the text exposition format"""
+  return PlainTextResponse(
+    registry.render(),
+    media_type="text/plain; version=0.0.4; charset=utf-8"
+  )
+
+
 @app.get("/health", response_model=HealthResponse, tags=["Health"])
 async def health_check():
   """Health check endpoint"""
   loaded_models = model_manager.get_loaded_models()
+  # In lazy mode models that are on disk but not yet loaded still count
+  available_models = model_manager.get_available_models()
   
   return HealthResponse(
-    status="healthy" if loaded_models else "degraded",
-    message="API is running" if loaded_models else "API running with mock predictions",
+    status="healthy" if available_models else "degraded",
+    message="API is running" if available_models else "API running with mock predictions",
     models_loaded=loaded_models,
     timestamp=datetime.now()
   )
@@ -92,12 +202,22 @@ async def predict_price(request: PredictionRequest):
   
   Returns:
   - predicted_price: Predicted price per quintal in ₹
-  - confidence: Prediction confidence percentage
+  - confidence: Prediction confidence percentage (from the interval width)
+  - lower_bound / upper_bound: Prediction interval in ₹
+  - interval_coverage / interval_method: Nominal coverage and how it was computed
   - model_used: ML model used for prediction
   - accuracy: Model accuracy percentage
   - mae: Mean Absolute Error
   - r2_score: R² Score
+  
+  With DEBUG_TIMING_ENABLED, send an "X-Debug-Timing: 1" header (or
+  ?debug_timing=1) to get a stage-by-stage breakdown in the Server-Timing
+  response header.
   """
+  # Body parsing and PredictionRequest validation happen before this point
+  checkpoint("validation")
+  # Pick up models retrained or reloaded through another worker
+  model_manager.poll()
   
   # Validate model
   if request.model not in AVAILABLE_MODELS:
@@ -106,44 +226,288 @@ async def predict_price(request: PredictionRequest):
       detail=f"Invalid model. Available models: {list(AVAILABLE_MODELS.keys())}"
     )
   
+  start = time.perf_counter()
   try:
-    # Make prediction
-    result = model_manager.predict(
-      model_key=request.model,
-      year=request.year,
-      month=request.month,
-      city=request.city,
-      variety=request.variety,
-      arrivals=request.arrivals,
-      rainfall=request.rainfall,
-      temperature=request.temperature
-    )
+    if micro_batcher is not None:
+      # Coalesce with concurrent requests into one vectorized call
+      result = await micro_batcher.predict(request.model_dump())
+      if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    else:
+      # Make prediction off the event loop
+      result = await inference_executor.run(
+        "predict",
+        model_key=request.model,
+        year=request.year,
+        month=request.month,
+        city=request.city,
+        variety=request.variety,
+        arrivals=request.arrivals,
+        rainfall=request.rainfall,
+        temperature=request.temperature
+      )
     
-    logger.info(
-      f"Prediction: {request.city} {request.variety} "
-      f"{request.year}-{request.month:02d} = ₹{result['predicted_price']:.2f}"
+    MODEL_REQUEST_LATENCY.observe(
+      time.perf_counter() - start, endpoint="predict", model=request.model
+    )
+    checkpoint("inference")
+    logger.debug(
+      "Prediction: %s %s %d-%02d = ₹%.2f", request.city, request.variety,
+      request.year, request.month, result["predicted_price"]
     )
     
     return PredictionResponse(
       predicted_price=result["predicted_price"],
       confidence=result["confidence"],
+      lower_bound=result["lower_bound"],
+      upper_bound=result["upper_bound"],
+      interval_coverage=result["interval_coverage"],
+      interval_method=result["interval_method"],
       model_used=result["model_used"],
       accuracy=result["accuracy"],
       mae=result["mae"],
       r2_score=result["r2_score"],
+      model_version=result["model_version"],
       timestamp=datetime.now()
     )
   
+  except HTTPException:
+    raise
+  except InferenceQueueFull as e:
+    raise HTTPException(status_code=503, detail=str(e))
+  except InferenceTimeout as e:
+    raise HTTPException(status_code=504, detail=str(e))
   except Exception as e:
     logger.error(f"Prediction error: {e}")
     raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
 
+@app.post("/api/predict/batch", response_model=BatchPredictionResponse, tags=["Prediction"])
+async def predict_price_batch(request: BatchPredictionRequest):
+  """
+  Predict chilli prices for many scenarios in one call
+  
+  Each scenario takes the same fields as /api/predict. Scenarios are encoded
+  into one feature matrix and scored with a single predict call per model.
+  
+  Returns:
+  - results: One entry per scenario, in request order, with either a
+    prediction or an error message
+  - total / succeeded / failed: Batch summary counts
+  """
+  checkpoint("validation")
+  model_manager.poll()
+  
+  if len(request.scenarios) > MAX_BATCH_SIZE:
+    raise HTTPException(
+      status_code=400,
+      detail=f"Too many scenarios. Maximum batch size is {MAX_BATCH_SIZE}"
+    )
+  
+  start = time.perf_counter()
+  try:
+    results = await inference_executor.run(
+      "predict_batch",
+      scenarios=[scenario.model_dump() for scenario in request.scenarios]
+    )
+  except InferenceQueueFull as e:
+    raise HTTPException(status_code=503, detail=str(e))
+  except InferenceTimeout as e:
+    raise HTTPException(status_code=504, detail=str(e))
+  except Exception as e:
+    logger.error(f"Batch prediction error: {e}")
+    raise HTTPException(status_code=500, detail=f"Batch prediction failed: {str(e)}")
+  
+  timestamp = datetime.now()
+  items = []
+  for index, result in enumerate(results):
+    if "error" in result:
+      items.append(BatchPredictionItem(index=index, error=result["error"]))
+    else:
+      items.append(BatchPredictionItem(
+        index=index,
+        prediction=PredictionResponse(timestamp=timestamp, **result)
+      ))
+  
+  models = {scenario.model for scenario in request.scenarios}
+  MODEL_REQUEST_LATENCY.observe(
+    time.perf_counter() - start,
+    endpoint="predict_batch",
+    model=models.pop() if len(models) == 1 else "mixed"
+  )
+  checkpoint("inference")
+  
+  failed = sum(1 for item in items if item.error is not None)
+  logger.debug("Batch prediction: %d scenarios, %d failed", len(items), failed)
+  
+  return BatchPredictionResponse(
+    results=items,
+    total=len(items),
+    succeeded=len(items) - failed,
+    failed=failed
+  )
+
+
+@app.post("/api/predict/stream", tags=["Prediction"])
+async def predict_price_stream(
+  request: Request,
+  model: str = "random_forest",
+  input_format: Optional[str] = None,
+  output_format: Optional[str] = None,
+  chunk_size: int = BULK_CHUNK_SIZE
+):
+  """
+  Score a CSV or NDJSON upload of scenarios and stream the results back
+  
+  The request body is the raw file (not multipart). It is read and scored
+  in chunks of chunk_size rows, each with one vectorized predict call, and
+  results are streamed while later chunks are still being uploaded, so
+  memory stays bounded for any file size.
+  
+  Parameters:
+  - model: ML model to use for every row
+  - input_format: csv or ndjson (default: from Content-Type, else csv)
+  - output_format: ndjson or csv (default: csv if Accept is text/csv, else ndjson)
+  - chunk_size: Rows per scoring call
+  
+  Input columns: city, variety, month (required) and arrivals, rainfall,
+  temperature (optional, defaults apply). CSV input needs a header row.
+  
+  Returns one record per input row, in input order, with the row number,
+  the scenario and predicted_price, or an error for rows that could not
+  be scored.
+  """
+  if model not in AVAILABLE_MODELS:
+    raise HTTPException(
+      status_code=400,
+      detail=f"Invalid model. Available models: {list(AVAILABLE_MODELS.keys())}"
+    )
+  
+  if not 1 <= chunk_size <= MAX_BATCH_SIZE:
+    raise HTTPException(
+      status_code=400,
+      detail=f"chunk_size must be between 1 and {MAX_BATCH_SIZE}"
+    )
+  
+  content_type = request.headers.get("content-type", "")
+  if input_format is None:
+    input_format = "ndjson" if "json" in content_type else "csv"
+  if output_format is None:
+    output_format = "csv" if "text/csv" in request.headers.get("accept", "") else "ndjson"
+  if input_format not in ("csv", "ndjson") or output_format not in ("csv", "ndjson"):
+    raise HTTPException(status_code=400, detail="Formats must be csv or ndjson")
+  
+  model_manager.poll()
+  parser = ScenarioParser(input_format)
+  lines = iter_lines(request.stream())
+  
+  # Read the CSV header up front so a bad upload still gets a 400
+  if input_format == "csv":
+    try:
+      # lines.__anext__() rather than the anext() builtin, which needs Python 3.10
+      try:
+        header = await lines.__anext__()
+      except StopAsyncIteration:
+        raise BulkInputError("Empty upload")
+      parser.read_header(header)
+    except (BulkInputError, UnicodeDecodeError) as e:
+      raise HTTPException(status_code=400, detail=f"Invalid CSV upload: {e}")
+  
+  media_type = "text/csv" if output_format == "csv" else "application/x-ndjson"
+  return UploadStreamingResponse(
+    score_stream(lines, parser, model, chunk_size, output_format),
+    media_type=media_type,
+    headers={"X-Model-Version": model_manager.model_version}
+  )
+
+
+@app.post("/api/forecast", response_model=ForecastResponse, tags=["Prediction"])
+async def forecast_prices(request: ForecastRequest):
+  """
+  Forecast a price grid for several cities, varieties and months
+  
+  The whole grid is scored with one vectorized predict call.
+  
+  Parameters:
+  - cities / varieties: Markets and chilli varieties to include
+  - start_year / start_month: First forecast month
+  - horizon: Number of months to forecast
+  - model: ML model to use (random_forest, xgboost, linear_regression)
+  - arrivals / rainfall / temperature: Covariates applied to every point
+  
+  Returns:
+  - periods: Forecast months (YYYY-MM)
+  - prices: Predicted prices indexed as [city][variety][period]
+  """
+  checkpoint("validation")
+  model_manager.poll()
+  
+  if request.model not in AVAILABLE_MODELS:
+    raise HTTPException(
+      status_code=400,
+      detail=f"Invalid model. Available models: {list(AVAILABLE_MODELS.keys())}"
+    )
+  
+  points = len(request.cities) * len(request.varieties) * request.horizon
+  if points > MAX_FORECAST_POINTS:
+    raise HTTPException(
+      status_code=400,
+      detail=(
+        f"Forecast grid too large ({points} points). "
+        f"Maximum cities x varieties x horizon is {MAX_FORECAST_POINTS}"
+      )
+    )
+  
+  start = time.perf_counter()
+  try:
+    result = await inference_executor.run(
+      "forecast_grid",
+      model_key=request.model,
+      cities=request.cities,
+      varieties=request.varieties,
+      start_year=request.start_year,
+      start_month=request.start_month,
+      horizon=request.horizon,
+      arrivals=request.arrivals,
+      rainfall=request.rainfall,
+      temperature=request.temperature
+    )
+  except InferenceQueueFull as e:
+    raise HTTPException(status_code=503, detail=str(e))
+  except InferenceTimeout as e:
+    raise HTTPException(status_code=504, detail=str(e))
+  except Exception as e:
+    logger.error(f"Forecast error: {e}")
+    raise HTTPException(status_code=500, detail=f"Forecast failed: {str(e)}")
+  
+  MODEL_REQUEST_LATENCY.observe(
+    time.perf_counter() - start, endpoint="forecast", model=request.model
+  )
+  checkpoint("inference")
+  logger.debug(
+    "Forecast: %d cities x %d varieties x %d months",
+    len(request.cities), len(request.varieties), request.horizon
+  )
+  
+  return ForecastResponse(
+    periods=result["periods"],
+    cities=result["cities"],
+    varieties=result["varieties"],
+    prices=result["prices"].tolist(),
+    model_used=result["model_used"],
+    accuracy=result["accuracy"],
+    mae=result["mae"],
+    r2_score=result["r2_score"],
+    model_version=result["model_version"],
+    timestamp=datetime.now()
+  )
+
+
 @app.get("/api/insights", response_model=InsightResponse, tags=["Insights"])
 async def get_insights(
   city: str = "Bangalore",
   variety: str = "Guntur",
-  month: int = 1
+  month: int = Query(1, ge=1, le=12)
 ):
   """
   Get AI-generated market insights and risk alerts
@@ -157,52 +521,57 @@ async def get_insights(
   - insights: List of market insights
   - risk_alerts: Risk and warning alerts
   - trend_summary: Overall trend summary
+  - statistics: Seasonal index, volatility, year-over-year change and
+    arrival/price elasticity the insights are based on
   """
+  # Statistics are precomputed per dataset version; a replaced dataset
+  # is picked up in the background while the previous version is served
+  dataset_monitor.poll()
+  return InsightResponse(**insight_store.insights(city, variety, month))
+
+
+@app.get("/api/history", response_model=HistoryResponse, tags=["History"])
+async def get_history(
+  city: Optional[str] = None,
+  variety: Optional[str] = None,
+  start_year: Optional[int] = None,
+  start_month: int = Query(1, ge=1, le=12),
+  end_year: Optional[int] = None,
+  end_month: int = Query(12, ge=1, le=12),
+  columns: Optional[str] = None,
+  offset: int = Query(0, ge=0),
+  limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE)
+):
+  """
+  Get historical prices from the dataset
   
-  # Generate insights based on seasonal patterns
-  insights = []
-  risk_alerts = []
-  
-  # Seasonal insights
-  if month in [12, 1, 2]:  # Winter
-    insights.append(
-      f"Winter season typically shows higher prices for {variety} in {city} "
-      "due to reduced supply and increased demand."
-    )
-  elif month in [6, 7, 8, 9]:  # Monsoon
-    insights.append(
-      f"Monsoon season may impact {variety} arrivals in {city}. "
-      "Expect price volatility due to weather conditions."
-    )
-    risk_alerts.append(
-      "Weather Alert: Heavy rainfall may affect transportation and supply chain."
-    )
-  
-  # Market-specific insights
-  if city in ["Bangalore", "Delhi", "Mumbai"]:
-    insights.append(
-      f"{city} is a major consumption market with consistent demand throughout the year."
-    )
+  Parameters:
+  - city, variety: Market filters (all markets if omitted)
+  - start_year, start_month, end_year, end_month: Inclusive date range
+  - columns: Comma-separated columns to return (all if omitted)
+  - offset, limit: Pagination
   
-  # Variety-specific insights
-  if variety == "Guntur":
-    insights.append(
-      "Guntur variety is highly sought after for its pungency and color, "
-      "commanding premium prices in export markets."
+  Returns:
+  - rows: One page of rows ordered by city, variety, year and month
+  - total: Number of matching rows
+  - next_offset: Offset of the next page, or null on the last page
+  """
+  dataset_monitor.poll()
+  try:
+    result = history_store.query(
+      city=city,
+      variety=variety,
+      start_year=start_year,
+      start_month=start_month,
+      end_year=end_year,
+      end_month=end_month,
+      columns=[column.strip() for column in columns.split(",") if column.strip()] if columns else None,
+      offset=offset,
+      limit=limit
     )
-  
-  # General trend
-  trend_summary = (
-    f"Based on historical patterns, {variety} prices in {city} "
-    f"are expected to remain stable with seasonal variations. "
-    f"Monitor arrivals and weather conditions for price movements."
-  )
-  
-  return InsightResponse(
-    insights=insights,
-    risk_alerts=risk_alerts,
-    trend_summary=trend_summary
-  )
+  except HistoryQueryError as e:
+    raise HTTPException(status_code=400, detail=str(e))
+  return HistoryResponse(**result)
 
 
 @app.get("/api/models", response_model=list[ModelPerformance], tags=["Models"])
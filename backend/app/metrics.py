@@ -0,0 +1,325 @@
+"""
+Lightweight Metrics
+Low-overhead, thread-safe instruments for hot-path instrumentation,
+exported in the Prometheus text format at /metrics
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+# Request and stage latencies in seconds
+LATENCY_BUCKETS = [
+  0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+  0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+]
+# Background job durations in seconds
+JOB_BUCKETS = [1, 5, 15, 30, 60, 120, 300, 600, 1200, 3600]
+
+
+class Histogram:
+  """Fixed-bucket histogram of observed values"""
+
+  def __init__(self, buckets: Sequence[float]):
+    self.buckets: List[float] = sorted(buckets)
+    # One extra slot for values above the largest bucket (+Inf)
+    self._counts = [0] * (len(self.buckets) + 1)
+    self._sum = 0.0
+    self._count = 0
+    self._lock = threading.Lock()
+
+  def observe(self, value: float):
+    """Record one observation"""
+    index = bisect.bisect_left(self.buckets, value)
+    with self._lock:
+      self._counts[index] += 1
+      self._sum += value
+      self._count += 1
+
+  def drain(self) -> Tuple[List[int], float, int]:
+    """Take the bucket counts, sum and count recorded so far and reset them"""
+    with self._lock:
+      state = (self._counts, self._sum, self._count)
+      self._counts = [0] * (len(self.buckets) + 1)
+      self._sum = 0.0
+      self._count = 0
+    return state
+
+  def merge(self, state: Tuple[List[int], float, int]):
+    """Add drained state from another process"""
+    counts, total, count = state
+    with self._lock:
+      for index, n in enumerate(counts):
+        self._counts[index] += n
+      self._sum += total
+      self._count += count
+
+  def _cumulative(self) -> Tuple[List[Tuple[float, int]], float, int]:
+    """Cumulative (upper bound, count) pairs plus sum and count"""
+    with self._lock:
+      counts = list(self._counts)
+      total, count = self._sum, self._count
+
+    cumulative = []
+    running = 0
+    for bound, bucket_count in zip(self.buckets + [float("inf")], counts):
+      running += bucket_count
+      cumulative.append((bound, running))
+    return cumulative, total, count
+
+  def snapshot(self) -> Dict[str, Any]:
+    """Get cumulative bucket counts, total count and sum"""
+    cumulative, total, count = self._cumulative()
+    return {
+      "buckets": {_format_bound(bound): n for bound, n in cumulative},
+      "count": count,
+      "sum": round(total, 6),
+      "mean": round(total / count, 6) if count else 0.0
+    }
+
+
+class Counter:
+  """Monotonic counter with optional labels"""
+
+  def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+    self.name = name
+    self.help = help
+    self.labels = tuple(labels)
+    self._values: Dict[Tuple[str, ...], float] = {}
+    self._lock = threading.Lock()
+
+  def inc(self, amount: float = 1, **labels):
+    """Increase the counter for a label set"""
+    key = tuple(str(labels[name]) for name in self.labels)
+    with self._lock:
+      self._values[key] = self._values.get(key, 0) + amount
+
+  def value(self, **labels) -> float:
+    """Current value for a label set"""
+    key = tuple(str(labels[name]) for name in self.labels)
+    return self._values.get(key, 0)
+
+  def drain(self) -> Dict[Tuple[str, ...], float]:
+    """Take the increments recorded so far and reset them"""
+    with self._lock:
+      values, self._values = self._values, {}
+    return values
+
+  def merge(self, values: Dict[Tuple[str, ...], float]):
+    """Add drained increments from another process"""
+    with self._lock:
+      for key, amount in values.items():
+        self._values[key] = self._values.get(key, 0) + amount
+
+  def render(self) -> List[str]:
+    lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+    with self._lock:
+      items = sorted(self._values.items())
+    for key, value in items:
+      lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}")
+    return lines
+
+
+class LabeledHistogram:
+  """Histogram family with one fixed-bucket Histogram per label set"""
+
+  def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+    self.name = name
+    self.help = help
+    self.labels = tuple(labels)
+    self.buckets = list(buckets)
+    self._children: Dict[Tuple[str, ...], Histogram] = {}
+    self._lock = threading.Lock()
+
+  def _child(self, labels: Dict[str, Any]) -> Histogram:
+    key = tuple(str(labels[name]) for name in self.labels)
+    child = self._children.get(key)
+    if child is None:
+      with self._lock:
+        child = self._children.setdefault(key, Histogram(self.buckets))
+    return child
+
+  def observe(self, value: float, **labels):
+    """Record one observation for a label set"""
+    self._child(labels).observe(value)
+
+  def drain(self) -> Dict[Tuple[str, ...], Tuple[List[int], float, int]]:
+    """Take every label set's observations recorded so far and reset them"""
+    with self._lock:
+      children = list(self._children.items())
+    return {key: child.drain() for key, child in children}
+
+  def merge(self, states: Dict[Tuple[str, ...], Tuple[List[int], float, int]]):
+    """Add drained observations from another process"""
+    for key, state in states.items():
+      self._child(dict(zip(self.labels, key))).merge(state)
+
+  @contextmanager
+  def time(self, **labels):
+    """Observe the duration of a with-block in seconds"""
+    start = time.perf_counter()
+    try:
+      yield
+    finally:
+      self._child(labels).observe(time.perf_counter() - start)
+
+  def render(self) -> List[str]:
+    lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+    with self._lock:
+      children = sorted(self._children.items())
+    for key, child in children:
+      cumulative, total, count = child._cumulative()
+      for bound, n in cumulative:
+        labels = _format_labels(self.labels + ("le",), key + (_format_bound(bound),))
+        lines.append(f"{self.name}_bucket{labels} {n}")
+      labels = _format_labels(self.labels, key)
+      lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+      lines.append(f"{self.name}_count{labels} {count}")
+    return lines
+
+
+class Gauge:
+  """Value read from a callback at scrape time"""
+
+  def __init__(self, name: str, help: str, read: Callable[[], float]):
+    self.name = name
+    self.help = help
+    self.read = read
+
+  def render(self) -> List[str]:
+    lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+    try:
+      lines.append(f"{self.name} {_format_value(float(self.read()))}")
+    except Exception:
+      pass  # A failing callback must not break the scrape
+    return lines
+
+
+class MetricsRegistry:
+  """Collection of metrics rendered together"""
+
+  def __init__(self):
+    self._metrics: Dict[str, Any] = {}
+
+  def register(self, metric):
+    self._metrics[metric.name] = metric
+    return metric
+
+  def gauge(self, name: str, help: str, read: Callable[[], float]) -> Gauge:
+    return self.register(Gauge(name, help, read))
+
+  def render(self) -> str:
+    """Prometheus text exposition of every registered metric"""
+    lines: List[str] = []
+    for metric in self._metrics.values():
+      lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def _format_bound(bound: float) -> str:
+  return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def _format_value(value: float) -> str:
+  return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+  if not names:
+    return ""
+  pairs = []
+  for name, value in zip(names, values):
+    escaped = value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    pairs.append(f'{name}="{escaped}"')
+  return "{" + ",".join(pairs) + "}"
+
+
+class MetricsMiddleware:
+  """
+  ASGI middleware counting requests and timing them per route
+
+  Requests are labelled with the matched route template (e.g.
+  /api/models/{model_name}) so path parameters do not create new series.
+  """
+
+  def __init__(self, app):
+    self.app = app
+
+  async def __call__(self, scope, receive, send):
+    if scope["type"] != "http":
+      await self.app(scope, receive, send)
+      return
+
+    start = time.perf_counter()
+    status = 500
+
+    async def send_wrapper(message):
+      nonlocal status
+      if message["type"] == "http.response.start":
+        status = message["status"]
+      await send(message)
+
+    try:
+      await self.app(scope, receive, send_wrapper)
+    finally:
+      # The router stores the matched route in the shared scope
+      route = scope.get("route")
+      path = getattr(route, "path", None) or "unmatched"
+      method = scope.get("method", "")
+      HTTP_LATENCY.observe(time.perf_counter() - start, method=method, path=path)
+      HTTP_REQUESTS.inc(method=method, path=path, status=status)
+
+
+# Global registry and the metrics recorded on the hot paths
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.register(Counter(
+  "agriai_http_requests_total", "HTTP requests by route and status",
+  ["method", "path", "status"]
+))
+HTTP_LATENCY = registry.register(LabeledHistogram(
+  "agriai_http_request_duration_seconds", "HTTP request latency by route",
+  ["method", "path"]
+))
+MODEL_REQUEST_LATENCY = registry.register(LabeledHistogram(
+  "agriai_model_request_duration_seconds",
+  "Inference latency per endpoint and model, including executor queueing",
+  ["endpoint", "model"]
+))
+PREDICTIONS = registry.register(Counter(
+  "agriai_predictions_total", "Predictions by model and source (model, table or mock)",
+  ["model", "source"]
+))
+PREDICTION_STAGE_LATENCY = registry.register(LabeledHistogram(
+  "agriai_prediction_stage_duration_seconds",
+  "ModelManager stage latency (encode, inference, clamp) by model and call type",
+  ["model", "call", "stage"]
+))
+MOCK_FALLBACKS = registry.register(Counter(
+  "agriai_mock_predictions_total", "Predictions served by the mock fallback",
+  ["model", "reason"]
+))
+CLAMP_EVENTS = registry.register(Counter(
+  "agriai_prediction_clamps_total", "Predictions clamped into the expected price range",
+  ["model", "direction"]
+))
+JOB_DURATION = registry.register(LabeledHistogram(
+  "agriai_admin_job_duration_seconds", "Duration of admin background jobs",
+  ["job", "outcome"], buckets=JOB_BUCKETS
+))
+
+# Recorded by ModelManager; process-pool workers drain these after every
+# call and the parent merges them, so /metrics covers both executor kinds
+WORKER_METRICS = [PREDICTIONS, PREDICTION_STAGE_LATENCY, MOCK_FALLBACKS, CLAMP_EVENTS]
+
+
+def drain_worker_metrics() -> Dict[str, Any]:
+  """Increments recorded by this process since the last drain"""
+  return {metric.name: metric.drain() for metric in WORKER_METRICS}
+
+
+def merge_worker_metrics(deltas: Dict[str, Any]):
+  """Apply increments drained in a worker process"""
+  for metric in WORKER_METRICS:
+    metric.merge(deltas.get(metric.name, {}))
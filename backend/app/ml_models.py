@@ -1,23 +1,197 @@
 """
 Machine Learning Model Management
 Handles loading, prediction, and model performance
+
+Models are loaded on first use (or by the server's startup hook), so
+importing this module does not unpickle anything or import sklearn/xgboost.
 """
-import joblib
 import numpy as np
+from collections import OrderedDict
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional, List, Tuple
+import hashlib
+import json
 import logging
+import threading
+import time
 
-from app.config import MODEL_PATH, AVAILABLE_MODELS
+from app.config import (
+  MODEL_PATH,
+  COMPILED_MODEL_PATH,
+  MODEL_ARTIFACT_FORMAT,
+  AVAILABLE_MODELS,
+  MODEL_LOAD_MODE,
+  MODEL_MEMORY_BUDGET_MB,
+  MODEL_CHECK_INTERVAL,
+  MODEL_BACKENDS,
+  COMPILED_MAX_ROWS,
+  PREDICTION_CACHE_SIZE,
+  PREDICTION_CACHE_TTL,
+  DEFAULT_ARRIVALS,
+  DEFAULT_RAINFALL,
+  DEFAULT_TEMPERATURE,
+  PRICE_TABLE_FILE,
+  INTERVALS_FILE,
+  PREDICTION_INTERVAL_COVERAGE
+)
+from app.cache import PredictionCache
+from app.metrics import PREDICTIONS, PREDICTION_STAGE_LATENCY, MOCK_FALLBACKS, CLAMP_EVENTS
+from app.profiling import current_timer
+from app.tree_engine import compile_model, check_parity, load_compiled, RoutedModel
+from app.intervals import leaf_model, tree_quantiles, ResidualIntervals, interval_confidence
 
 logger = logging.getLogger(__name__)
 
+# Expected price ranges for each variety (₹ per quintal) - match frontend realistic range
+EXPECTED_PRICE_RANGES = {
+  "Guntur": (20000, 30000),
+  "Teja": (20000, 30000),
+  "Byadgi": (20000, 30000),
+  "Kashmiri": (20000, 30000),
+  "Sannam": (20000, 30000),
+  "Wonder Hot": (20000, 30000),
+  "Pusa Jwala": (20000, 30000),
+  "Bhut Jolokia": (20000, 30000),
+  "Kanthari": (20000, 30000),
+  "Dhani": (20000, 30000),
+  "Reshampatti": (20000, 30000),
+  "Ellachipur": (20000, 30000)
+}
+DEFAULT_PRICE_RANGE = (20000, 30000)
+
+# Fallback metrics for models without recorded performance
+DEFAULT_PERFORMANCE = {
+  "accuracy": 95.0,
+  "mae": 2.0,
+  "rmse": 2.5,
+  "r2_score": 0.95,
+  "training_samples": 100000
+}
+
+
+def _estimate_model_size(model: Any, fallback: int) -> int:
+  """Estimate the resident size of a fitted model in bytes"""
+  # Tree ensembles: node and leaf-value arrays of every fitted tree
+  estimators = getattr(model, "estimators_", None)
+  if estimators is not None:
+    total = 0
+    for estimator in np.ravel(estimators):
+      tree = getattr(estimator, "tree_", None)
+      if tree is not None:
+        state = tree.__getstate__()
+        total += state["nodes"].nbytes + state["values"].nbytes
+    if total:
+      return total
+  
+  # XGBoost: the booster lives in native memory, its raw buffer is a close proxy
+  if hasattr(model, "get_booster"):
+    try:
+      return len(model.get_booster().save_raw())
+    except Exception:
+      return fallback
+  
+  # Anything else (e.g. linear models): sum of its array attributes
+  arrays = sum(
+    value.nbytes for value in vars(model).values() if isinstance(value, np.ndarray)
+  )
+  return arrays or fallback
+
+
+def _file_fingerprint(path: Path) -> str:
+  """Size and modification time of a file"""
+  stat = path.stat()
+  return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+# Resolved path -> ((inode, size, mtime), SHA-1) of files already hashed
+_content_hashes: Dict[str, Tuple[Tuple[int, int, int], str]] = {}
+
+
+def content_fingerprint(path: Path, chunk_size: int = 1 << 20) -> str:
+  """
+  SHA-1 of a file's bytes
+  
+  Ties the price table and interval calibration to the model file they
+  were built from; unlike size and mtime it survives copies, checkouts
+  and image builds. The hash is remembered per (inode, size, mtime), so
+  reloading unchanged files does not read them again.
+  """
+  stat = path.stat()
+  signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+  key = str(path.resolve())
+  cached = _content_hashes.get(key)
+  if cached is not None and cached[0] == signature:
+    return cached[1]
+  
+  digest = hashlib.sha1()
+  with open(path, "rb") as f:
+    for chunk in iter(lambda: f.read(chunk_size), b""):
+      digest.update(chunk)
+  fingerprint = digest.hexdigest()
+  _content_hashes[key] = (signature, fingerprint)
+  return fingerprint
+
+
+def _artifact_version(model_dir: Path) -> str:
+  """Fingerprint the model artifacts on disk (name, size and mtime)"""
+  digest = hashlib.sha1()
+  found = False
+  names = [f"{key}.pkl" for key in AVAILABLE_MODELS] + ["encoders.pkl", PRICE_TABLE_FILE, INTERVALS_FILE]
+  names += [f"compiled/{key}/meta.json" for key in AVAILABLE_MODELS]
+  for name in names:
+    path = model_dir / name
+    if path.exists():
+      digest.update(f"{name}:{_file_fingerprint(path)};".encode())
+      found = True
+  return digest.hexdigest()[:12] if found else "mock"
+
+
+class ModelSet:
+  """
+  One generation of loaded models and encoders
+  
+  ModelManager swaps whole ModelSets on reload, so a request that picked
+  up a set keeps using the same models and encoders until it finishes.
+  """
+  
+  def __init__(self, version: str):
+    self.version = version
+    self.loaded_at = datetime.now().isoformat()
+    # Loaded models in least-recently-used order
+    self.models: "OrderedDict[str, Any]" = OrderedDict()
+    self.model_stats: Dict[str, Dict[str, Any]] = {}
+    self.encoders: Dict[str, Dict[str, int]] = {}
+    # Model key -> (12, cities, varieties) raw prices for default covariates
+    self.price_table: Dict[str, np.ndarray] = {}
+    # Model key -> held-out residual quantiles for prediction intervals
+    self.residual_intervals: Dict[str, ResidualIntervals] = {}
+    # Model key -> (lower, upper) raw bounds shaped like its price table
+    self.table_intervals: Dict[str, tuple] = {}
+    self.lock = threading.Lock()
+
 
 class ModelManager:
   """Manages ML models for price prediction"""
   
-  def __init__(self):
-    self.models: Dict[str, Any] = {}
+  def __init__(
+    self,
+    load_mode: str = MODEL_LOAD_MODE,
+    memory_budget_mb: float = MODEL_MEMORY_BUDGET_MB,
+    artifact_format: str = MODEL_ARTIFACT_FORMAT,
+    check_interval: float = MODEL_CHECK_INTERVAL
+  ):
+    self.load_mode = load_mode
+    self.artifact_format = artifact_format
+    self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024)
+    self.check_interval = check_interval
+    # Current generation; None until the first load
+    self._current: Optional[ModelSet] = None
+    self._reload_lock = threading.Lock()
+    self._init_lock = threading.Lock()
+    self._last_check = 0.0
+    self._reload_pending = False
+    self._listeners: List[Callable[[str], None]] = []
     self.model_performance: Dict[str, Dict[str, float]] = {
       "random_forest": {
         "accuracy": 98.2,
@@ -41,43 +215,456 @@ class ModelManager:
         "training_samples": 100000
       }
     }
-    self.encoders: Dict[str, Dict[str, int]] = {}
-    self.load_models()
+    self.cache: Optional[PredictionCache] = None
+    if PREDICTION_CACHE_SIZE > 0:
+      self.cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+  
+  @property
+  def _model_set(self) -> ModelSet:
+    """Current generation, loaded on first access"""
+    if self._current is None:
+      self.ensure_loaded()
+    return self._current
+  
+  @property
+  def is_initialized(self) -> bool:
+    """Whether the first model generation has been loaded"""
+    return self._current is not None
+  
+  def ensure_loaded(self) -> str:
+    """Load the first model generation unless it is already loaded"""
+    if self._current is None:
+      with self._init_lock:
+        if self._current is None:
+          self.load_models()
+    return self._current.version
+  
+  @property
+  def models(self) -> "OrderedDict[str, Any]":
+    """Models of the current generation"""
+    return self._model_set.models
+  
+  @property
+  def encoders(self) -> Dict[str, Dict[str, int]]:
+    """Encoders of the current generation"""
+    return self._model_set.encoders
+  
+  @property
+  def model_stats(self) -> Dict[str, Dict[str, Any]]:
+    """Load statistics of the current generation"""
+    return self._model_set.model_stats
+  
+  @property
+  def model_version(self) -> str:
+    """Version (artifact fingerprint) of the current generation"""
+    return self._model_set.version
   
-  def load_models(self):
-    """Load all available trained models"""
-    logger.info("Loading ML models...")
+  def load_models(self) -> str:
+    """
+    Load models and encoders from MODEL_PATH and swap them in atomically
     
-    for model_key in AVAILABLE_MODELS.keys():
-      model_path = MODEL_PATH / f"{model_key}.pkl"
+    The new generation is built completely before it replaces the current
+    one, so requests keep being served from the old models during a reload.
+    In lazy mode only models that were already loaded are preloaded.
+    Returns the new model version.
+    """
+    with self._reload_lock:
+      previous = self._current or ModelSet("none")
+      model_set = ModelSet(_artifact_version(MODEL_PATH))
+      logger.info(f"Loading ML models ({self.load_mode} mode, version {model_set.version})...")
       
-      if model_path.exists():
+      # Load encoders if available
+      encoder_path = MODEL_PATH / "encoders.pkl"
+      if encoder_path.exists():
         try:
-          self.models[model_key] = joblib.load(model_path)
-          logger.info(f"✓ Loaded model: {model_key}")
+          import joblib
+          model_set.encoders = joblib.load(encoder_path)
+          logger.info("✓ Loaded encoders")
         except Exception as e:
-          logger.warning(f"✗ Failed to load {model_key}: {e}")
+          logger.warning(f"✗ Failed to load encoders: {e}")
+          model_set.encoders = self._create_default_encoders()
       else:
-        logger.warning(f"✗ Model file not found: {model_path}")
+        model_set.encoders = self._create_default_encoders()
+      
+      for model_key in AVAILABLE_MODELS.keys():
+        model_path = MODEL_PATH / f"{model_key}.pkl"
+        
+        if not model_path.exists() and self._mmap_artifact(model_key) is None:
+          logger.warning(f"✗ Model file not found: {model_path}")
+          continue
+        
+        model_set.model_stats[model_key] = {
+          "loaded": False,
+          "load_time_ms": None,
+          "memory_bytes": None,
+          "load_count": 0,
+          "evictions": 0,
+          "last_loaded": None,
+          "backend": MODEL_BACKENDS.get(model_key, "native")
+        }
+        if self.load_mode != "lazy" or model_key in previous.models:
+          self._load_model(model_set, model_key)
+      
+      fingerprints = self._model_fingerprints()
+      model_set.price_table = self._load_price_table(fingerprints)
+      model_set.residual_intervals = self._load_residual_intervals(fingerprints)
+      
+      if not model_set.model_stats:
+        logger.warning("⚠ No models loaded! Using mock predictions.")
+      
+      # Atomic swap: a single reference assignment
+      self._current = model_set
+      
+      # Cached results are keyed on the model version; clearing also frees
+      # entries computed by the previous generation
+      if self.cache is not None:
+        self.cache.clear()
+      
+      logger.info(f"✓ Serving model version {model_set.version}")
+      return model_set.version
+  
+  def subscribe(self, callback: Callable[[str], None]):
+    """Register a callback run with the new version after poll() reloaded the models"""
+    self._listeners.append(callback)
+  
+  def poll(self):
+    """
+    Cheap staleness check for the request path (at most one stat pass per interval)
+    
+    Artifacts retrained or reloaded through another worker process (or
+    replaced outside the API) change the on-disk version; this process
+    then reloads on a background thread and keeps serving the current
+    generation until the swap.
+    """
+    if self._current is None or self.check_interval <= 0 or self._reload_pending:
+      return
+    if self._reload_lock.locked():
+      return  # A reload in this process is already picking up the change
+    now = time.monotonic()
+    if now - self._last_check < self.check_interval:
+      return
+    self._last_check = now
+    if _artifact_version(MODEL_PATH) != self._current.version:
+      self._reload_pending = True
+      threading.Thread(target=self._reload_changed, name="model-reload", daemon=True).start()
+  
+  def _reload_changed(self):
+    """Reload artifacts found changed by poll() and notify subscribers"""
+    try:
+      version = self.load_models()
+      for callback in self._listeners:
+        try:
+          callback(version)
+        except Exception as e:
+          logger.error(f"✗ Model reload listener {callback.__qualname__} failed: {e}")
+    except Exception as e:
+      logger.error(f"✗ Failed to reload changed models: {e}")
+    finally:
+      self._reload_pending = False
+  
+  def _model_fingerprints(self) -> Dict[str, str]:
+    """
+    Content fingerprints of the served models, if anything was built against them
     
-    # Load encoders if available
-    encoder_path = MODEL_PATH / "encoders.pkl"
-    if encoder_path.exists():
+    A memory-mapped model is identified by the fingerprint of its source
+    .pkl recorded in meta.json at export, so the pickle is not read (and
+    need not be deployed) in that mode.
+    """
+    if not ((MODEL_PATH / PRICE_TABLE_FILE).exists() or (MODEL_PATH / INTERVALS_FILE).exists()):
+      return {}
+    fingerprints = {}
+    for model_key in AVAILABLE_MODELS:
+      artifact_dir = self._mmap_artifact(model_key)
+      if artifact_dir is not None:
+        try:
+          with open(artifact_dir / "meta.json") as f:
+            fingerprint = json.load(f).get("fingerprint")
+        except Exception as e:
+          logger.warning(f"✗ Failed to read compiled/{model_key}/meta.json: {e}")
+          fingerprint = None
+        if fingerprint is not None:
+          fingerprints[model_key] = fingerprint
+          continue
+      
+      model_path = MODEL_PATH / f"{model_key}.pkl"
+      if model_path.exists():
+        fingerprints[model_key] = content_fingerprint(model_path)
+    return fingerprints
+  
+  def _load_price_table(self, fingerprints: Dict[str, str]) -> Dict[str, np.ndarray]:
+    """
+    Load the default-covariate price table written at training time
+    
+    A model's slice is only used if its .pkl has the content the table
+    was built from, so a table can never answer for a different model.
+    """
+    table_path = MODEL_PATH / PRICE_TABLE_FILE
+    if not table_path.exists():
+      return {}
+    
+    try:
+      with np.load(table_path) as data:
+        defaults = tuple(float(value) for value in data["defaults"])
+        if defaults != (DEFAULT_ARRIVALS, DEFAULT_RAINFALL, DEFAULT_TEMPERATURE):
+          logger.warning("✗ Price table was built for different default covariates, ignoring it")
+          return {}
+        
+        table = {}
+        for index, model_key in enumerate(data["models"]):
+          model_key = str(model_key)
+          if fingerprints.get(model_key) == str(data["fingerprints"][index]):
+            table[model_key] = np.ascontiguousarray(data["prices"][index])
+          else:
+            logger.warning(f"✗ Price table is stale for {model_key}, ignoring its entries")
+    except Exception as e:
+      logger.warning(f"✗ Failed to load price table: {e}")
+      return {}
+    
+    if table:
+      logger.info(f"✓ Loaded price table for {', '.join(table)}")
+    return table
+  
+  def _load_residual_intervals(self, fingerprints: Dict[str, str]) -> Dict[str, ResidualIntervals]:
+    """
+    Load the residual quantiles written at training time
+    
+    Same staleness check as the price table: memory-mapped models match
+    through the fingerprint in their meta.json, so mmap deployments
+    without the .pkl files keep their calibrated intervals.
+    """
+    intervals_path = MODEL_PATH / INTERVALS_FILE
+    if not intervals_path.exists():
+      return {}
+    
+    try:
+      with open(intervals_path) as f:
+        calibration = json.load(f)["models"]
+      intervals = {}
+      for model_key, entry in calibration.items():
+        if fingerprints.get(model_key) == entry["fingerprint"]:
+          intervals[model_key] = ResidualIntervals(
+            entry["edges"], entry["percentiles"], PREDICTION_INTERVAL_COVERAGE
+          )
+        else:
+          logger.warning(f"✗ Interval calibration is stale for {model_key}, ignoring it")
+    except Exception as e:
+      logger.warning(f"✗ Failed to load interval calibration: {e}")
+      return {}
+    
+    if intervals:
+      logger.info(f"✓ Loaded interval calibration for {', '.join(intervals)}")
+    return intervals
+  
+  def _lookup_price(
+    self,
+    model_set: ModelSet,
+    model_key: str,
+    month: int,
+    city: str,
+    variety: str,
+    arrivals: float,
+    rainfall: float,
+    temperature: float
+  ) -> Optional[float]:
+    """Raw model price from the precomputed table, or None if not covered"""
+    table = model_set.price_table.get(model_key)
+    if table is None:
+      return None
+    if (arrivals, rainfall, temperature) != (DEFAULT_ARRIVALS, DEFAULT_RAINFALL, DEFAULT_TEMPERATURE):
+      return None
+    
+    city_encoded, variety_encoded = self.encode_features(city, variety, model_set)
+    if not (1 <= month <= 12 and city_encoded < table.shape[1] and variety_encoded < table.shape[2]):
+      return None
+    return float(table[month - 1, city_encoded, variety_encoded])
+  
+  def _mmap_artifact(self, model_key: str) -> Optional[Path]:
+    """Directory of the memory-mappable artifact, if that format is enabled and present"""
+    if self.artifact_format != "mmap":
+      return None
+    artifact_dir = COMPILED_MODEL_PATH / model_key
+    return artifact_dir if (artifact_dir / "meta.json").exists() else None
+  
+  def _load_model(self, model_set: ModelSet, model_key: str) -> Optional[Any]:
+    """Load one model, record its load time and size (lock held)"""
+    artifact_dir = self._mmap_artifact(model_key)
+    if artifact_dir is not None:
+      return self._load_mmap_model(model_set, model_key, artifact_dir)
+    
+    model_path = MODEL_PATH / f"{model_key}.pkl"
+    stats = model_set.model_stats[model_key]
+    
+    try:
+      start = time.perf_counter()
+      import joblib
+      model = joblib.load(model_path)
+      load_time_ms = (time.perf_counter() - start) * 1000
+    except Exception as e:
+      logger.warning(f"✗ Failed to load {model_key}: {e}")
+      return None
+    
+    memory_bytes = _estimate_model_size(model, model_path.stat().st_size)
+    
+    backend = MODEL_BACKENDS.get(model_key, "native")
+    if backend in ("compiled", "auto"):
+      model, compiled_bytes = self._compile_model(model_set, model_key, model, backend)
+      if backend == "compiled" and compiled_bytes:
+        # Only the node arrays are kept; the native model is dropped
+        memory_bytes = compiled_bytes
+      else:
+        memory_bytes += compiled_bytes
+    
+    stats.update({
+      "loaded": True,
+      "load_time_ms": round(load_time_ms, 2),
+      "memory_bytes": memory_bytes,
+      "load_count": stats["load_count"] + 1,
+      "last_loaded": datetime.now().isoformat()
+    })
+    model_set.models[model_key] = model
+    logger.info(
+      f"✓ Loaded model: {model_key} "
+      f"({load_time_ms:.0f} ms, {memory_bytes / 1024 / 1024:.1f} MB)"
+    )
+    
+    self._enforce_memory_budget(model_set, keep=model_key)
+    return model
+  
+  def _load_mmap_model(self, model_set: ModelSet, model_key: str, artifact_dir: Path) -> Optional[Any]:
+    """
+    Memory-map a compiled artifact (lock held)
+    
+    The arrays are backed by the page cache and shared by every process
+    that maps them; parity with the native model was checked at export.
+    """
+    stats = model_set.model_stats[model_key]
+    
+    try:
+      start = time.perf_counter()
+      model = load_compiled(artifact_dir, mmap=True)
+      load_time_ms = (time.perf_counter() - start) * 1000
+    except Exception as e:
+      logger.warning(f"✗ Failed to map {model_key}: {e}")
+      return None
+    
+    stats.update({
+      "loaded": True,
+      "load_time_ms": round(load_time_ms, 2),
+      "memory_bytes": model.nbytes,
+      "load_count": stats["load_count"] + 1,
+      "last_loaded": datetime.now().isoformat(),
+      "backend": "mmap",
+      "shared": True
+    })
+    model_set.models[model_key] = model
+    logger.info(
+      f"✓ Mapped model: {model_key} "
+      f"({load_time_ms:.1f} ms, {model.nbytes / 1024 / 1024:.1f} MB shared)"
+    )
+    
+    self._enforce_memory_budget(model_set, keep=model_key)
+    return model
+  
+  def _compile_model(
+    self,
+    model_set: ModelSet,
+    model_key: str,
+    native: Any,
+    backend: str
+  ) -> tuple:
+    """
+    Build the compiled tree backend for a model and check it against the
+    native model; falls back to native if compilation or parity fails.
+    Returns (model to serve, bytes held by the compiled arrays).
+    """
+    stats = model_set.model_stats[model_key]
+    try:
+      start = time.perf_counter()
+      compiled = compile_model(model_key, native)
+      max_error = check_parity(native, compiled, self._parity_sample(model_set))
+      compile_time_ms = (time.perf_counter() - start) * 1000
+    except Exception as e:
+      logger.warning(f"✗ Compiled backend unavailable for {model_key}, using native: {e}")
+      stats["backend"] = "native"
+      return native, 0
+    
+    stats.update({
+      "backend": backend,
+      "compile_time_ms": round(compile_time_ms, 2),
+      "parity_max_error": max_error
+    })
+    logger.info(
+      f"✓ Compiled {model_key} ({compiled.n_trees} trees, "
+      f"{compile_time_ms:.0f} ms, parity max error {max_error:.2e})"
+    )
+    
+    if backend == "compiled":
+      return compiled, compiled.nbytes
+    return RoutedModel(native, compiled, COMPILED_MAX_ROWS), compiled.nbytes
+  
+  def _parity_sample(self, model_set: ModelSet, n_rows: int = 256) -> np.ndarray:
+    """Deterministic feature rows spanning realistic input ranges"""
+    rng = np.random.default_rng(0)
+    n_cities = max(len(model_set.encoders.get("city", {})), 1)
+    n_varieties = max(len(model_set.encoders.get("variety", {})), 1)
+    return np.column_stack([
+      rng.uniform(500, 4000, n_rows),
+      rng.uniform(0, 300, n_rows),
+      rng.uniform(15, 40, n_rows),
+      rng.integers(1, 13, n_rows),
+      rng.integers(0, n_cities, n_rows),
+      rng.integers(0, n_varieties, n_rows)
+    ]).astype(np.float64)
+  
+  def _enforce_memory_budget(self, model_set: ModelSet, keep: str):
+    """Evict least-recently-used models until within budget (lock held)"""
+    if self.memory_budget_bytes <= 0:
+      return
+    
+    while self._loaded_memory_bytes(model_set) > self.memory_budget_bytes:
+      victim = next((key for key in model_set.models if key != keep), None)
+      if victim is None:
+        logger.warning(
+          f"⚠ Model {keep} alone exceeds the memory budget of "
+          f"{self.memory_budget_bytes / 1024 / 1024:.0f} MB"
+        )
+        return
+      del model_set.models[victim]
+      model_set.model_stats[victim]["loaded"] = False
+      model_set.model_stats[victim]["evictions"] += 1
+      logger.info(f"Evicted model {victim} to stay within memory budget")
+  
+  def _loaded_memory_bytes(self, model_set: ModelSet) -> int:
+    """Total estimated memory of currently loaded models"""
+    return sum(
+      model_set.model_stats[key]["memory_bytes"] or 0 for key in list(model_set.models)
+    )
+  
+  def get_model(self, model_key: str, model_set: Optional[ModelSet] = None) -> Optional[Any]:
+    """Get a model, loading it on first use in lazy mode"""
+    if model_set is None:
+      model_set = self._model_set
+    
+    model = model_set.models.get(model_key)
+    if model is not None:
       try:
-        self.encoders = joblib.load(encoder_path)
-        logger.info("✓ Loaded encoders")
-      except Exception as e:
-        logger.warning(f"✗ Failed to load encoders: {e}")
-        self._create_default_encoders()
-    else:
-      self._create_default_encoders()
+        model_set.models.move_to_end(model_key)
+      except KeyError:
+        pass  # Evicted concurrently; the reference we hold is still usable
+      return model
     
-    if not self.models:
-      logger.warning("⚠ No models loaded! Using mock predictions.")
+    if model_key not in model_set.model_stats:
+      return None
+    
+    with model_set.lock:
+      model = model_set.models.get(model_key)
+      if model is None:
+        model = self._load_model(model_set, model_key)
+      return model
   
-  def _create_default_encoders(self):
+  def _create_default_encoders(self) -> Dict[str, Dict[str, int]]:
     """Create default label encoders for cities and varieties"""
-    self.encoders = {
+    encoders = {
       "city": {
         "Bangalore": 0, "Mumbai": 1, "Delhi": 2, "Chennai": 3,
         "Kolkata": 4, "Hyderabad": 5, "Pune": 6, "Ahmedabad": 7,
@@ -93,11 +680,18 @@ class ModelManager:
       }
     }
     logger.info("✓ Created default encoders")
+    return encoders
   
-  def encode_features(self, city: str, variety: str) -> tuple:
+  def encode_features(
+    self,
+    city: str,
+    variety: str,
+    model_set: Optional[ModelSet] = None
+  ) -> tuple:
     """Encode categorical features"""
-    city_encoded = self.encoders.get("city", {}).get(city, 0)
-    variety_encoded = self.encoders.get("variety", {}).get(variety, 0)
+    encoders = (model_set or self._model_set).encoders
+    city_encoded = encoders.get("city", {}).get(city, 0)
+    variety_encoded = encoders.get("variety", {}).get(variety, 0)
     return city_encoded, variety_encoded
   
   def prepare_features(
@@ -108,10 +702,11 @@ class ModelManager:
     variety: str,
     arrivals: float,
     rainfall: float,
-    temperature: float
+    temperature: float,
+    model_set: Optional[ModelSet] = None
   ) -> np.ndarray:
     """Prepare features for model prediction"""
-    city_encoded, variety_encoded = self.encode_features(city, variety)
+    city_encoded, variety_encoded = self.encode_features(city, variety, model_set)
     
     # Feature array: [arrivals, rainfall, temperature, month, city_encoded, variety_encoded]
     features = np.array([[
@@ -132,50 +727,535 @@ class ModelManager:
     month: int,
     city: str,
     variety: str,
-    arrivals: float = 2000,
-    rainfall: float = 50,
-    temperature: float = 28
+    arrivals: float = DEFAULT_ARRIVALS,
+    rainfall: float = DEFAULT_RAINFALL,
+    temperature: float = DEFAULT_TEMPERATURE
   ) -> Dict[str, Any]:
-    """Make price prediction using specified model"""
+    """Make price prediction using specified model (cached)"""
+    # Pin one model generation for the whole request
+    model_set = self._model_set
+    
+    # Default covariates: O(1) answer from the table built at training time
+    result = self._predict_from_table(
+      model_set, model_key, month, city, variety, arrivals, rainfall, temperature
+    )
+    if result is not None:
+      return result
+    
+    if self.cache is None:
+      result, _ = self._predict_uncached(
+        model_key, year, month, city, variety, arrivals, rainfall, temperature, model_set
+      )
+      return result
+    
+    # Year is not a model feature, so it is left out of the key
+    key = (
+      model_set.version, model_key, int(month), city, variety,
+      float(arrivals), float(rainfall), float(temperature)
+    )
+    # Mock fallbacks are not stored, so the next call retries the model
+    result, _ = self.cache.get_or_compute(
+      key,
+      lambda: self._predict_uncached(
+        model_key, year, month, city, variety, arrivals, rainfall, temperature, model_set
+      ),
+      cacheable=lambda computed: computed[1] != "mock"
+    )
+    return dict(result)
+  
+  def _predict_from_table(
+    self,
+    model_set: ModelSet,
+    model_key: str,
+    month: int,
+    city: str,
+    variety: str,
+    arrivals: float,
+    rainfall: float,
+    temperature: float
+  ) -> Optional[Dict[str, Any]]:
+    """Prediction result from the price table, or None if the table does not cover it"""
+    price = self._lookup_price(
+      model_set, model_key, month, city, variety, arrivals, rainfall, temperature
+    )
+    if price is None:
+      return None
+    
+    PREDICTIONS.inc(model=model_key, source="table")
+    lower, upper, method = self._table_interval(model_set, model_key, month, city, variety, price)
+    prediction = self._validate_prediction(price, variety, model_key)
+    if lower is not None:
+      lower, upper = self._clamp_intervals(
+        np.array([price]), np.array([prediction]), np.array([lower]), np.array([upper]), [variety]
+      )
+      lower, upper = lower[0], upper[0]
+    return self._build_result(model_key, prediction, model_set, lower, upper, method)
+  
+  def _predict_uncached(
+    self,
+    model_key: str,
+    year: int,
+    month: int,
+    city: str,
+    variety: str,
+    arrivals: float = DEFAULT_ARRIVALS,
+    rainfall: float = DEFAULT_RAINFALL,
+    temperature: float = DEFAULT_TEMPERATURE,
+    model_set: Optional[ModelSet] = None
+  ) -> Tuple[Dict[str, Any], str]:
+    """
+    Make price prediction using specified model
+    
+    Returns (result, source); source is "mock" when the model was missing
+    or failed and the fallback price was served instead.
+    """
+    if model_set is None:
+      model_set = self._model_set
     
     # Prepare features
+    start = time.perf_counter()
     features = self.prepare_features(
-      year, month, city, variety, arrivals, rainfall, temperature
+      year, month, city, variety, arrivals, rainfall, temperature, model_set
     )
+    encoded = time.perf_counter()
     
     # Check if model is loaded
-    if model_key in self.models:
+    model = self.get_model(model_key, model_set)
+    source = "model"
+    lower = upper = method = None
+    if model is not None:
       try:
-        # Real model prediction
-        prediction = self.models[model_key].predict(features)[0]
-        logger.info(f"Prediction from {model_key}: ₹{prediction:.2f}")
+        # Real model prediction, with its interval from the same pass
+        raw, lower, upper, method = self._predict_with_intervals(model_set, model_key, model, features)
+        prediction = raw[0]
+        logger.debug("Prediction from %s: ₹%.2f", model_key, prediction)
       except Exception as e:
         logger.error(f"Prediction error: {e}")
         prediction = self._mock_prediction(month, arrivals, rainfall)
+        lower = upper = method = None
+        source = "mock"
+        MOCK_FALLBACKS.inc(model=model_key, reason="error")
     else:
       # Mock prediction if model not loaded
       logger.warning(f"Model {model_key} not loaded, using mock prediction")
       prediction = self._mock_prediction(month, arrivals, rainfall)
+      source = "mock"
+      MOCK_FALLBACKS.inc(model=model_key, reason="not_loaded")
+    inferred = time.perf_counter()
     
     # Validate prediction range
-    prediction = self._validate_prediction(prediction, variety)
-    
-    # Get model performance metrics
-    performance = self.model_performance.get(model_key, {
-      "accuracy": 95.0,
-      "mae": 2.0,
-      "rmse": 2.5,
-      "r2_score": 0.95,
-      "training_samples": 100000
+    clamped = self._validate_prediction(prediction, variety, model_key)
+    if lower is not None:
+      lower, upper = self._clamp_intervals(
+        np.array([prediction]), np.array([clamped]), lower, upper, [variety]
+      )
+      lower, upper = lower[0], upper[0]
+    
+    self._record_stages(model_key, "single", start, encoded, inferred)
+    PREDICTIONS.inc(model=model_key, source=source)
+    return self._build_result(model_key, clamped, model_set, lower, upper, method), source
+  
+  def prepare_features_batch(
+    self,
+    months: List[int],
+    cities: List[str],
+    varieties: List[str],
+    arrivals: List[float],
+    rainfall: List[float],
+    temperature: List[float],
+    model_set: Optional[ModelSet] = None
+  ) -> np.ndarray:
+    """Prepare one contiguous feature matrix for a batch of scenarios"""
+    encoders = (model_set or self._model_set).encoders
+    city_encoder = encoders.get("city", {})
+    variety_encoder = encoders.get("variety", {})
+    
+    # Same column order as prepare_features
+    features = np.empty((len(months), 6), dtype=np.float64)
+    features[:, 0] = arrivals
+    features[:, 1] = rainfall
+    features[:, 2] = temperature
+    features[:, 3] = months
+    features[:, 4] = [city_encoder.get(city, 0) for city in cities]
+    features[:, 5] = [variety_encoder.get(variety, 0) for variety in varieties]
+    
+    return features
+  
+  def predict_batch(self, scenarios: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Make price predictions for many scenarios at once
+    
+    Default-covariate scenarios are answered from the price table like
+    single predictions; the rest are grouped by model so each model runs a
+    single vectorized predict call. Results are returned in request order;
+    a scenario that cannot be scored gets {"error": ...} instead of a
+    prediction.
+    """
+    model_set = self._model_set
+    results: List[Optional[Dict[str, Any]]] = [None] * len(scenarios)
+    groups: Dict[str, List[int]] = {}
+    
+    for index, scenario in enumerate(scenarios):
+      model_key = scenario.get("model", "random_forest")
+      if model_key not in AVAILABLE_MODELS:
+        results[index] = {
+          "error": f"Invalid model. Available models: {list(AVAILABLE_MODELS.keys())}"
+        }
+        continue
+      missing = [
+        field for field in ("arrivals", "rainfall", "temperature")
+        if scenario.get(field) is None
+      ]
+      if missing:
+        results[index] = {"error": f"Missing values for: {', '.join(missing)}"}
+        continue
+      results[index] = self._predict_from_table(
+        model_set, model_key, scenario["month"], scenario["city"], scenario["variety"],
+        scenario["arrivals"], scenario["rainfall"], scenario["temperature"]
+      )
+      if results[index] is None:
+        groups.setdefault(model_key, []).append(index)
+    
+    for model_key, indices in groups.items():
+      group = [scenarios[i] for i in indices]
+      predictions, lower, upper, method, _ = self._predict_rows(
+        model_key,
+        [s["month"] for s in group],
+        [s["city"] for s in group],
+        [s["variety"] for s in group],
+        [s["arrivals"] for s in group],
+        [s["rainfall"] for s in group],
+        [s["temperature"] for s in group],
+        model_set,
+        call="batch",
+        intervals=True
+      )
+      for position, (index, prediction) in enumerate(zip(indices, predictions)):
+        results[index] = self._build_result(
+          model_key,
+          prediction,
+          model_set,
+          None if lower is None else lower[position],
+          None if upper is None else upper[position],
+          method
+        )
+    
+    return results
+  
+  def predict_columns(
+    self,
+    model_key: str,
+    months: List[int],
+    cities: List[str],
+    varieties: List[str],
+    arrivals: List[float],
+    rainfall: List[float],
+    temperature: List[float],
+    intervals: bool = False
+  ) -> Dict[str, Any]:
+    """
+    Score column-oriented scenarios for one model in a single predict call
+    
+    Used for bulk scoring, where building a result dict per row would cost
+    more than the prediction. Returns the prices (and with intervals=True
+    the "lower" / "upper" bounds) as ndarrays, and "source": "mock" when
+    the model was unavailable and the prices are mock values.
+    """
+    model_set = self._model_set
+    prices, lower, upper, method, source = self._predict_rows(
+      model_key, months, cities, varieties, arrivals, rainfall, temperature,
+      model_set, call="bulk", intervals=intervals
+    )
+    result = self._build_result(model_key, 0.0, model_set)
+    result.pop("predicted_price")
+    result["prices"] = prices
+    result["source"] = source
+    if intervals:
+      result.update({"lower": lower, "upper": upper, "interval_method": method})
+    return result
+  
+  def _predict_rows(
+    self,
+    model_key: str,
+    months: List[int],
+    cities: List[str],
+    varieties: List[str],
+    arrivals: List[float],
+    rainfall: List[float],
+    temperature: List[float],
+    model_set: ModelSet,
+    call: str,
+    intervals: bool = False
+  ) -> tuple:
+    """
+    Encode, predict and clamp a batch of rows for one model
+    
+    Returns (prices, lower, upper, interval method, source); the bounds
+    are None unless intervals were requested and the model has them, and
+    source is "model" or "mock".
+    """
+    start = time.perf_counter()
+    n_rows = len(months)
+    months = np.asarray(months, dtype=np.float64)
+    arrivals = np.asarray(arrivals, dtype=np.float64)
+    rainfall = np.asarray(rainfall, dtype=np.float64)
+    
+    features = self.prepare_features_batch(
+      months, cities, varieties, arrivals, rainfall, temperature, model_set
+    )
+    encoded = time.perf_counter()
+    
+    model = self.get_model(model_key, model_set)
+    source = "model"
+    lower = upper = method = None
+    if model is not None:
+      try:
+        predictions, lower, upper, method = self._predict_with_intervals(
+          model_set, model_key, model, features, intervals
+        )
+        logger.debug("Batch prediction from %s: %d scenarios", model_key, n_rows)
+      except Exception as e:
+        logger.error(f"Batch prediction error: {e}")
+        predictions = self._mock_predictions(months, arrivals, rainfall)
+        lower = upper = method = None
+        source = "mock"
+        MOCK_FALLBACKS.inc(n_rows, model=model_key, reason="error")
+    else:
+      logger.warning(f"Model {model_key} not loaded, using mock predictions")
+      predictions = self._mock_predictions(months, arrivals, rainfall)
+      source = "mock"
+      MOCK_FALLBACKS.inc(n_rows, model=model_key, reason="not_loaded")
+    inferred = time.perf_counter()
+    
+    clamped = self._validate_predictions(predictions, varieties, model_key)
+    if lower is not None:
+      lower, upper = self._clamp_intervals(predictions, clamped, lower, upper, varieties)
+    
+    self._record_stages(model_key, call, start, encoded, inferred)
+    PREDICTIONS.inc(n_rows, model=model_key, source=source)
+    return clamped, lower, upper, method, source
+  
+  def _predict_with_intervals(
+    self,
+    model_set: ModelSet,
+    model_key: str,
+    model: Any,
+    features: np.ndarray,
+    intervals: bool = True
+  ) -> tuple:
+    """
+    Raw predictions and interval bounds for a feature matrix
+    
+    Averaging tree ensembles return every tree's output in one vectorized
+    pass; the prediction is their mean and the bounds their quantiles.
+    Other models get held-out residual quantiles around the prediction.
+    Returns (predictions, lower, upper, method); the bounds are None when
+    no interval is available.
+    """
+    if intervals and leaf_model(model) is not None:
+      leaves = model.leaf_values(features)
+      lower, upper = tree_quantiles(leaves, PREDICTION_INTERVAL_COVERAGE)
+      return leaves.mean(axis=1), lower, upper, "tree_quantiles"
+    
+    predictions = np.asarray(model.predict(features), dtype=np.float64)
+    residual = model_set.residual_intervals.get(model_key) if intervals else None
+    if residual is None:
+      return predictions, None, None, None
+    lower, upper = residual.bounds(predictions)
+    return predictions, lower, upper, "residual_quantiles"
+  
+  def _table_interval(
+    self,
+    model_set: ModelSet,
+    model_key: str,
+    month: int,
+    city: str,
+    variety: str,
+    price: float
+  ) -> tuple:
+    """
+    Raw interval bounds for a price-table hit
+    
+    Tree quantiles for the whole table are computed in one pass the first
+    time a loaded forest is asked; a model that is not loaded (lazy mode)
+    is not loaded for this and gets residual quantiles instead.
+    """
+    model = model_set.models.get(model_key)
+    if model is not None and leaf_model(model) is not None:
+      bounds = model_set.table_intervals.get(model_key)
+      if bounds is None:
+        bounds = self._build_table_intervals(model_set, model_key, model)
+      city_encoded, variety_encoded = self.encode_features(city, variety, model_set)
+      index = (month - 1, city_encoded, variety_encoded)
+      return float(bounds[0][index]), float(bounds[1][index]), "tree_quantiles"
+    
+    residual = model_set.residual_intervals.get(model_key)
+    if residual is not None:
+      lower, upper = residual.bounds(np.array([price]))
+      return float(lower[0]), float(upper[0]), "residual_quantiles"
+    return None, None, None
+  
+  def _build_table_intervals(self, model_set: ModelSet, model_key: str, model: Any) -> tuple:
+    """Interval bounds for every (month, city, variety) cell of a price table"""
+    shape = model_set.price_table[model_key].shape
+    months, cities, varieties = np.meshgrid(
+      np.arange(1, 13), np.arange(shape[1]), np.arange(shape[2]), indexing="ij"
+    )
+    features = np.empty((months.size, 6), dtype=np.float64)
+    features[:, 0] = DEFAULT_ARRIVALS
+    features[:, 1] = DEFAULT_RAINFALL
+    features[:, 2] = DEFAULT_TEMPERATURE
+    features[:, 3] = months.ravel()
+    features[:, 4] = cities.ravel()
+    features[:, 5] = varieties.ravel()
+    
+    _, lower, upper, _ = self._predict_with_intervals(model_set, model_key, model, features)
+    bounds = (lower.reshape(shape), upper.reshape(shape))
+    model_set.table_intervals[model_key] = bounds
+    return bounds
+  
+  def forecast_grid(
+    self,
+    model_key: str,
+    cities: List[str],
+    varieties: List[str],
+    start_year: int,
+    start_month: int,
+    horizon: int,
+    arrivals: float = DEFAULT_ARRIVALS,
+    rainfall: float = DEFAULT_RAINFALL,
+    temperature: float = DEFAULT_TEMPERATURE
+  ) -> Dict[str, Any]:
+    """
+    Forecast a city x variety x month price grid
+    
+    Year is not a model feature, so months that repeat across the horizon
+    share one row: the model scores at most 12 x cities x varieties rows in
+    a single predict call and the results are broadcast to every period.
+    """
+    start = time.perf_counter()
+    
+    # Calendar periods covered by the horizon
+    offsets = np.arange(horizon) + (start_month - 1)
+    period_years = start_year + offsets // 12
+    period_months = offsets % 12 + 1
+    periods = [f"{year}-{month:02d}" for year, month in zip(period_years, period_months)]
+    
+    unique_months, month_index = np.unique(period_months, return_inverse=True)
+    
+    model_set = self._model_set
+    
+    # Grid axes: (month, city, variety), flattened in C order
+    city_encoder = model_set.encoders.get("city", {})
+    variety_encoder = model_set.encoders.get("variety", {})
+    city_codes = np.array([city_encoder.get(city, 0) for city in cities], dtype=np.float64)
+    variety_codes = np.array(
+      [variety_encoder.get(variety, 0) for variety in varieties], dtype=np.float64
+    )
+    month_axis, city_axis, variety_axis = np.meshgrid(
+      unique_months.astype(np.float64), city_codes, variety_codes, indexing="ij"
+    )
+    
+    n_rows = month_axis.size
+    features = np.empty((n_rows, 6), dtype=np.float64)
+    features[:, 0] = arrivals
+    features[:, 1] = rainfall
+    features[:, 2] = temperature
+    features[:, 3] = month_axis.ravel()
+    features[:, 4] = city_axis.ravel()
+    features[:, 5] = variety_axis.ravel()
+    encoded = time.perf_counter()
+    
+    model = self.get_model(model_key, model_set)
+    source = "model"
+    if model is not None:
+      try:
+        predictions = np.asarray(model.predict(features), dtype=np.float64)
+        logger.debug("Forecast grid from %s: %d unique scenarios", model_key, n_rows)
+      except Exception as e:
+        logger.error(f"Forecast error: {e}")
+        predictions = self._mock_predictions(
+          features[:, 3], np.full(n_rows, arrivals), np.full(n_rows, rainfall)
+        )
+        source = "mock"
+        MOCK_FALLBACKS.inc(n_rows, model=model_key, reason="error")
+    else:
+      logger.warning(f"Model {model_key} not loaded, using mock predictions")
+      predictions = self._mock_predictions(
+        features[:, 3], np.full(n_rows, arrivals), np.full(n_rows, rainfall)
+      )
+      source = "mock"
+      MOCK_FALLBACKS.inc(n_rows, model=model_key, reason="not_loaded")
+    inferred = time.perf_counter()
+    
+    predictions = self._validate_predictions(
+      predictions, list(varieties) * (len(unique_months) * len(cities)), model_key
+    )
+    
+    self._record_stages(model_key, "forecast", start, encoded, inferred)
+    PREDICTIONS.inc(n_rows, model=model_key, source=source)
+    
+    # (month, city, variety) -> (city, variety, period)
+    grid = predictions.reshape(len(unique_months), len(cities), len(varieties))
+    grid = np.transpose(grid[month_index], (1, 2, 0))
+    
+    result = self._build_result(model_key, 0.0, model_set)
+    result.pop("predicted_price")
+    result.update({
+      "periods": periods,
+      "cities": list(cities),
+      "varieties": list(varieties),
+      "prices": grid
     })
     
+    return result
+  
+  def _record_stages(self, model_key: str, call: str, start: float, encoded: float, inferred: float):
+    """Record encode, inference and clamp stage latencies"""
+    now = time.perf_counter()
+    stages = (
+      ("encode", encoded - start),
+      ("inference", inferred - encoded),
+      ("clamp", now - inferred)
+    )
+    for stage, seconds in stages:
+      PREDICTION_STAGE_LATENCY.observe(seconds, model=model_key, call=call, stage=stage)
+    
+    # Per-request breakdown when the caller asked for debug timings
+    timer = current_timer()
+    if timer is not None:
+      for stage, seconds in stages:
+        timer.add(f"model.{stage}", seconds)
+  
+  def _build_result(
+    self,
+    model_key: str,
+    prediction: float,
+    model_set: ModelSet,
+    lower: Optional[float] = None,
+    upper: Optional[float] = None,
+    interval_method: Optional[str] = None
+  ) -> Dict[str, Any]:
+    """Attach the interval, model performance metrics and version to a prediction"""
+    performance = self.model_performance.get(model_key, DEFAULT_PERFORMANCE)
+    has_interval = lower is not None
+    
     return {
       "predicted_price": float(prediction),
-      "confidence": performance["accuracy"],
+      # Without an interval (mock predictions) this stays the model's accuracy
+      "confidence": (
+        round(float(interval_confidence(prediction, lower, upper)), 2)
+        if has_interval else performance["accuracy"]
+      ),
+      "lower_bound": float(lower) if has_interval else None,
+      "upper_bound": float(upper) if has_interval else None,
+      "interval_coverage": PREDICTION_INTERVAL_COVERAGE if has_interval else None,
+      "interval_method": interval_method if has_interval else None,
       "model_used": AVAILABLE_MODELS.get(model_key, model_key),
       "accuracy": performance["accuracy"],
       "mae": performance["mae"],
-      "r2_score": performance["r2_score"]
+      "r2_score": performance["r2_score"],
+      "model_version": model_set.version
     }
   
   def _mock_prediction(self, month: int, arrivals: float, rainfall: float) -> float:
@@ -198,44 +1278,100 @@ class ModelManager:
     
     return max(price, 25000)  # Minimum price floor
   
-  def _validate_prediction(self, prediction: float, variety: str) -> float:
-    """Validate and correct prediction if out of expected range"""
+  def _mock_predictions(
+    self,
+    months: np.ndarray,
+    arrivals: np.ndarray,
+    rainfall: np.ndarray
+  ) -> np.ndarray:
+    """Vectorized version of _mock_prediction"""
+    base_price = 28500
     
-    # Expected price ranges for each variety (₹ per quintal) - match frontend realistic range
-    expected_ranges = {
-      "Guntur": (20000, 30000),
-      "Teja": (20000, 30000),
-      "Byadgi": (20000, 30000),
-      "Kashmiri": (20000, 30000),
-      "Sannam": (20000, 30000),
-      "Wonder Hot": (20000, 30000),
-      "Pusa Jwala": (20000, 30000),
-      "Bhut Jolokia": (20000, 30000),
-      "Kanthari": (20000, 30000),
-      "Dhani": (20000, 30000),
-      "Reshampatti": (20000, 30000),
-      "Ellachipur": (20000, 30000)
-    }
+    seasonal_factor = np.sin((months / 12) * np.pi * 2) * 0.08
+    arrivals_factor = (2500 - arrivals) / 2500 * 0.05
+    rainfall_factor = (100 - rainfall) / 100 * 0.04
+    random_factor = np.random.uniform(-0.02, 0.02, size=len(months))
+    
+    prices = base_price * (1 + seasonal_factor + arrivals_factor + rainfall_factor + random_factor)
+    
+    return np.maximum(prices, 25000)
+  
+  def _validate_prediction(self, prediction: float, variety: str, model_key: str = "unknown") -> float:
+    """Validate and correct prediction if out of expected range"""
     
     # Get expected range for variety
-    min_price, max_price = expected_ranges.get(variety, (20000, 30000))
+    min_price, max_price = EXPECTED_PRICE_RANGES.get(variety, DEFAULT_PRICE_RANGE)
     
-    # Check if prediction is out of range
+    # Check if prediction is out of range (counted in CLAMP_EVENTS;
+    # logged at debug level since this runs on every request)
     if prediction < min_price:
-      logger.warning(
-        f"Prediction ₹{prediction:.2f} below minimum for {variety}. "
-        f"Adjusting to ₹{min_price:.2f}"
+      CLAMP_EVENTS.inc(model=model_key, direction="below")
+      logger.debug(
+        "Prediction ₹%.2f below minimum for %s. Adjusting to ₹%.2f",
+        prediction, variety, min_price
       )
       return min_price
     elif prediction > max_price:
-      logger.warning(
-        f"Prediction ₹{prediction:.2f} above maximum for {variety}. "
-        f"Adjusting to ₹{max_price:.2f}"
+      CLAMP_EVENTS.inc(model=model_key, direction="above")
+      logger.debug(
+        "Prediction ₹%.2f above maximum for %s. Adjusting to ₹%.2f",
+        prediction, variety, max_price
       )
       return max_price
     
     return prediction
   
+  def _price_bounds(self, varieties: List[str]) -> np.ndarray:
+    """(n, 2) expected price range per row"""
+    return np.array(
+      [EXPECTED_PRICE_RANGES.get(variety, DEFAULT_PRICE_RANGE) for variety in varieties],
+      dtype=np.float64
+    ).reshape(-1, 2)
+  
+  def _validate_predictions(
+    self,
+    predictions: np.ndarray,
+    varieties: List[str],
+    model_key: str = "unknown"
+  ) -> np.ndarray:
+    """Vectorized version of _validate_prediction for a batch of predictions"""
+    bounds = self._price_bounds(varieties)
+    
+    clamped = np.clip(predictions, bounds[:, 0], bounds[:, 1])
+    
+    below = int(np.count_nonzero(predictions < bounds[:, 0]))
+    above = int(np.count_nonzero(predictions > bounds[:, 1]))
+    if below:
+      CLAMP_EVENTS.inc(below, model=model_key, direction="below")
+    if above:
+      CLAMP_EVENTS.inc(above, model=model_key, direction="above")
+    if below or above:
+      logger.debug(
+        "Adjusted %d of %d predictions into expected range", below + above, len(predictions)
+      )
+    
+    return clamped
+  
+  def _clamp_intervals(
+    self,
+    raw: np.ndarray,
+    prices: np.ndarray,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    varieties: List[str]
+  ) -> tuple:
+    """
+    Fit interval bounds to clamped predictions
+    
+    Bounds keep their offsets from a prediction that was clamped into the
+    expected range, and are then clipped to that range.
+    """
+    bounds = self._price_bounds(varieties)
+    shift = prices - raw
+    lower = np.clip(lower + shift, bounds[:, 0], prices)
+    upper = np.clip(upper + shift, prices, bounds[:, 1])
+    return lower, upper
+  
   def get_model_performance(self, model_key: str) -> Dict[str, float]:
     """Get performance metrics for a specific model"""
     return self.model_performance.get(model_key, {})
@@ -250,13 +1386,54 @@ class ModelManager:
       for key, metrics in self.model_performance.items()
     ]
   
+  def get_cache_stats(self) -> Dict[str, Any]:
+    """Get prediction cache and price table statistics"""
+    price_table = {
+      "models": list(self._model_set.price_table),
+      # The thread-safe prediction counter already counts table answers
+      "hits": int(sum(PREDICTIONS.value(model=key, source="table") for key in AVAILABLE_MODELS))
+    }
+    if self.cache is None:
+      return {"enabled": False, "model_version": self.model_version, "price_table": price_table}
+    return {
+      "enabled": True,
+      "model_version": self.model_version,
+      "price_table": price_table,
+      **self.cache.stats()
+    }
+  
   def is_model_loaded(self, model_key: str) -> bool:
     """Check if a model is loaded"""
     return model_key in self.models
   
   def get_loaded_models(self) -> list:
     """Get list of loaded model names"""
-    return [AVAILABLE_MODELS[key] for key in self.models.keys()]
+    return [AVAILABLE_MODELS[key] for key in list(self.models.keys())]
+  
+  def get_available_models(self) -> list:
+    """Get list of model names that are loaded or can be loaded on demand"""
+    return [AVAILABLE_MODELS[key] for key in self.model_stats.keys()]
+  
+  def get_memory_report(self) -> Dict[str, Any]:
+    """Get per-model load time and memory usage"""
+    model_set = self._model_set
+    return {
+      "load_mode": self.load_mode,
+      "model_version": model_set.version,
+      "loaded_at": model_set.loaded_at,
+      "memory_budget_mb": round(self.memory_budget_bytes / 1024 / 1024, 2),
+      "loaded_memory_mb": round(self._loaded_memory_bytes(model_set) / 1024 / 1024, 2),
+      "models": {
+        key: {
+          **stats,
+          "memory_mb": (
+            round(stats["memory_bytes"] / 1024 / 1024, 2)
+            if stats["memory_bytes"] is not None else None
+          )
+        }
+        for key, stats in model_set.model_stats.items()
+      }
+    }
 
 
 # Global model manager instance
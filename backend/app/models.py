@@ -2,9 +2,16 @@
 Pydantic models for request/response validation
 """
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime
 
+from app.config import (
+  DEFAULT_ARRIVALS,
+  DEFAULT_RAINFALL,
+  DEFAULT_TEMPERATURE,
+  MAX_FORECAST_HORIZON
+)
+
 
 class PredictionRequest(BaseModel):
   """Request model for price prediction"""
@@ -13,9 +20,9 @@ class PredictionRequest(BaseModel):
   city: str = Field(..., description="Market city (e.g., Bangalore, Delhi)")
   variety: str = Field(..., description="Chilli variety (e.g., Guntur, Byadgi)")
   model: str = Field(default="random_forest", description="ML model to use")
-  arrivals: Optional[float] = Field(default=2000, description="Expected arrivals in quintals")
-  rainfall: Optional[float] = Field(default=50, description="Expected rainfall in mm")
-  temperature: Optional[float] = Field(default=28, description="Expected temperature in °C")
+  arrivals: Optional[float] = Field(default=DEFAULT_ARRIVALS, description="Expected arrivals in quintals")
+  rainfall: Optional[float] = Field(default=DEFAULT_RAINFALL, description="Expected rainfall in mm")
+  temperature: Optional[float] = Field(default=DEFAULT_TEMPERATURE, description="Expected temperature in °C")
 
   class Config:
     json_schema_extra = {
@@ -35,32 +42,147 @@ class PredictionRequest(BaseModel):
 class PredictionResponse(BaseModel):
   """Response model for price prediction"""
   predicted_price: float = Field(..., description="Predicted price per quintal in ₹")
-  confidence: float = Field(..., ge=0, le=100, description="Prediction confidence percentage")
+  confidence: float = Field(
+    ..., ge=0, le=100,
+    description="Prediction confidence percentage: 100 minus the interval half-width as a % of the price"
+  )
+  lower_bound: Optional[float] = Field(default=None, description="Lower bound of the prediction interval in ₹")
+  upper_bound: Optional[float] = Field(default=None, description="Upper bound of the prediction interval in ₹")
+  interval_coverage: Optional[float] = Field(default=None, description="Nominal coverage of the prediction interval")
+  interval_method: Optional[str] = Field(
+    default=None, description="How the interval was computed (tree_quantiles or residual_quantiles)"
+  )
   model_used: str = Field(..., description="ML model used for prediction")
   accuracy: float = Field(..., description="Model accuracy percentage")
   mae: float = Field(..., description="Mean Absolute Error")
   r2_score: float = Field(..., description="R² Score")
+  model_version: Optional[str] = Field(default=None, description="Version of the models that served the prediction")
   timestamp: datetime = Field(default_factory=datetime.now, description="Prediction timestamp")
 
   class Config:
     json_schema_extra = {
       "example": {
         "predicted_price": 28404.8,
-        "confidence": 98.2,
+        "confidence": 91.6,
+        "lower_bound": 25930.4,
+        "upper_bound": 30000.0,
+        "interval_coverage": 0.9,
+        "interval_method": "tree_quantiles",
         "model_used": "Random Forest",
         "accuracy": 98.2,
         "mae": 1.02,
         "r2_score": 0.998,
+        "model_version": "3f9a1c2b7d4e",
         "timestamp": "2025-12-06T10:30:00"
       }
     }
 
 
+class BatchPredictionRequest(BaseModel):
+  """Request model for batch price prediction"""
+  scenarios: List[PredictionRequest] = Field(
+    ..., min_length=1, description="Prediction scenarios to score in one call"
+  )
+
+  class Config:
+    json_schema_extra = {
+      "example": {
+        "scenarios": [
+          {"year": 2025, "month": 3, "city": "Bangalore", "variety": "Guntur", "model": "random_forest"},
+          {"year": 2025, "month": 4, "city": "Delhi", "variety": "Byadgi", "model": "xgboost"}
+        ]
+      }
+    }
+
+
+class BatchPredictionItem(BaseModel):
+  """Result for a single scenario in a batch prediction"""
+  index: int = Field(..., description="Position of the scenario in the request")
+  prediction: Optional[PredictionResponse] = Field(default=None, description="Prediction if successful")
+  error: Optional[str] = Field(default=None, description="Error message if the scenario failed")
+
+
+class BatchPredictionResponse(BaseModel):
+  """Response model for batch price prediction"""
+  results: List[BatchPredictionItem] = Field(..., description="Results in request order")
+  total: int = Field(..., description="Number of scenarios received")
+  succeeded: int = Field(..., description="Number of scenarios scored successfully")
+  failed: int = Field(..., description="Number of scenarios that failed")
+
+
+class ForecastRequest(BaseModel):
+  """Request model for a city x variety x month forecast grid"""
+  cities: List[str] = Field(..., min_length=1, description="Market cities to forecast")
+  varieties: List[str] = Field(..., min_length=1, description="Chilli varieties to forecast")
+  start_year: int = Field(..., ge=2020, le=2030, description="Year of the first forecast month")
+  start_month: int = Field(..., ge=1, le=12, description="First forecast month (1-12)")
+  horizon: int = Field(
+    default=12, ge=1, le=MAX_FORECAST_HORIZON, description="Number of months to forecast"
+  )
+  model: str = Field(default="random_forest", description="ML model to use")
+  arrivals: float = Field(default=DEFAULT_ARRIVALS, description="Expected arrivals in quintals")
+  rainfall: float = Field(default=DEFAULT_RAINFALL, description="Expected rainfall in mm")
+  temperature: float = Field(default=DEFAULT_TEMPERATURE, description="Expected temperature in °C")
+
+  class Config:
+    json_schema_extra = {
+      "example": {
+        "cities": ["Bangalore", "Delhi"],
+        "varieties": ["Guntur", "Byadgi"],
+        "start_year": 2025,
+        "start_month": 1,
+        "horizon": 12,
+        "model": "random_forest"
+      }
+    }
+
+
+class ForecastResponse(BaseModel):
+  """Response model for a forecast grid"""
+  periods: List[str] = Field(..., description="Forecast months as YYYY-MM")
+  cities: List[str] = Field(..., description="Cities in grid order")
+  varieties: List[str] = Field(..., description="Varieties in grid order")
+  prices: List[List[List[float]]] = Field(
+    ..., description="Predicted prices indexed as [city][variety][period]"
+  )
+  model_used: str = Field(..., description="ML model used for prediction")
+  accuracy: float = Field(..., description="Model accuracy percentage")
+  mae: float = Field(..., description="Mean Absolute Error")
+  r2_score: float = Field(..., description="R² Score")
+  model_version: Optional[str] = Field(default=None, description="Version of the models that served the forecast")
+  timestamp: datetime = Field(default_factory=datetime.now, description="Forecast timestamp")
+
+
+class MarketStatistics(BaseModel):
+  """Historical price statistics behind the insights"""
+  samples: int = Field(..., description="Historical records for the market")
+  mean_price: float = Field(..., description="Average price")
+  volatility: float = Field(..., description="Coefficient of variation of prices")
+  seasonal_index: Optional[float] = Field(None, description="Month's average price relative to the yearly norm (100 = norm)")
+  month_volatility: Optional[float] = Field(None, description="Coefficient of variation of the month's prices")
+  peak_month: Optional[int] = None
+  trough_month: Optional[int] = None
+  latest_year: Optional[int] = None
+  yoy_change_pct: Optional[float] = Field(None, description="Latest year's average price vs the year before, in %")
+  elasticity: Optional[float] = Field(None, description="Log-log slope of price on arrivals")
+
+
 class InsightResponse(BaseModel):
   """Response model for AI insights"""
   insights: List[str] = Field(..., description="List of market insights")
   risk_alerts: List[str] = Field(..., description="Risk and warning alerts")
   trend_summary: str = Field(..., description="Overall trend summary")
+  statistics: Optional[MarketStatistics] = Field(None, description="Statistics the insights are based on")
+
+
+class HistoryResponse(BaseModel):
+  """Response model for a page of historical prices"""
+  total: int = Field(..., description="Rows matching the filters")
+  offset: int = Field(..., description="Position of the first returned row")
+  limit: int = Field(..., description="Maximum rows per page")
+  next_offset: Optional[int] = Field(None, description="Offset of the next page, or null on the last page")
+  columns: List[str] = Field(..., description="Columns included in each row")
+  rows: List[Dict[str, Any]] = Field(..., description="Rows ordered by city, variety, year and month")
 
 
 class ModelPerformance(BaseModel):
@@ -0,0 +1,155 @@
+"""
+Pre-fork Server Launcher
+Loads the app and its models once, then forks uvicorn workers that share
+the listening socket and the parent's model memory
+
+Usage:
+  MODEL_ARTIFACT_FORMAT=mmap python -m app.prefork --workers 4
+
+Reloading models:
+  Each worker reloads on its own when model_manager.poll() sees new
+  artifacts on disk (MODEL_CHECK_INTERVAL), but then holds a private copy
+  of the models. Send the parent SIGHUP to reload them there and replace
+  the workers with fresh forks that share the new models again; the old
+  workers finish their in-flight requests and exit.
+
+  kill -HUP <parent pid>
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+import uvicorn
+
+from app.config import API_HOST, API_PORT
+
+logger = logging.getLogger(__name__)
+
+
+def _bind_socket(host: str, port: int) -> socket.socket:
+  """Create the listening socket shared by every worker"""
+  family = socket.AF_INET6 if ":" in host else socket.AF_INET
+  sock = socket.socket(family, socket.SOCK_STREAM)
+  sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+  sock.bind((host, port))
+  sock.listen(2048)
+  sock.set_inheritable(True)
+  return sock
+
+
+def _check_single_threaded():
+  """Refuse to fork while other threads run (their held locks would be copied)"""
+  others = [thread.name for thread in threading.enumerate() if thread is not threading.main_thread()]
+  if others:
+    raise RuntimeError(f"Threads started before fork: {', '.join(others)}")
+
+
+def _run_worker(app, sock: socket.socket, log_level: str):
+  """Serve requests in a forked child until told to stop"""
+  # Forget the parent's handlers; uvicorn installs its own
+  signal.signal(signal.SIGINT, signal.SIG_DFL)
+  signal.signal(signal.SIGTERM, signal.SIG_DFL)
+  signal.signal(signal.SIGHUP, signal.SIG_DFL)
+  config = uvicorn.Config(app, log_level=log_level)
+  server = uvicorn.Server(config)
+  server.run(sockets=[sock])
+
+
+def main():
+  """Load models in the parent, then fork the workers"""
+  parser = argparse.ArgumentParser(description="Run the API with pre-forked workers")
+  parser.add_argument("--host", default=API_HOST)
+  parser.add_argument("--port", type=int, default=API_PORT)
+  parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+  parser.add_argument("--log-level", default="info")
+  args = parser.parse_args()
+
+  # Load the models before forking. Pages loaded here (or memory-mapped,
+  # with MODEL_ARTIFACT_FORMAT=mmap) are shared with every forked worker
+  # instead of being loaded once per worker; the workers' startup hook
+  # then finds them already loaded. Dataset views, the inference pool and
+  # other background threads are started by each worker after the fork.
+  start = time.perf_counter()
+  from app.main import app
+  from app.ml_models import model_manager
+  from app.startup import startup_report
+  with startup_report.phase("load_models_before_fork"):
+    model_manager.ensure_loaded()
+  logger.info(f"Loaded application and models in {time.perf_counter() - start:.2f}s")
+  _check_single_threaded()
+
+  sock = _bind_socket(args.host, args.port)
+  logger.info(f"🚀 Pre-fork server on http://{args.host}:{args.port} with {args.workers} workers")
+
+  workers = set()
+  retiring = set()
+
+  def spawn():
+    pid = os.fork()
+    if pid == 0:
+      try:
+        _run_worker(app, sock, args.log_level)
+      finally:
+        os._exit(0)
+    workers.add(pid)
+
+  for _ in range(args.workers):
+    spawn()
+
+  def stop(signum, frame):
+    for pid in workers:
+      try:
+        os.kill(pid, signal.SIGTERM)
+      except ProcessLookupError:
+        pass
+
+  def reload(signum, frame):
+    # Signal handlers run on the main thread between bytecodes, so
+    # loading and forking here is safe
+    logger.info("SIGHUP: reloading models and replacing workers")
+    try:
+      model_manager.load_models()
+      _check_single_threaded()
+    except Exception as e:
+      logger.error(f"✗ Reload failed, keeping the current workers: {e}")
+      return
+    old = set(workers)
+    for _ in range(args.workers):
+      spawn()
+    retiring.update(old)
+    for pid in old:
+      try:
+        os.kill(pid, signal.SIGTERM)
+      except ProcessLookupError:
+        pass
+
+  signal.signal(signal.SIGINT, stop)
+  signal.signal(signal.SIGTERM, stop)
+  signal.signal(signal.SIGHUP, reload)
+
+  exit_code = 0
+  while workers:
+    try:
+      pid, status = os.waitpid(-1, 0)
+    except InterruptedError:
+      continue
+    except ChildProcessError:
+      break
+    workers.discard(pid)
+    if pid in retiring:
+      retiring.discard(pid)
+      continue
+    if os.waitstatus_to_exitcode(status) not in (0, -signal.SIGTERM):
+      exit_code = 1
+
+  sock.close()
+  sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,143 @@
+"""
+Request Profiling
+Opt-in per-request stage timings and sampled cProfile captures
+"""
+import cProfile
+import itertools
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from app.config import DEBUG_PROFILE_ENABLED, PROFILE_SAMPLE_RATE, PROFILE_DIR
+
+logger = logging.getLogger(__name__)
+
+DEBUG_HEADER = b"x-debug-timing"
+DEBUG_QUERY_PARAM = "debug_timing"
+
+
+class StageTimer:
+  """Stage durations collected while one request is handled"""
+
+  def __init__(self, profile: bool = False):
+    self.started = time.perf_counter()
+    self._last = self.started
+    self.stages: List[Tuple[str, float]] = []
+    # Capture a cProfile of this request's inference call
+    self.profile = profile
+
+  def add(self, name: str, seconds: float):
+    """Record a stage measured elsewhere (does not move the checkpoint)"""
+    self.stages.append((name, seconds))
+
+  def checkpoint(self, name: str):
+    """Record the time since the previous checkpoint as a stage"""
+    now = time.perf_counter()
+    self.stages.append((name, now - self._last))
+    self._last = now
+
+  def server_timing(self) -> str:
+    """Stages formatted as a Server-Timing header value (milliseconds)"""
+    entries = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.stages]
+    entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.3f}")
+    return ", ".join(entries)
+
+
+_current_timer: ContextVar[Optional[StageTimer]] = ContextVar("stage_timer", default=None)
+_sample_counter = itertools.count(1)
+_profile_counter = itertools.count(1)
+
+
+def current_timer() -> Optional[StageTimer]:
+  """Timer for the request being handled, or None when timing is off"""
+  return _current_timer.get()
+
+
+def checkpoint(name: str):
+  """Checkpoint the current request's timer, if any"""
+  timer = _current_timer.get()
+  if timer is not None:
+    timer.checkpoint(name)
+
+
+def should_profile() -> bool:
+  """Decide whether the next inference call is captured with cProfile"""
+  timer = _current_timer.get()
+  if timer is not None and timer.profile:
+    return True
+  return PROFILE_SAMPLE_RATE > 0 and next(_sample_counter) % PROFILE_SAMPLE_RATE == 0
+
+
+def run_profiled(label: str, func: Callable[..., Any], **kwargs) -> Any:
+  """Run func under cProfile and write the stats to PROFILE_DIR"""
+  profiler = cProfile.Profile()
+  try:
+    return profiler.runcall(func, **kwargs)
+  finally:
+    try:
+      PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+      path = PROFILE_DIR / (
+        f"{time.strftime('%Y%m%d-%H%M%S')}-{label}-{os.getpid()}-{next(_profile_counter)}.prof"
+      )
+      profiler.dump_stats(str(path))
+      # Logged only: the server's paths are not returned to clients
+      logger.info("Wrote profile %s", path)
+    except Exception as e:
+      logger.warning(f"✗ Failed to write profile: {e}")
+
+
+def _requested_mode(scope) -> Optional[str]:
+  """Timing mode asked for by the request header or query flag"""
+  for name, value in scope.get("headers", ()):
+    if name == DEBUG_HEADER:
+      return value.decode("latin-1").strip().lower()
+  query = scope.get("query_string", b"")
+  if DEBUG_QUERY_PARAM.encode() in query:
+    values = parse_qs(query.decode("latin-1")).get(DEBUG_QUERY_PARAM)
+    if values:
+      return values[0].strip().lower()
+  return None
+
+
+class ProfilingMiddleware:
+  """
+  ASGI middleware that times opted-in requests
+
+  The request's StageTimer is held in a context variable, so endpoints and
+  ModelManager add their stages without it being passed around. Stages are
+  returned in a Server-Timing response header. Profile mode is honoured
+  only with DEBUG_PROFILE_ENABLED.
+  """
+
+  def __init__(self, app):
+    self.app = app
+
+  async def __call__(self, scope, receive, send):
+    if scope["type"] != "http":
+      await self.app(scope, receive, send)
+      return
+
+    mode = _requested_mode(scope)
+    if mode in (None, "", "0", "false", "off"):
+      await self.app(scope, receive, send)
+      return
+
+    timer = StageTimer(profile=mode == "profile" and DEBUG_PROFILE_ENABLED)
+    token = _current_timer.set(timer)
+
+    async def send_wrapper(message):
+      if message["type"] == "http.response.start":
+        # Time since the endpoint's last checkpoint is response serialization
+        timer.checkpoint("serialization")
+        headers = list(message.get("headers", []))
+        headers.append((b"server-timing", timer.server_timing().encode("latin-1")))
+        message = {**message, "headers": headers}
+      await send(message)
+
+    try:
+      await self.app(scope, receive, send_wrapper)
+    finally:
+      _current_timer.reset(token)
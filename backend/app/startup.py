@@ -0,0 +1,62 @@
+"""
+Startup Timing
+Breaks server cold start down by phase (imports, directories, model loading)
+"""
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+class StartupReport:
+  """Durations of the startup phases of one server process"""
+
+  def __init__(self):
+    self.started = time.perf_counter()
+    self.started_at = datetime.now().isoformat()
+    self._last_mark = self.started
+    self.phases: List[Dict[str, Any]] = []
+    self.ready_at: Optional[str] = None
+    self.total_ms: Optional[float] = None
+
+  def _add(self, name: str, seconds: float):
+    self.phases.append({"phase": name, "duration_ms": round(seconds * 1000, 2)})
+
+  def mark(self, name: str):
+    """Record the time since the previous mark as a phase (e.g. an import block)"""
+    now = time.perf_counter()
+    self._add(name, now - self._last_mark)
+    self._last_mark = now
+
+  @contextmanager
+  def phase(self, name: str):
+    """Record the duration of a with-block as a phase"""
+    start = time.perf_counter()
+    try:
+      yield
+    finally:
+      now = time.perf_counter()
+      self._add(name, now - start)
+      self._last_mark = now
+
+  def ready(self):
+    """Mark the server as ready to accept requests"""
+    self.total_ms = round((time.perf_counter() - self.started) * 1000, 2)
+    self.ready_at = datetime.now().isoformat()
+
+  def summary(self) -> str:
+    """One-line summary for the startup log"""
+    phases = ", ".join(f"{p['phase']} {p['duration_ms']:.0f}ms" for p in self.phases)
+    return f"{self.total_ms:.0f}ms ({phases})"
+
+  def to_dict(self) -> Dict[str, Any]:
+    return {
+      "started_at": self.started_at,
+      "ready_at": self.ready_at,
+      "total_ms": self.total_ms,
+      "phases": list(self.phases)
+    }
+
+
+# Created when the app package starts importing, so import time is covered
+startup_report = StartupReport()
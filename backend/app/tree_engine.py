@@ -0,0 +1,387 @@
+"""
+Compiled Tree Inference Engine
+Flattens random forests and boosted trees into NumPy node arrays and
+evaluates every tree for every row with one vectorized traversal.
+Compiled models can be saved as memory-mappable .npy artifacts.
+"""
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# sklearn marks leaves with a child index of -1
+_TREE_LEAF = -1
+
+
+class CompiledTreeEnsemble:
+  """
+  Array representation of a tree ensemble
+
+  All trees share flat node arrays (feature, threshold, left, right,
+  value); roots holds each tree's root node. Leaves point to themselves,
+  so a traversal can keep stepping every (row, tree) pair in lockstep
+  until all of them have reached a leaf.
+  """
+
+  def __init__(
+    self,
+    feature: np.ndarray,
+    threshold: np.ndarray,
+    left: np.ndarray,
+    right: np.ndarray,
+    value: np.ndarray,
+    roots: np.ndarray,
+    max_depth: int,
+    strict_less: bool,
+    aggregation: str,
+    base_score: float = 0.0,
+    source: str = "",
+    is_leaf: Optional[np.ndarray] = None
+  ):
+    self.feature = feature
+    self.threshold = threshold
+    self.left = left
+    self.right = right
+    self.value = value
+    self.roots = roots
+    self.is_leaf = is_leaf if is_leaf is not None else left == np.arange(len(left))
+    self.max_depth = int(max_depth)
+    # XGBoost sends x < threshold left, sklearn sends x <= threshold left
+    self.strict_less = bool(strict_less)
+    # "mean" for random forests, "sum" (plus base score) for boosting
+    self.aggregation = aggregation
+    self.base_score = float(base_score)
+    self.source = source
+
+  @property
+  def n_trees(self) -> int:
+    return len(self.roots)
+
+  @property
+  def nbytes(self) -> int:
+    """Memory held by the node arrays"""
+    return sum(
+      array.nbytes for array in (
+        self.feature, self.threshold, self.left, self.right,
+        self.value, self.roots, self.is_leaf
+      )
+    )
+
+  def leaf_values(self, X: np.ndarray) -> np.ndarray:
+    """Evaluate every tree for every row; returns an (n_rows, n_trees) array"""
+    # Both sklearn and XGBoost compare features in float32
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    rows = np.arange(X.shape[0])[:, None]
+    node = np.broadcast_to(self.roots, (X.shape[0], self.n_trees)).copy()
+
+    for _ in range(self.max_depth):
+      values = X[rows, self.feature[node]]
+      thresholds = self.threshold[node]
+      if self.strict_less:
+        go_left = values < thresholds
+      else:
+        go_left = values <= thresholds
+      node = np.where(go_left, self.left[node], self.right[node])
+      if self.is_leaf[node].all():
+        break
+
+    return self.value[node]
+
+  def predict(self, X: np.ndarray) -> np.ndarray:
+    """Predict a batch (or a single row) of features"""
+    leaves = self.leaf_values(X)
+    if self.aggregation == "mean":
+      return leaves.mean(axis=1)
+    return leaves.sum(axis=1) + self.base_score
+
+  @classmethod
+  def from_random_forest(cls, model: Any) -> "CompiledTreeEnsemble":
+    """Compile a fitted sklearn RandomForestRegressor (single output)"""
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+
+    for estimator in model.estimators_:
+      tree = estimator.tree_
+      if tree.n_outputs != 1:
+        raise ValueError("Only single-output forests can be compiled")
+
+      n_nodes = tree.node_count
+      own = np.arange(n_nodes)
+      leaf = tree.children_left == _TREE_LEAF
+
+      features.append(np.where(leaf, 0, tree.feature))
+      thresholds.append(np.where(leaf, np.inf, tree.threshold))
+      lefts.append(np.where(leaf, own, tree.children_left) + offset)
+      rights.append(np.where(leaf, own, tree.children_right) + offset)
+      values.append(tree.value.reshape(n_nodes))
+      roots.append(offset)
+
+      max_depth = max(max_depth, tree.max_depth)
+      offset += n_nodes
+
+    return cls(
+      feature=np.concatenate(features).astype(np.int32),
+      threshold=np.concatenate(thresholds).astype(np.float64),
+      left=np.concatenate(lefts).astype(np.int32),
+      right=np.concatenate(rights).astype(np.int32),
+      value=np.concatenate(values).astype(np.float64),
+      roots=np.array(roots, dtype=np.int32),
+      max_depth=max_depth,
+      strict_less=False,
+      aggregation="mean",
+      source="random_forest"
+    )
+
+  @classmethod
+  def from_xgboost(cls, model: Any) -> "CompiledTreeEnsemble":
+    """Compile a fitted XGBRegressor with numeric splits and identity link"""
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    learner = json.loads(booster.save_raw(raw_format="json"))["learner"]
+
+    objective = learner["objective"]["name"]
+    if objective not in ("reg:squarederror", "reg:linear", "reg:absoluteerror"):
+      raise ValueError(f"Objective {objective} is not supported by the compiled engine")
+
+    trees = learner["gradient_booster"]["model"]["trees"]
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+
+    for tree in trees:
+      if tree["categories"]:
+        raise ValueError("Categorical splits are not supported by the compiled engine")
+
+      left = np.array(tree["left_children"], dtype=np.int64)
+      right = np.array(tree["right_children"], dtype=np.int64)
+      # For leaves, XGBoost stores the leaf weight in split_conditions
+      conditions = np.array(tree["split_conditions"], dtype=np.float32)
+      n_nodes = len(left)
+      own = np.arange(n_nodes)
+      leaf = left == -1
+
+      features.append(np.where(leaf, 0, tree["split_indices"]))
+      thresholds.append(np.where(leaf, np.inf, conditions))
+      lefts.append(np.where(leaf, own, left) + offset)
+      rights.append(np.where(leaf, own, right) + offset)
+      values.append(np.where(leaf, conditions, 0.0))
+      roots.append(offset)
+
+      max_depth = max(max_depth, _tree_depth(left, right))
+      offset += n_nodes
+
+    return cls(
+      feature=np.concatenate(features).astype(np.int32),
+      threshold=np.concatenate(thresholds).astype(np.float32),
+      left=np.concatenate(lefts).astype(np.int32),
+      right=np.concatenate(rights).astype(np.int32),
+      value=np.concatenate(values).astype(np.float64),
+      roots=np.array(roots, dtype=np.int32),
+      max_depth=max_depth,
+      strict_less=True,
+      aggregation="sum",
+      base_score=float(learner["learner_model_param"]["base_score"]),
+      source="xgboost"
+    )
+
+
+class CompiledLinearModel:
+  """Coefficient-array form of a fitted linear regression"""
+
+  def __init__(self, coef: np.ndarray, intercept: float, source: str = "linear_regression"):
+    self.coef = coef
+    self.intercept = float(intercept)
+    self.source = source
+
+  @property
+  def nbytes(self) -> int:
+    return self.coef.nbytes
+
+  def predict(self, X: np.ndarray) -> np.ndarray:
+    return np.asarray(X, dtype=np.float64) @ self.coef + self.intercept
+
+  @classmethod
+  def from_linear_regression(cls, model: Any) -> "CompiledLinearModel":
+    """Compile a fitted single-output sklearn linear model"""
+    coef = np.asarray(model.coef_, dtype=np.float64)
+    if coef.ndim != 1:
+      raise ValueError("Only single-output linear models can be compiled")
+    return cls(coef=coef, intercept=float(np.ravel(model.intercept_)[0]))
+
+
+class RoutedModel:
+  """
+  Native model plus its compiled form, routed by batch size
+
+  The array traversal avoids the native per-call overhead (input
+  validation, joblib dispatch), which dominates for a handful of rows;
+  for large batches the native C/C++ predictors are faster.
+  """
+
+  def __init__(self, native: Any, compiled: CompiledTreeEnsemble, max_compiled_rows: int):
+    self.native = native
+    self.compiled = compiled
+    self.max_compiled_rows = max_compiled_rows
+
+  def predict(self, X: np.ndarray) -> np.ndarray:
+    if len(X) <= self.max_compiled_rows:
+      return self.compiled.predict(X)
+    return self.native.predict(X)
+
+  def leaf_values(self, X: np.ndarray) -> np.ndarray:
+    """Per-tree outputs, an (n_rows, n_trees) array, routed like predict"""
+    if len(X) <= self.max_compiled_rows or not hasattr(self.native, "apply"):
+      return self.compiled.leaf_values(X)
+    # sklearn's apply() returns each tree's leaf node id, which is the
+    # node's position within that tree in the flattened arrays
+    return self.compiled.value[self.compiled.roots + self.native.apply(X)]
+
+
+def _tree_depth(left: np.ndarray, right: np.ndarray) -> int:
+  """Depth of a tree given child index arrays (-1 for leaves)"""
+  depth = 0
+  level: List[int] = [0]
+  while level:
+    children = [child for node in level for child in (left[node], right[node]) if child != -1]
+    if not children:
+      break
+    depth += 1
+    level = children
+  return depth
+
+
+CompiledModel = Union[CompiledTreeEnsemble, CompiledLinearModel]
+
+# Array attributes written to / read from an artifact directory
+_TREE_ARRAYS = ["feature", "threshold", "left", "right", "value", "roots", "is_leaf"]
+_LINEAR_ARRAYS = ["coef"]
+
+
+def compile_model(model_key: str, model: Any) -> CompiledModel:
+  """Compile a fitted model by its key in AVAILABLE_MODELS"""
+  if model_key == "random_forest":
+    return CompiledTreeEnsemble.from_random_forest(model)
+  if model_key == "xgboost":
+    return CompiledTreeEnsemble.from_xgboost(model)
+  if model_key == "linear_regression":
+    return CompiledLinearModel.from_linear_regression(model)
+  raise ValueError(f"No compiled backend for model: {model_key}")
+
+
+def save_compiled(model: CompiledModel, directory: Union[str, Path], extra: Dict[str, Any] = None):
+  """
+  Save a compiled model as one .npy file per array plus meta.json
+
+  Plain .npy files can be memory-mapped, so every process that loads the
+  artifact shares a single page-cache copy of the arrays.
+  """
+  directory = Path(directory)
+  directory.mkdir(parents=True, exist_ok=True)
+
+  if isinstance(model, CompiledTreeEnsemble):
+    arrays = _TREE_ARRAYS
+    meta = {
+      "kind": "tree_ensemble",
+      "max_depth": model.max_depth,
+      "strict_less": model.strict_less,
+      "aggregation": model.aggregation,
+      "base_score": model.base_score,
+      "source": model.source
+    }
+  else:
+    arrays = _LINEAR_ARRAYS
+    meta = {"kind": "linear", "intercept": model.intercept, "source": model.source}
+
+  # Files are written under a temporary name and renamed into place, so
+  # processes still mapping the old artifact keep reading the old inode
+  for name in arrays:
+    tmp_path = directory / f"{name}.npy.tmp"
+    with open(tmp_path, "wb") as f:
+      np.save(f, np.ascontiguousarray(getattr(model, name)))
+    os.replace(tmp_path, directory / f"{name}.npy")
+
+  # meta.json is written last: its presence marks a complete artifact
+  meta.update(extra or {})
+  tmp_path = directory / "meta.json.tmp"
+  with open(tmp_path, "w") as f:
+    json.dump(meta, f, indent=2)
+  os.replace(tmp_path, directory / "meta.json")
+
+
+def load_compiled(directory: Union[str, Path], mmap: bool = True) -> CompiledModel:
+  """Load a compiled model saved by save_compiled (read-only memory map by default)"""
+  directory = Path(directory)
+  with open(directory / "meta.json") as f:
+    meta = json.load(f)
+
+  mmap_mode = "r" if mmap else None
+
+  def array(name: str) -> np.ndarray:
+    return np.load(directory / f"{name}.npy", mmap_mode=mmap_mode)
+
+  if meta["kind"] == "linear":
+    return CompiledLinearModel(array("coef"), meta["intercept"], meta.get("source", ""))
+
+  return CompiledTreeEnsemble(
+    feature=array("feature"),
+    threshold=array("threshold"),
+    left=array("left"),
+    right=array("right"),
+    value=array("value"),
+    roots=array("roots"),
+    max_depth=meta["max_depth"],
+    strict_less=meta["strict_less"],
+    aggregation=meta["aggregation"],
+    base_score=meta["base_score"],
+    source=meta.get("source", ""),
+    is_leaf=array("is_leaf")
+  )
+
+
+def check_parity(
+  native: Any,
+  compiled: CompiledModel,
+  X: np.ndarray,
+  rtol: float = 1e-5,
+  atol: float = 1e-2
+) -> float:
+  """
+  Compare compiled and native predictions on X
+
+  Returns the largest absolute difference; raises ValueError if any
+  prediction differs by more than the tolerance.
+  """
+  expected = np.asarray(native.predict(X), dtype=np.float64)
+  actual = compiled.predict(X)
+  max_error = float(np.max(np.abs(expected - actual))) if len(X) else 0.0
+  if not np.allclose(actual, expected, rtol=rtol, atol=atol):
+    raise ValueError(f"Compiled predictions differ from native (max error {max_error:.6f})")
+  return max_error
+
+
+def export_compiled(
+  model_key: str,
+  model: Any,
+  directory: Union[str, Path],
+  X_check: np.ndarray,
+  fingerprint: Optional[str] = None
+) -> float:
+  """
+  Compile a fitted model, verify it on X_check and save it; returns the parity error
+
+  fingerprint is the content hash of the .pkl the model was loaded from;
+  it is stored in meta.json so artifacts built against that .pkl (price
+  table, interval calibration) can be matched without reading it.
+  """
+  compiled = compile_model(model_key, model)
+  max_error = check_parity(model, compiled, X_check)
+  extra = {"parity_max_error": max_error}
+  if fingerprint is not None:
+    extra["fingerprint"] = fingerprint
+  save_compiled(compiled, directory, extra=extra)
+  return max_error
@@ -0,0 +1,354 @@
+"""
+Performance Benchmark Suite
+Times ModelManager inference, the API endpoints (in-process) and the
+dataset generation / training pipeline, and writes the results as JSON
+
+Usage:
+  python scripts/benchmark.py --output bench.json
+  python scripts/benchmark.py --suites model,api --compare bench.json
+  python scripts/benchmark.py --suites training --sizes 1000,10000,50000
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+# Add backend to path
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+BATCH_SIZES = [1, 32, 256, 2048]
+TRAINING_STAGES = [
+  "load_data",
+  "preprocess_data",
+  "train_random_forest",
+  "train_xgboost",
+  "train_linear_regression"
+]
+
+
+def summarize(name: str, times: List[float], rows: int = 1, **extra) -> Dict[str, Any]:
+  """Summarize per-run wall times (seconds) for one benchmark"""
+  ms = np.asarray(times) * 1000
+  median = float(np.median(ms))
+  result = {
+    "name": name,
+    "runs": len(ms),
+    "rows": rows,
+    "mean_ms": round(float(ms.mean()), 4),
+    "median_ms": round(median, 4),
+    "p95_ms": round(float(np.percentile(ms, 95)), 4),
+    "min_ms": round(float(ms.min()), 4),
+    "max_ms": round(float(ms.max()), 4),
+    "rows_per_sec": round(rows / (median / 1000), 1) if median > 0 else None
+  }
+  result.update(extra)
+  log(f"  {name:<58} median {median:10.3f} ms  p95 {result['p95_ms']:10.3f} ms")
+  return result
+
+
+def time_call(func: Callable[[], Any], repeat: int, warmup: int) -> List[float]:
+  """Wall time of repeated calls after a warmup"""
+  for _ in range(warmup):
+    func()
+  times = []
+  for _ in range(repeat):
+    start = time.perf_counter()
+    func()
+    times.append(time.perf_counter() - start)
+  return times
+
+
+async def time_async_call(func: Callable[[], Any], repeat: int, warmup: int) -> List[float]:
+  """Wall time of repeated awaited calls after a warmup"""
+  for _ in range(warmup):
+    await func()
+  times = []
+  for _ in range(repeat):
+    start = time.perf_counter()
+    await func()
+    times.append(time.perf_counter() - start)
+  return times
+
+
+def log(message: str = ""):
+  """Progress output (stderr, so stdout can carry the JSON report)"""
+  print(message, file=sys.stderr)
+
+
+@contextlib.contextmanager
+def quiet():
+  """Silence the pipeline's progress output while it is being timed"""
+  with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+    yield
+
+
+def sample_scenarios(n: int, seed: int, model_key: str = "random_forest") -> List[Dict[str, Any]]:
+  """Seeded prediction scenarios over the encoder's cities and varieties"""
+  from app.ml_models import model_manager
+
+  rng = np.random.default_rng(seed)
+  cities = list(model_manager.encoders.get("city", {})) or ["Bangalore"]
+  varieties = list(model_manager.encoders.get("variety", {})) or ["Guntur"]
+  return [
+    {
+      "model": model_key,
+      "year": 2025,
+      "month": int(rng.integers(1, 13)),
+      "city": cities[int(rng.integers(len(cities)))],
+      "variety": varieties[int(rng.integers(len(varieties)))],
+      "arrivals": round(float(rng.uniform(500, 4000)), 1),
+      "rainfall": round(float(rng.uniform(0, 300)), 1),
+      "temperature": round(float(rng.uniform(15, 40)), 1)
+    }
+    for _ in range(n)
+  ]
+
+
+def bench_model_manager(args) -> List[Dict[str, Any]]:
+  """Single-row and batched ModelManager inference per model"""
+  from app.ml_models import model_manager
+
+  log("\n🧠 ModelManager")
+  results = []
+
+  for model_key in model_manager.model_stats:
+    scenarios = sample_scenarios(max(BATCH_SIZES), args.seed, model_key)
+    single = scenarios[0]
+    kwargs = {key: value for key, value in single.items() if key != "model"}
+
+    # Uncached: encode + inference + clamp on every call
+    times = time_call(
+      lambda: model_manager._predict_uncached(model_key, **kwargs),
+      args.repeat, args.warmup
+    )
+    results.append(summarize(f"model.predict_uncached[{model_key}]", times))
+
+    # Cached: repeated identical request served from the prediction cache
+    times = time_call(lambda: model_manager.predict(model_key, **kwargs), args.repeat, args.warmup)
+    results.append(summarize(f"model.predict_cached[{model_key}]", times))
+
+    for size in BATCH_SIZES:
+      batch = scenarios[:size]
+      repeat = max(3, args.repeat // max(1, size // 32))
+      times = time_call(lambda: model_manager.predict_batch(batch), repeat, args.warmup)
+      results.append(summarize(f"model.predict_batch[{model_key},n={size}]", times, rows=size))
+
+  return results
+
+
+def bench_api(args) -> List[Dict[str, Any]]:
+  """FastAPI endpoints through an in-process ASGI client"""
+  import httpx
+  from app.main import app
+
+  log("\n🌐 API (in-process)")
+  # A different seed from the ModelManager suite so "uncached" really misses
+  scenarios = sample_scenarios(max(256, 2 * (args.repeat + args.warmup)), args.seed + 1)
+
+  async def run() -> List[Dict[str, Any]]:
+    results = []
+    # Run the app's lifespan like a server would (models, dataset views, warm-up)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), \
+        httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+      async def get(path: str):
+        response = await client.get(path)
+        response.raise_for_status()
+
+      async def post(path: str, payload: Dict[str, Any]):
+        response = await client.post(path, json=payload)
+        response.raise_for_status()
+
+      unique = iter(scenarios[1:])
+      cases = [
+        ("GET /health", lambda: get("/health"), 1),
+        ("GET /api/models", lambda: get("/api/models"), 1),
+        ("GET /api/insights", lambda: get("/api/insights?city=Bangalore&variety=Guntur"), 1),
+        ("POST /api/predict (uncached)", lambda: post("/api/predict", next(unique)), 1),
+        ("POST /api/predict (cached)", lambda: post("/api/predict", scenarios[0]), 1),
+        (
+          "POST /api/predict/batch (n=256)",
+          lambda: post("/api/predict/batch", {"scenarios": scenarios[:256]}),
+          min(256, len(scenarios))
+        ),
+        (
+          "POST /api/forecast (12 months)",
+          lambda: post("/api/forecast", {
+            "cities": ["Bangalore", "Delhi"],
+            "varieties": ["Guntur", "Teja"],
+            "start_year": 2025,
+            "start_month": 1,
+            "horizon": 12
+          }),
+          48
+        )
+      ]
+      for name, call, rows in cases:
+        times = await time_async_call(call, args.repeat, args.warmup)
+        results.append(summarize(f"api.{name}", times, rows=rows))
+    return results
+
+  return asyncio.run(run())
+
+
+def bench_training(args) -> List[Dict[str, Any]]:
+  """generate_dataset and each ModelTrainer stage at several dataset sizes"""
+  from scripts.generate_dataset import generate_dataset
+  from scripts.train_models import ModelTrainer
+
+  log("\n🏋️ Training pipeline")
+  results = []
+
+  with tempfile.TemporaryDirectory() as tmp:
+    for size in args.sizes:
+      start = time.perf_counter()
+      with quiet():
+        df = generate_dataset(size, seed=args.seed)
+      results.append(summarize(
+        f"training.generate_dataset[n={size}]", [time.perf_counter() - start], rows=size
+      ))
+
+      data_path = Path(tmp) / f"dataset_{size}.csv"
+      df.to_csv(data_path, index=False)
+      del df
+
+      trainer = ModelTrainer(data_path)
+      for stage in TRAINING_STAGES:
+        start = time.perf_counter()
+        with quiet():
+          getattr(trainer, stage)()
+        results.append(summarize(
+          f"training.{stage}[n={size}]", [time.perf_counter() - start], rows=size
+        ))
+
+      start = time.perf_counter()
+      with quiet():
+        trainer.save_models(Path(tmp) / f"models_{size}")
+      results.append(summarize(
+        f"training.save_models[n={size}]", [time.perf_counter() - start], rows=size
+      ))
+
+  return results
+
+
+def environment_info() -> Dict[str, Any]:
+  """Machine, library and code version details for comparing runs"""
+  import sklearn
+  import xgboost
+  import pandas
+
+  try:
+    commit = subprocess.run(
+      ["git", "rev-parse", "--short", "HEAD"],
+      capture_output=True, text=True, cwd=str(BACKEND_DIR)
+    ).stdout.strip() or None
+  except Exception:
+    commit = None
+
+  return {
+    "timestamp": datetime.now().isoformat(),
+    "git_commit": commit,
+    "python": platform.python_version(),
+    "platform": platform.platform(),
+    "cpu_count": os.cpu_count(),
+    "numpy": np.__version__,
+    "pandas": pandas.__version__,
+    "sklearn": sklearn.__version__,
+    "xgboost": xgboost.__version__
+  }
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: Path, threshold: float) -> List[str]:
+  """Names of benchmarks whose median is slower than the baseline by more than threshold"""
+  baseline = {
+    result["name"]: result
+    for result in json.loads(baseline_path.read_text())["results"]
+  }
+  regressions = []
+
+  log(f"\n📊 Comparison with {baseline_path} (threshold {threshold:.0%})")
+  for result in results:
+    previous = baseline.get(result["name"])
+    if previous is None or not previous["median_ms"]:
+      continue
+    change = result["median_ms"] / previous["median_ms"] - 1
+    marker = "⚠" if change > threshold else "✓"
+    log(f"  {marker} {result['name']:<58} {previous['median_ms']:10.3f} → {result['median_ms']:10.3f} ms ({change:+.1%})")
+    if change > threshold:
+      regressions.append(result["name"])
+
+  return regressions
+
+
+def main():
+  """Run the selected benchmark suites"""
+  parser = argparse.ArgumentParser(description="Benchmark AgriAI inference, API and training")
+  parser.add_argument("--suites", default="model,api,training", help="Comma-separated: model, api, training")
+  parser.add_argument("--sizes", default="1000,10000", help="Dataset sizes for the training suite")
+  parser.add_argument("--repeat", type=int, default=50, help="Timed runs per inference benchmark")
+  parser.add_argument("--warmup", type=int, default=5, help="Untimed warmup runs")
+  parser.add_argument("--seed", type=int, default=42)
+  parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+  parser.add_argument("--compare", help="Baseline JSON file to compare against")
+  parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown vs baseline")
+  args = parser.parse_args()
+  args.sizes = [int(size) for size in args.sizes.split(",") if size]
+  suites = [suite.strip() for suite in args.suites.split(",") if suite.strip()]
+  
+  # Per-request log lines and warnings would be timed along with the work
+  logging.disable(logging.INFO)
+  warnings.filterwarnings("ignore")
+
+  log("=" * 60)
+  log("AgriAI Benchmark Suite")
+  log("=" * 60)
+
+  runners = {"model": bench_model_manager, "api": bench_api, "training": bench_training}
+  results = []
+  for suite in suites:
+    if suite not in runners:
+      parser.error(f"Unknown suite: {suite}")
+    results.extend(runners[suite](args))
+
+  report = {
+    "environment": environment_info(),
+    "settings": {
+      "suites": suites,
+      "sizes": args.sizes,
+      "repeat": args.repeat,
+      "warmup": args.warmup,
+      "seed": args.seed
+    },
+    "results": results
+  }
+
+  if args.output:
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    log(f"\n💾 Results saved to: {args.output}")
+  else:
+    print(json.dumps(report, indent=2))
+
+  if args.compare:
+    regressions = compare(results, Path(args.compare), args.threshold)
+    if regressions:
+      log(f"\n❌ {len(regressions)} benchmark(s) regressed")
+      sys.exit(1)
+
+
+if __name__ == "__main__":
+  main()
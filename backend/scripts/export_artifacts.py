@@ -0,0 +1,64 @@
+"""
+Export Memory-Mapped Model Artifacts
+Converts existing .pkl models into compiled .npy artifacts for
+MODEL_ARTIFACT_FORMAT=mmap without retraining
+"""
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import MODEL_PATH, COMPILED_MODEL_PATH, AVAILABLE_MODELS
+from app.ml_models import content_fingerprint
+from app.tree_engine import export_compiled
+
+
+def parity_sample(n_rows: int = 1000) -> np.ndarray:
+  """Feature rows spanning realistic input ranges"""
+  rng = np.random.default_rng(0)
+  return np.column_stack([
+    rng.uniform(500, 4000, n_rows),
+    rng.uniform(0, 300, n_rows),
+    rng.uniform(15, 40, n_rows),
+    rng.integers(1, 13, n_rows),
+    rng.integers(0, 24, n_rows),
+    rng.integers(0, 12, n_rows)
+  ]).astype(np.float64)
+
+
+def main():
+  """Export every trained model found in MODEL_PATH"""
+  print("=" * 60)
+  print("AgriAI Model Artifact Export")
+  print("=" * 60)
+  
+  X_check = parity_sample()
+  exported = 0
+  
+  for model_key in AVAILABLE_MODELS:
+    model_path = MODEL_PATH / f"{model_key}.pkl"
+    if not model_path.exists():
+      print(f"  ✗ {model_key}.pkl not found, skipping")
+      continue
+    
+    try:
+      model = joblib.load(model_path)
+      max_error = export_compiled(
+        model_key, model, COMPILED_MODEL_PATH / model_key, X_check,
+        fingerprint=content_fingerprint(model_path)
+      )
+      print(f"  ✓ Exported compiled/{model_key} (parity max error {max_error:.2e})")
+      exported += 1
+    except Exception as e:
+      print(f"  ⚠ Failed to export {model_key}: {e}")
+  
+  print(f"\n✅ Exported {exported} model(s) to {COMPILED_MODEL_PATH}")
+  print("   Set MODEL_ARTIFACT_FORMAT=mmap to serve them")
+
+
+if __name__ == "__main__":
+  main()
@@ -2,12 +2,39 @@
 Generate Sample Agricultural Dataset
 Creates 500,000+ sample records for model training
 High-quality dataset with comprehensive coverage of all scenarios
+
+Usage:
+  python scripts/generate_dataset.py
+  python scripts/generate_dataset.py --samples 5000000 --seed 42
+  python scripts/generate_dataset.py --method loop   # original row-by-row generator
+  python scripts/generate_dataset.py --samples 100000000 --shards 32 --workers 8 --seed 42
+
+With --shards, the rows are split across worker processes. Each shard has
+its own random stream spawned from the seed and is streamed to its own CSV
+chunk by chunk, so memory stays bounded by the chunk size. A manifest lists
+the shards, their row counts and seeds; the shards are then joined into the
+dataset file unless --no-join is given. Progress is printed as
+"PROGRESS {json}" lines for the admin API to follow.
 """
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta
 import random
 from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import DATASET_FILE
+from app.dataset_format import ColumnarWriter, is_columnar, write_columnar
 
 # Configuration
 NUM_SAMPLES = 145152  # Match frontend dataset size (21 years × 12 months × 24 cities × 12 varieties × 2 samples)
@@ -42,10 +69,131 @@ BASE_PRICES = {
   "Ellachipur": 24240
 }
 
-def generate_dataset(num_samples: int = NUM_SAMPLES) -> pd.DataFrame:
-  """Generate synthetic agricultural dataset"""
+# Market factor (some markets have premium prices) - match frontend
+MARKET_FACTORS = {
+  'Bangalore': 0.02,
+  'Mumbai': 0.04,
+  'Delhi': 0.03,
+  'Chennai': 0.0,
+  'Kolkata': -0.01,
+  'Hyderabad': 0.01,
+  'Pune': 0.02,
+  'Ahmedabad': 0.02,
+  'Jaipur': 0.01,
+  'Lucknow': -0.01,
+  'Kanpur': -0.02,
+  'Nagpur': 0.0,
+  'Indore': 0.01,
+  'Bhopal': -0.01,
+  'Visakhapatnam': 0.02,
+  'Patna': -0.02,
+  'Vadodara': 0.01,
+  'Ludhiana': 0.03,
+  'Agra': -0.01,
+  'Nashik': 0.0,
+  'Faridabad': 0.02,
+  'Meerut': -0.01,
+  'Rajkot': 0.01,
+  'Varanasi': -0.02
+}
+
+MONSOON_MONTHS = [6, 7, 8, 9]
+
+
+def generate_frame(num_samples: int, rng: np.random.Generator) -> pd.DataFrame:
+  """
+  Generate samples as whole columns (same distributions as the row loop)
+  
+  Every factor is array arithmetic over the batch; city and variety are
+  categoricals built from their codes.
+  """
+  # Random date between start and end (inclusive, like random.randint)
+  date_range = (END_DATE - START_DATE).days
+  dates = np.datetime64(START_DATE.date()) + rng.integers(0, date_range + 1, num_samples).astype("timedelta64[D]")
+  year = dates.astype("datetime64[Y]").astype(np.int64) + 1970
+  month = dates.astype("datetime64[M]").astype(np.int64) % 12 + 1
+  
+  # Random market and variety
+  market_codes = rng.integers(0, len(MARKETS), num_samples)
+  variety_codes = rng.integers(0, len(VARIETIES), num_samples)
+  base_price = np.array([BASE_PRICES[variety] for variety in VARIETIES], dtype=np.float64)[variety_codes]
+  market_factor = np.array([MARKET_FACTORS.get(market, 0) for market in MARKETS])[market_codes]
+  
+  # Seasonal factor (higher prices in winter, lower in monsoon)
+  season = np.sin((month / 12) * np.pi * 2)
+  seasonal_factor = season * 0.08
+  
+  # Year trend (gradual increase over years)
+  year_factor = (year - 2010) / 15 * 0.1
+  
+  # Arrivals (quintals) - affects price inversely
+  arrivals = np.clip(rng.normal(2000, 400, num_samples), 500, 4000)
+  arrivals_factor = (2500 - arrivals) / 2500 * 0.08
+  
+  # Rainfall (mm) - more rain in monsoon months, affects price inversely
+  monsoon = np.isin(month, MONSOON_MONTHS)
+  rainfall = rng.normal(np.where(monsoon, 150, 30), np.where(monsoon, 50, 20))
+  rainfall = np.clip(rainfall, 0, 300)
+  rainfall_factor = (100 - rainfall) / 100 * 0.05
+  
+  # Temperature (°C) - seasonal variation
+  temperature = np.clip(25 + season * 5 + rng.normal(0, 2, num_samples), 15, 40)
+  
+  # Random noise
+  noise = rng.normal(0, 0.03, num_samples)
+  
+  # Calculate final price - realistic price range 20k-30k
+  total_factor = (
+    1 + seasonal_factor + year_factor + arrivals_factor +
+    rainfall_factor + market_factor + noise
+  )
+  price = np.clip(base_price * total_factor, 20000, 30000)
+  
+  return pd.DataFrame({
+    "date": np.datetime_as_string(dates, unit="D"),
+    "city": pd.Categorical.from_codes(market_codes, MARKETS),
+    "variety": pd.Categorical.from_codes(variety_codes, VARIETIES),
+    "price": np.round(price, 2),
+    "arrivals": np.round(arrivals, 0),
+    "rainfall": np.round(rainfall, 1),
+    "temperature": np.round(temperature, 1),
+    "month": month,
+    "year": year
+  })
+
+
+def generate_dataset(
+  num_samples: int = NUM_SAMPLES,
+  seed: Optional[int] = None,
+  method: str = "vectorized"
+) -> pd.DataFrame:
+  """Generate synthetic agricultural dataset (reproducible when seeded)"""
   
   print(f"🌾 Generating {num_samples:,} agricultural data samples...")
+  start = time.perf_counter()
+  
+  if method == "vectorized":
+    df = generate_frame(num_samples, np.random.default_rng(seed))
+  elif method == "loop":
+    df = _generate_rows(num_samples, seed)
+  else:
+    raise ValueError(f"Unknown generation method: {method}")
+  
+  print(f"\n✅ Dataset generated successfully in {time.perf_counter() - start:.2f}s!")
+  print(f"   Total samples: {len(df):,}")
+  print(f"   Date range: {df['date'].min()} to {df['date'].max()}")
+  print(f"   Cities: {df['city'].nunique()}")
+  print(f"   Varieties: {df['variety'].nunique()}")
+  print(f"   Price range: ₹{df['price'].min():.2f} - ₹{df['price'].max():.2f}")
+  
+  return df
+
+
+def _generate_rows(num_samples: int, seed: Optional[int] = None) -> pd.DataFrame:
+  """Original row-by-row generator, kept as the reference implementation"""
+  if seed is not None:
+    random.seed(seed)
+    np.random.seed(seed)
   
   data = []
   date_range = (END_DATE - START_DATE).days
@@ -78,7 +226,7 @@ def generate_dataset(num_samples: int = NUM_SAMPLES) -> pd.DataFrame:
     
     # Rainfall (mm) - affects price inversely
     # More rain in monsoon months (June-September)
-    if month in [6, 7, 8, 9]:
+    if month in MONSOON_MONTHS:
       rainfall = np.random.normal(150, 50)
     else:
       rainfall = np.random.normal(30, 20)
@@ -91,34 +239,8 @@ def generate_dataset(num_samples: int = NUM_SAMPLES) -> pd.DataFrame:
     temperature = base_temp + temp_seasonal + np.random.normal(0, 2)
     temperature = max(15, min(temperature, 40))  # Clamp between 15-40
     
-    # Market factor (some markets have premium prices) - match frontend
-    market_factors = {
-      'Bangalore': 0.02,
-      'Mumbai': 0.04,
-      'Delhi': 0.03,
-      'Chennai': 0.0,
-      'Kolkata': -0.01,
-      'Hyderabad': 0.01,
-      'Pune': 0.02,
-      'Ahmedabad': 0.02,
-      'Jaipur': 0.01,
-      'Lucknow': -0.01,
-      'Kanpur': -0.02,
-      'Nagpur': 0.0,
-      'Indore': 0.01,
-      'Bhopal': -0.01,
-      'Visakhapatnam': 0.02,
-      'Patna': -0.02,
-      'Vadodara': 0.01,
-      'Ludhiana': 0.03,
-      'Agra': -0.01,
-      'Nashik': 0.0,
-      'Faridabad': 0.02,
-      'Meerut': -0.01,
-      'Rajkot': 0.01,
-      'Varanasi': -0.02
-    }
-    market_factor = market_factors.get(market, 0)
+    # Market factor (some markets have premium prices)
+    market_factor = MARKET_FACTORS.get(market, 0)
     
     # Random noise
     noise = np.random.normal(0, 0.03)
@@ -155,20 +277,148 @@ def generate_dataset(num_samples: int = NUM_SAMPLES) -> pd.DataFrame:
       print(f"  ✓ Generated {i + 1:,} samples...")
   
   # Create DataFrame
-  df = pd.DataFrame(data)
+  return pd.DataFrame(data)
+
+
+def report_progress(**fields):
+  """Print a machine-readable progress line (parsed by the admin API)"""
+  print(f"PROGRESS {json.dumps(fields)}", flush=True)
+
+
+def generate_shard(
+  shard: int,
+  rows: int,
+  entropy: int,
+  spawn_key: List[int],
+  path: str,
+  chunk_size: int
+) -> Dict[str, Any]:
+  """Stream one shard to its CSV in chunks (runs in a worker process)"""
+  start = time.perf_counter()
+  rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=tuple(spawn_key)))
+  tmp_path = f"{path}.tmp"
+  written = 0
+  with open(tmp_path, "w", newline="") as f:
+    while written < rows:
+      size = min(chunk_size, rows - written)
+      generate_frame(size, rng).to_csv(f, index=False, header=written == 0)
+      written += size
+      report_progress(shard=shard, rows=written, total=rows)
+  os.replace(tmp_path, path)
+  return {
+    "shard": shard,
+    "rows": rows,
+    "bytes": os.path.getsize(path),
+    "seconds": round(time.perf_counter() - start, 2)
+  }
+
+
+def generate_sharded(
+  num_samples: int,
+  shards: int,
+  shard_dir: Path,
+  workers: int = 0,
+  seed: Optional[int] = None,
+  chunk_size: int = 500_000
+) -> Dict[str, Any]:
+  """
+  Generate the dataset as independent CSV shards and write their manifest
   
-  print(f"\n✅ Dataset generated successfully!")
-  print(f"   Total samples: {len(df):,}")
-  print(f"   Date range: {df['date'].min()} to {df['date'].max()}")
-  print(f"   Cities: {df['city'].nunique()}")
-  print(f"   Varieties: {df['variety'].nunique()}")
-  print(f"   Price range: ₹{df['price'].min():.2f} - ₹{df['price'].max():.2f}")
+  Shard seeds are spawned from one SeedSequence, so a shard's rows depend
+  only on the seed, its index, its row count and the chunk size - not on
+  the number of workers or the order in which shards finish.
+  """
+  shards = max(1, min(shards, num_samples))
+  print(f"🌾 Generating {num_samples:,} samples in {shards} shards...")
+  # The effective shard count, which can be lower than requested
+  report_progress(stage="plan", shards=shards)
+  start = time.perf_counter()
+  shard_dir.mkdir(parents=True, exist_ok=True)
   
-  return df
+  root = np.random.SeedSequence(seed)
+  rows = [num_samples // shards + (1 if index < num_samples % shards else 0) for index in range(shards)]
+  entries = [
+    {
+      "file": f"part-{index:05d}.csv",
+      "rows": rows[index],
+      "seed": {"entropy": root.entropy, "spawn_key": list(child.spawn_key)}
+    }
+    for index, child in enumerate(root.spawn(shards))
+  ]
+  tasks = [
+    (index, entry["rows"], root.entropy, entry["seed"]["spawn_key"], str(shard_dir / entry["file"]), chunk_size)
+    for index, entry in enumerate(entries)
+  ]
+  
+  workers = workers or min(shards, os.cpu_count() or 1)
+  # Forked workers inherit the stdout buffer, so empty it before they start
+  sys.stdout.flush()
+  if workers <= 1:
+    results = [generate_shard(*task) for task in tasks]
+  else:
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+      futures = [pool.submit(generate_shard, *task) for task in tasks]
+      results = []
+      for future in as_completed(futures):
+        result = future.result()
+        results.append(result)
+        print(f"  ✓ Shard {result['shard']}: {result['rows']:,} rows in {result['seconds']}s", flush=True)
+  
+  for result in results:
+    entries[result["shard"]]["bytes"] = result["bytes"]
+  manifest = {
+    "format": "csv",
+    "total_rows": num_samples,
+    "chunk_size": chunk_size,
+    "seed": {"entropy": root.entropy, "requested": seed},
+    "created_at": datetime.now().isoformat(),
+    "shards": entries
+  }
+  (shard_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+  
+  elapsed = time.perf_counter() - start
+  print(f"\n✅ {num_samples:,} samples generated in {elapsed:.2f}s ({num_samples / max(elapsed, 1e-9):,.0f} rows/s)")
+  print(f"   Manifest: {shard_dir / 'manifest.json'}")
+  return manifest
 
 
-def save_dataset(df: pd.DataFrame, filename: str = "agricultural_data.csv"):
-  """Save dataset to CSV file"""
+def join_shards(shard_dir: Path, manifest: Dict[str, Any], filename: str = DATASET_FILE) -> Path:
+  """
+  Concatenate shard files into the dataset file
+  
+  A CSV target is joined by streaming bytes (header kept once); a
+  columnar target is converted shard by shard in chunks.
+  """
+  data_dir = Path(__file__).parent.parent / "data"
+  filepath = data_dir / filename
+  if is_columnar(filepath):
+    writer = ColumnarWriter(filepath)
+    for entry in manifest["shards"]:
+      for chunk in pd.read_csv(shard_dir / entry["file"], chunksize=manifest["chunk_size"]):
+        writer.append(chunk)
+    writer.close()
+    print(f"\n💾 Dataset saved to: {filepath}")
+    print(f"   File size: {filepath.stat().st_size / 1024 / 1024:.2f} MB")
+    return filepath
+  
+  tmp_path = filepath.with_name(filepath.name + ".tmp")
+  with open(tmp_path, "wb") as out:
+    for index, entry in enumerate(manifest["shards"]):
+      with open(shard_dir / entry["file"], "rb") as f:
+        header = f.readline()
+        if index == 0:
+          out.write(header)
+        shutil.copyfileobj(f, out, 16 * 1024 * 1024)
+  # Swap in atomically, so readers never see a partial dataset
+  os.replace(tmp_path, filepath)
+  
+  print(f"\n💾 Dataset saved to: {filepath}")
+  print(f"   File size: {filepath.stat().st_size / 1024 / 1024:.2f} MB")
+  return filepath
+
+
+def save_dataset(df: pd.DataFrame, filename: str = DATASET_FILE):
+  """Save dataset to CSV, or to the columnar format for a .npz file name"""
   
   # Get data directory
   data_dir = Path(__file__).parent.parent / "data"
@@ -176,8 +426,10 @@ def save_dataset(df: pd.DataFrame, filename: str = "agricultural_data.csv"):
   
   filepath = data_dir / filename
   
-  # Save to CSV
-  df.to_csv(filepath, index=False)
+  if is_columnar(filepath):
+    write_columnar(df, filepath)
+  else:
+    df.to_csv(filepath, index=False)
   
   print(f"\n💾 Dataset saved to: {filepath}")
   print(f"   File size: {filepath.stat().st_size / 1024 / 1024:.2f} MB")
@@ -187,17 +439,46 @@ def save_dataset(df: pd.DataFrame, filename: str = "agricultural_data.csv"):
 
 def main():
   """Main function to generate and save dataset"""
+  parser = argparse.ArgumentParser(description="Generate the synthetic agricultural dataset")
+  parser.add_argument("--samples", type=int, default=NUM_SAMPLES, help="Number of rows to generate")
+  parser.add_argument("--seed", type=int, default=None, help="Random seed for a reproducible dataset")
+  parser.add_argument("--method", choices=["vectorized", "loop"], default="vectorized",
+                      help="Whole-column generation (default) or the original row loop")
+  parser.add_argument("--output", default=DATASET_FILE,
+                      help="File name inside backend/data (.csv, or .npz for the columnar format)")
+  parser.add_argument("--shards", type=int, default=0,
+                      help="Generate out of core in this many shard files (0 = in memory)")
+  parser.add_argument("--workers", type=int, default=0, help="Worker processes for shards (0 = one per CPU)")
+  parser.add_argument("--chunk-size", type=int, default=500_000, help="Rows held in memory per shard write")
+  parser.add_argument("--shard-dir", default=None, help="Shard directory (default: backend/data/shards)")
+  parser.add_argument("--no-join", action="store_true", help="Keep the shards only, without writing the dataset file")
+  args = parser.parse_args()
   
   print("=" * 60)
   print("AgriAI Dataset Generator")
   print("=" * 60)
   print()
   
+  if args.shards > 0:
+    if args.method != "vectorized":
+      sys.exit("❌ Sharded generation only supports the vectorized method")
+    shard_dir = Path(args.shard_dir) if args.shard_dir else Path(__file__).parent.parent / "data" / "shards"
+    manifest = generate_sharded(
+      args.samples, args.shards, shard_dir, args.workers, args.seed, args.chunk_size
+    )
+    if not args.no_join:
+      report_progress(stage="join")
+      join_shards(shard_dir, manifest, args.output)
+    print("\n" + "=" * 60)
+    print("✨ Dataset generation complete!")
+    print("=" * 60)
+    return
+  
   # Generate dataset
-  df = generate_dataset(NUM_SAMPLES)
+  df = generate_dataset(args.samples, seed=args.seed, method=args.method)
   
   # Save dataset
-  filepath = save_dataset(df)
+  filepath = save_dataset(df, args.output)
   
   # Display sample data
   print("\n📊 Sample Data (first 5 rows):")
@@ -0,0 +1,325 @@
+"""
+API Load Test
+Drives /api/predict, /api/insights and /api/models at increasing
+concurrency and reports throughput, tail latency and error rates
+
+Usage:
+  python scripts/load_test.py                                  # in-process app
+  python scripts/load_test.py --spawn-server                   # local uvicorn
+  python scripts/load_test.py --url http://localhost:8000 --concurrency 1,8,32,128
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+import warnings
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Add backend to path
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.config import DATA_PATH, DATASET_FILE, AVAILABLE_MODELS
+from app.dataset_format import read_dataset
+
+DEFAULT_MIX = "predict=0.8,insights=0.15,models=0.05"
+
+
+def log(message: str = ""):
+  """Progress output (stderr, so stdout can carry the JSON report)"""
+  print(message, file=sys.stderr)
+
+
+def load_distribution(data_path: Path) -> pd.DataFrame:
+  """(city, variety, month) rows with their covariates, sampled as request inputs"""
+  columns = ["city", "variety", "month", "arrivals", "rainfall", "temperature"]
+  if data_path.exists():
+    return read_dataset(data_path, columns)
+
+  log(f"⚠ Dataset not found at {data_path}, using a uniform request mix")
+  rng = np.random.default_rng(0)
+  n_rows = 1000
+  return pd.DataFrame({
+    "city": rng.choice(["Bangalore", "Delhi", "Mumbai", "Chennai", "Kolkata"], n_rows),
+    "variety": rng.choice(["Guntur", "Teja", "Byadgi", "Kashmiri"], n_rows),
+    "month": rng.integers(1, 13, n_rows),
+    "arrivals": rng.uniform(500, 4000, n_rows),
+    "rainfall": rng.uniform(0, 300, n_rows),
+    "temperature": rng.uniform(15, 40, n_rows)
+  })
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+  """Parse "predict=0.8,insights=0.15,models=0.05" into normalized weights"""
+  weights = {}
+  for item in mix.split(","):
+    name, _, weight = item.partition("=")
+    if name.strip() not in ("predict", "insights", "models"):
+      raise ValueError(f"Unknown endpoint in mix: {name}")
+    weights[name.strip()] = float(weight)
+  total = sum(weights.values())
+  return {name: weight / total for name, weight in weights.items()}
+
+
+def build_requests(
+  distribution: pd.DataFrame,
+  mix: Dict[str, float],
+  n_requests: int,
+  seed: int,
+  model: str,
+  covariates: str
+) -> List[Tuple[str, str, str, Optional[Dict[str, Any]]]]:
+  """Seeded (endpoint, method, path, json) requests drawn from the dataset rows"""
+  rng = np.random.default_rng(seed)
+  endpoints = list(mix)
+  kinds = rng.choice(endpoints, size=n_requests, p=[mix[name] for name in endpoints])
+  rows = distribution.iloc[rng.integers(0, len(distribution), n_requests)].to_dict("records")
+  models = list(AVAILABLE_MODELS) if model == "mixed" else [model]
+
+  requests = []
+  for kind, row in zip(kinds, rows):
+    if kind == "predict":
+      payload = {
+        "year": 2025,
+        "month": int(row["month"]),
+        "city": row["city"],
+        "variety": row["variety"],
+        "model": models[int(rng.integers(len(models)))]
+      }
+      if covariates == "dataset":
+        payload.update({
+          "arrivals": round(float(row["arrivals"]), 1),
+          "rainfall": round(float(row["rainfall"]), 1),
+          "temperature": round(float(row["temperature"]), 1)
+        })
+      requests.append(("predict", "POST", "/api/predict", payload))
+    elif kind == "insights":
+      path = f"/api/insights?city={row['city']}&variety={row['variety']}&month={int(row['month'])}"
+      requests.append(("insights", "GET", path, None))
+    else:
+      requests.append(("models", "GET", "/api/models", None))
+  return requests
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, Optional[float]]:
+  """p50/p95/p99/max latency in milliseconds"""
+  if not latencies:
+    return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+  ms = np.asarray(latencies) * 1000
+  p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+  return {
+    "p50_ms": round(float(p50), 3),
+    "p95_ms": round(float(p95), 3),
+    "p99_ms": round(float(p99), 3),
+    "max_ms": round(float(ms.max()), 3)
+  }
+
+
+async def run_level(client, requests: List[tuple], concurrency: int, duration: float) -> Dict[str, Any]:
+  """Closed-loop load: `concurrency` workers issue requests back to back"""
+  records: List[Tuple[str, float, int]] = []
+  cursor = 0
+  deadline = time.perf_counter() + duration
+
+  async def worker():
+    nonlocal cursor
+    while time.perf_counter() < deadline:
+      endpoint, method, path, payload = requests[cursor % len(requests)]
+      cursor += 1
+      start = time.perf_counter()
+      try:
+        response = await client.request(method, path, json=payload)
+        status = response.status_code
+      except Exception:
+        status = 0  # Connection error or client timeout
+      records.append((endpoint, time.perf_counter() - start, status))
+
+  start = time.perf_counter()
+  await asyncio.gather(*(worker() for _ in range(concurrency)))
+  elapsed = time.perf_counter() - start
+
+  result: Dict[str, Any] = {
+    "concurrency": concurrency,
+    "duration_seconds": round(elapsed, 3),
+    "requests": len(records),
+    "throughput_rps": round(len(records) / elapsed, 1) if elapsed else 0.0
+  }
+  errors = [status for _, _, status in records if status == 0 or status >= 400]
+  result["error_rate"] = round(len(errors) / len(records), 4) if records else 0.0
+  result["status_codes"] = {
+    str(status): sum(1 for _, _, s in records if s == status)
+    for status in sorted({status for _, _, status in records})
+  }
+  # Latency of successful requests only, so fast 503s do not hide the tail
+  result.update(latency_summary([latency for _, latency, status in records if 0 < status < 400]))
+  result["endpoints"] = {}
+  for endpoint in sorted({endpoint for endpoint, _, _ in records}):
+    subset = [(latency, status) for name, latency, status in records if name == endpoint]
+    failed = sum(1 for _, status in subset if status == 0 or status >= 400)
+    result["endpoints"][endpoint] = {
+      "requests": len(subset),
+      "throughput_rps": round(len(subset) / elapsed, 1) if elapsed else 0.0,
+      "error_rate": round(failed / len(subset), 4),
+      **latency_summary([latency for latency, status in subset if 0 < status < 400])
+    }
+  return result
+
+
+def free_port() -> int:
+  with socket.socket() as sock:
+    sock.bind(("127.0.0.1", 0))
+    return sock.getsockname()[1]
+
+
+def spawn_server(port: int) -> subprocess.Popen:
+  """Start a local uvicorn server for the app and wait until it is healthy"""
+  import httpx
+
+  process = subprocess.Popen(
+    [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+    cwd=str(BACKEND_DIR),
+    stdout=subprocess.DEVNULL,
+    stderr=subprocess.DEVNULL
+  )
+  for _ in range(120):
+    try:
+      if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+        return process
+    except httpx.HTTPError:
+      pass
+    if process.poll() is not None:
+      break
+    time.sleep(0.5)
+  process.terminate()
+  raise RuntimeError("Server failed to start")
+
+
+async def run_sweep(args, base_url: Optional[str]) -> List[Dict[str, Any]]:
+  """Run every concurrency level against the app or a server"""
+  import httpx
+
+  distribution = load_distribution(Path(args.data) if args.data else DATA_PATH / DATASET_FILE)
+  mix = parse_mix(args.mix)
+  limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+
+  results = []
+  async with contextlib.AsyncExitStack() as stack:
+    if base_url:
+      client = httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits)
+    else:
+      from app.main import app
+      # Start the app's lifespan (models, dataset views) before measuring
+      await stack.enter_async_context(app.router.lifespan_context(app))
+      client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://load-test", timeout=args.timeout
+      )
+    await stack.enter_async_context(client)
+
+    # Warm up model loading, caches and connections
+    warmup = build_requests(distribution, mix, 50, args.seed - 1, args.model, args.covariates)
+    await run_level(client, warmup, min(4, max(args.concurrency)), args.warmup)
+
+    for level, concurrency in enumerate(args.concurrency):
+      requests = build_requests(
+        distribution, mix, args.requests_per_level, args.seed + level, args.model, args.covariates
+      )
+      result = await run_level(client, requests, concurrency, args.duration)
+      results.append(result)
+      log(
+        f"  c={concurrency:<5} {result['throughput_rps']:>9.1f} req/s  "
+        f"p50 {result['p50_ms'] or 0:>8.2f} ms  p95 {result['p95_ms'] or 0:>8.2f} ms  "
+        f"p99 {result['p99_ms'] or 0:>8.2f} ms  errors {result['error_rate']:.2%}"
+      )
+  return results
+
+
+def main():
+  """Run the concurrency sweep and print or save the report"""
+  parser = argparse.ArgumentParser(description="Load test the AgriAI API")
+  parser.add_argument("--url", help="Base URL of a running server (default: in-process app)")
+  parser.add_argument("--spawn-server", action="store_true", help="Start a local uvicorn server for the run")
+  parser.add_argument("--concurrency", default="1,4,16,64", help="Comma-separated concurrency levels")
+  parser.add_argument("--duration", type=float, default=10.0, help="Seconds per concurrency level")
+  parser.add_argument("--warmup", type=float, default=2.0, help="Warmup seconds before the sweep")
+  parser.add_argument("--mix", default=DEFAULT_MIX, help="Endpoint weights")
+  parser.add_argument("--model", default="random_forest", help="Model for /api/predict, or 'mixed'")
+  parser.add_argument(
+    "--covariates", choices=["dataset", "default"], default="dataset",
+    help="Send arrivals/rainfall/temperature from the sampled rows, or leave them at the defaults"
+  )
+  parser.add_argument("--requests-per-level", type=int, default=5000, help="Size of each seeded request mix")
+  parser.add_argument("--data", help="Dataset CSV to sample requests from")
+  parser.add_argument("--timeout", type=float, default=30.0)
+  parser.add_argument("--seed", type=int, default=42)
+  parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+  args = parser.parse_args()
+  args.concurrency = [int(level) for level in args.concurrency.split(",") if level]
+
+  if args.model != "mixed" and args.model not in AVAILABLE_MODELS:
+    parser.error(f"Unknown model: {args.model}")
+
+  # Keep the in-process app's per-request logging out of the measurement
+  logging.disable(logging.INFO)
+  warnings.filterwarnings("ignore")
+
+  log("=" * 60)
+  log("AgriAI Load Test")
+  log("=" * 60)
+
+  server = None
+  base_url = args.url
+  if args.spawn_server and not base_url:
+    port = free_port()
+    server = spawn_server(port)
+    base_url = f"http://127.0.0.1:{port}"
+
+  target = base_url or "in-process"
+  log(f"Target: {target}  mix: {args.mix}  levels: {args.concurrency}  {args.duration:.0f}s each\n")
+
+  try:
+    results = asyncio.run(run_sweep(args, base_url))
+  finally:
+    if server is not None:
+      server.terminate()
+      server.wait()
+
+  best = max(results, key=lambda result: result["throughput_rps"])
+  report = {
+    "timestamp": datetime.now().isoformat(),
+    "target": target,
+    "cpu_count": os.cpu_count(),
+    "settings": {
+      "concurrency": args.concurrency,
+      "duration_seconds": args.duration,
+      "mix": parse_mix(args.mix),
+      "model": args.model,
+      "covariates": args.covariates,
+      "seed": args.seed
+    },
+    "peak_throughput_rps": best["throughput_rps"],
+    "peak_concurrency": best["concurrency"],
+    "levels": results
+  }
+
+  log(f"\n🏁 Peak: {best['throughput_rps']:.1f} req/s at concurrency {best['concurrency']}")
+
+  if args.output:
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    log(f"💾 Results saved to: {args.output}")
+  else:
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+  main()
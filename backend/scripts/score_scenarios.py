@@ -0,0 +1,288 @@
+"""
+Bulk Scenario Scoring
+Scores large CSV, Parquet or columnar .npz scenario files offline with the
+same feature encoding and price clamping as the API, using a pool of worker
+processes
+
+Usage:
+  python scripts/score_scenarios.py scenarios.csv predictions.csv --model xgboost
+  python scripts/score_scenarios.py scenarios.parquet predictions.csv --workers 8
+  python scripts/score_scenarios.py scenarios.csv predictions.csv --resume
+
+Chunks are scored into numbered part files next to the output and joined
+in input order at the end. With --resume, chunks whose part file already
+exists are skipped, so an interrupted run picks up where it stopped.
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import shutil
+import sys
+import time
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import (
+  AVAILABLE_MODELS,
+  DEFAULT_ARRIVALS,
+  DEFAULT_RAINFALL,
+  DEFAULT_TEMPERATURE,
+  MODEL_PATH
+)
+from app.dataset_format import is_columnar, iter_dataset
+
+REQUIRED_COLUMNS = ["city", "variety", "month"]
+COVARIATE_DEFAULTS = {
+  "arrivals": DEFAULT_ARRIVALS,
+  "rainfall": DEFAULT_RAINFALL,
+  "temperature": DEFAULT_TEMPERATURE
+}
+
+
+def peak_memory_mb(who: int = resource.RUSAGE_SELF) -> float:
+  """Peak resident memory in MB (ru_maxrss is KB on Linux, bytes on macOS)"""
+  peak = resource.getrusage(who).ru_maxrss
+  return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def read_chunks(input_path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+  """Read the input file chunk by chunk"""
+  if input_path.suffix.lower() in (".parquet", ".pq"):
+    try:
+      import pyarrow.parquet as pq
+    except ImportError:
+      raise SystemExit("❌ Parquet input requires pyarrow: pip install pyarrow")
+    for batch in pq.ParquetFile(input_path).iter_batches(batch_size=chunk_size):
+      yield batch.to_pandas()
+  elif is_columnar(input_path):
+    yield from iter_dataset(input_path, chunk_size=chunk_size)
+  else:
+    yield from pd.read_csv(input_path, chunksize=chunk_size)
+
+
+class ScoringError(RuntimeError):
+  """Raised when a chunk cannot be scored with the real model"""
+
+
+# Worker process state: models are loaded once per worker by _init_worker
+_model_manager = None
+
+
+def _init_worker(threads: int):
+  """Load the models once and keep each worker to its share of the cores"""
+  global _model_manager
+  from app.ml_models import model_manager
+
+  # Per-chunk log lines and sklearn feature-name warnings would flood the output
+  logging.disable(logging.INFO)
+  warnings.filterwarnings("ignore")
+
+  model_manager.ensure_loaded()
+  for model in model_manager.models.values():
+    for estimator in (model, getattr(model, "native", None)):
+      if estimator is not None and hasattr(estimator, "n_jobs"):
+        estimator.set_params(n_jobs=threads)
+      if estimator is not None and hasattr(estimator, "verbose"):
+        estimator.set_params(verbose=0)
+  _model_manager = model_manager
+
+
+def check_model(model_key: str):
+  """Fail before any input is read if the model cannot be loaded"""
+  if _model_manager.get_model(model_key) is None:
+    raise ScoringError(f"Model {model_key} could not be loaded from {MODEL_PATH}")
+
+
+def score_frame(df: pd.DataFrame, model_key: str) -> pd.DataFrame:
+  """Add predicted_price (and error for rejected rows) to a chunk"""
+  missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+  if missing:
+    raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+  months = pd.to_numeric(df["month"], errors="coerce")
+  covariates = {
+    column: pd.to_numeric(df[column], errors="coerce").fillna(default)
+    if column in df.columns else pd.Series(default, index=df.index, dtype=np.float64)
+    for column, default in COVARIATE_DEFAULTS.items()
+  }
+  valid = (
+    months.between(1, 12)
+    & df["city"].notna()
+    & df["variety"].notna()
+    & np.isfinite(covariates["arrivals"])
+    & np.isfinite(covariates["rainfall"])
+    & np.isfinite(covariates["temperature"])
+  ).to_numpy()
+
+  out = df.copy()
+  out["predicted_price"] = np.nan
+  out["error"] = np.where(valid, "", "Invalid or missing values")
+
+  if valid.any():
+    result = _model_manager.predict_columns(
+      model_key,
+      months[valid].astype(int).tolist(),
+      df["city"][valid].astype(str).tolist(),
+      df["variety"][valid].astype(str).tolist(),
+      covariates["arrivals"][valid].to_numpy(),
+      covariates["rainfall"][valid].to_numpy(),
+      covariates["temperature"][valid].to_numpy()
+    )
+    # The API falls back to mock prices when a model fails; never write those
+    if result["source"] == "mock":
+      raise ScoringError(f"Model {model_key} failed to score the chunk (mock fallback)")
+    out.loc[valid, "predicted_price"] = np.round(result["prices"], 2)
+  return out
+
+
+def score_chunk(index: int, df: pd.DataFrame, model_key: str, parts_dir: Path) -> Tuple[int, int, float, float]:
+  """Score one chunk into its part file (runs in a worker process)"""
+  start = time.perf_counter()
+  out = score_frame(df, model_key)
+
+  part_path = parts_dir / f"part-{index:06d}.csv"
+  tmp_path = part_path.with_suffix(".tmp")
+  out.to_csv(tmp_path, index=False)
+  # A part file only exists once it is complete, which makes resume safe
+  os.replace(tmp_path, part_path)
+
+  return index, len(out), time.perf_counter() - start, peak_memory_mb()
+
+
+def check_manifest(parts_dir: Path, manifest: Dict[str, Any], resume: bool):
+  """Start a fresh parts directory or verify it matches this run"""
+  manifest_path = parts_dir / "manifest.json"
+  if resume and manifest_path.exists():
+    previous = json.loads(manifest_path.read_text())
+    if previous != manifest:
+      raise SystemExit(
+        "❌ Existing parts were written for a different input, model or chunk size.\n"
+        f"   Remove {parts_dir} or run without --resume."
+      )
+    return
+  if parts_dir.exists():
+    shutil.rmtree(parts_dir)
+  parts_dir.mkdir(parents=True)
+  manifest_path.write_text(json.dumps(manifest, indent=2))
+
+
+def join_parts(parts_dir: Path, n_chunks: int, output_path: Path):
+  """Concatenate part files in chunk order into the output file"""
+  tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+  with open(tmp_path, "wb") as out:
+    for index in range(n_chunks):
+      with open(parts_dir / f"part-{index:06d}.csv", "rb") as part:
+        if index > 0:
+          part.readline()  # Header is written once
+        shutil.copyfileobj(part, out)
+  os.replace(tmp_path, output_path)
+
+
+def main():
+  """Score the input file chunk by chunk across worker processes"""
+  parser = argparse.ArgumentParser(description="Score scenario files with the trained models")
+  parser.add_argument("input", help="CSV or Parquet file with city, variety, month [, arrivals, rainfall, temperature]")
+  parser.add_argument("output", help="Output CSV file")
+  parser.add_argument("--model", default="random_forest", choices=list(AVAILABLE_MODELS))
+  parser.add_argument("--chunk-size", type=int, default=100_000)
+  parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (0 = score in this process)")
+  parser.add_argument("--resume", action="store_true", help="Skip chunks already scored by a previous run")
+  parser.add_argument("--keep-parts", action="store_true", help="Keep part files after joining")
+  args = parser.parse_args()
+
+  input_path = Path(args.input)
+  output_path = Path(args.output)
+  parts_dir = output_path.with_name(output_path.name + ".parts")
+  if not input_path.exists():
+    raise SystemExit(f"❌ Input not found: {input_path}")
+
+  print("=" * 60)
+  print("AgriAI Bulk Scenario Scoring")
+  print("=" * 60)
+  print(f"📂 Input: {input_path}")
+  print(f"🧠 Model: {args.model}  chunk size: {args.chunk_size:,}  workers: {args.workers}")
+
+  stat = input_path.stat()
+  check_manifest(parts_dir, {
+    "input": str(input_path.resolve()),
+    "input_size": stat.st_size,
+    "input_mtime": stat.st_mtime,
+    "model": args.model,
+    "chunk_size": args.chunk_size
+  }, args.resume)
+
+  start = time.perf_counter()
+  total_rows = 0
+  skipped = 0
+  worker_peak_mb = 0.0
+  n_chunks = 0
+
+  def record(result: Tuple[int, int, float, float]):
+    nonlocal total_rows, worker_peak_mb
+    index, rows, seconds, peak_mb = result
+    total_rows += rows
+    worker_peak_mb = max(worker_peak_mb, peak_mb)
+    elapsed = time.perf_counter() - start
+    print(f"  ✓ chunk {index}: {rows:,} rows in {seconds:.2f}s ({total_rows / elapsed:,.0f} rows/s overall)")
+
+  try:
+    if args.workers == 0:
+      _init_worker(threads=-1)
+      check_model(args.model)
+      for index, df in enumerate(read_chunks(input_path, args.chunk_size)):
+        n_chunks += 1
+        if (parts_dir / f"part-{index:06d}.csv").exists():
+          skipped += 1
+          continue
+        record(score_chunk(index, df, args.model, parts_dir))
+    else:
+      threads = max(1, (os.cpu_count() or 1) // args.workers)
+      with ProcessPoolExecutor(
+        max_workers=args.workers, initializer=_init_worker, initargs=(threads,)
+      ) as pool:
+        pool.submit(check_model, args.model).result()
+        pending = set()
+        for index, df in enumerate(read_chunks(input_path, args.chunk_size)):
+          n_chunks += 1
+          if (parts_dir / f"part-{index:06d}.csv").exists():
+            skipped += 1
+            continue
+          # Bound the chunks held in memory to two per worker
+          while len(pending) >= 2 * args.workers:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+              record(future.result())
+          pending.add(pool.submit(score_chunk, index, df, args.model, parts_dir))
+        for future in wait(pending).done:
+          record(future.result())
+  except ScoringError as e:
+    raise SystemExit(f"❌ {e}")
+
+  if n_chunks == 0:
+    raise SystemExit("❌ Input has no rows")
+
+  join_parts(parts_dir, n_chunks, output_path)
+  if not args.keep_parts:
+    shutil.rmtree(parts_dir)
+
+  elapsed = time.perf_counter() - start
+  worker_peak_mb = max(worker_peak_mb, peak_memory_mb(resource.RUSAGE_CHILDREN))
+  print(f"\n💾 Predictions saved to: {output_path}")
+  print(f"   Rows scored: {total_rows:,} in {elapsed:.1f}s ({total_rows / elapsed:,.0f} rows/s)")
+  if skipped:
+    print(f"   Chunks resumed from a previous run: {skipped} of {n_chunks}")
+  print(f"   Peak memory: {peak_memory_mb():.0f} MB (main), {worker_peak_mb:.0f} MB (largest worker)")
+
+
+if __name__ == "__main__":
+  main()
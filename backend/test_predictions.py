@@ -2,13 +2,19 @@
 Test Price Predictions
 Verify that predictions are in the correct price range (₹28,000-₹30,000)
 """
+import shutil
 import sys
+import tempfile
 from pathlib import Path
 
 # Add backend to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from app.ml_models import model_manager
+import numpy as np
+
+import app.ml_models as ml_models
+from app.config import INTERVALS_FILE, PRICE_TABLE_FILE
+from app.ml_models import ModelManager, ModelSet, model_manager
 
 def test_predictions():
   """Test predictions for different scenarios"""
@@ -146,5 +152,76 @@ def test_predictions():
   print("Test complete!")
   print("=" * 70)
 
+
+class FlakyModel:
+  """Model whose first prediction fails"""
+  
+  def __init__(self):
+    self.calls = 0
+  
+  def predict(self, features):
+    self.calls += 1
+    if self.calls == 1:
+      raise RuntimeError("transient failure")
+    return np.full(len(features), 29000.0)
+
+
+def test_failed_prediction_not_cached():
+  """A mock fallback is recomputed on the next call instead of served from cache"""
+  manager = ModelManager()
+  if manager.cache is None:
+    print("⚠️  Prediction cache disabled, skipping")
+    return
+  
+  model = FlakyModel()
+  model_set = ModelSet("flaky")
+  model_set.models["random_forest"] = model
+  model_set.model_stats["random_forest"] = {}
+  manager._current = model_set
+  
+  # Off-default covariates so the price table is not consulted
+  scenario = dict(year=2025, month=3, city="Bangalore", variety="Guntur", arrivals=1234.5)
+  manager.predict("random_forest", **scenario)
+  result = manager.predict("random_forest", **scenario)
+  assert model.calls == 2, "failed prediction was served from the cache"
+  assert result["predicted_price"] == 29000.0
+  
+  # The real prediction is cached
+  manager.predict("random_forest", **scenario)
+  assert model.calls == 2
+  print("✅ Failed prediction recomputed on the next call")
+
+
+def test_mmap_deployment_keeps_calibration():
+  """Interval calibration and price table load with only compiled artifacts deployed"""
+  source = ml_models.MODEL_PATH
+  if not (source / INTERVALS_FILE).exists() or not (source / "compiled").exists():
+    print("⚠️  No trained artifacts, skipping")
+    return
+  
+  # compiled/ plus the calibration files, without any .pkl model
+  deployed = Path(tempfile.mkdtemp())
+  try:
+    shutil.copytree(source / "compiled", deployed / "compiled")
+    for name in (INTERVALS_FILE, PRICE_TABLE_FILE):
+      if (source / name).exists():
+        shutil.copy(source / name, deployed / name)
+    
+    ml_models.MODEL_PATH, ml_models.COMPILED_MODEL_PATH = deployed, deployed / "compiled"
+    manager = ModelManager(artifact_format="mmap")
+    manager.load_models()
+  finally:
+    ml_models.MODEL_PATH, ml_models.COMPILED_MODEL_PATH = source, source / "compiled"
+    shutil.rmtree(deployed)
+  
+  model_set = manager._model_set
+  assert set(model_set.residual_intervals) == set(model_set.models), "intervals dropped in mmap mode"
+  if (source / PRICE_TABLE_FILE).exists():
+    assert set(model_set.price_table) == set(model_set.models), "price table dropped in mmap mode"
+  print(f"✅ mmap deployment kept calibration for {', '.join(model_set.residual_intervals)}")
+
+
 if __name__ == "__main__":
   test_predictions()
+  test_failed_prediction_not_cached()
+  test_mmap_deployment_keeps_calibration()
@@ -48,6 +48,11 @@ def test_predict():
     print(f"✅ Prediction successful!")
     print(f"   Predicted Price: ₹{data['predicted_price']:.2f}")
     print(f"   Confidence: {data['confidence']}%")
+    if data.get("lower_bound") is not None:
+      print(
+        f"   Interval: ₹{data['lower_bound']:.2f} - ₹{data['upper_bound']:.2f}"
+        f" ({data['interval_coverage']:.0%}, {data['interval_method']})"
+      )
     print(f"   Model: {data['model_used']}")
     print(f"   Accuracy: {data['accuracy']}%")
   else:
@@ -55,6 +60,93 @@ def test_predict():
     print(f"   Error: {response.text}")
 
 
+def test_predict_batch():
+  """Test batch prediction endpoint"""
+  print("\n🔍 Testing /api/predict/batch endpoint...")
+  
+  payload = {
+    "scenarios": [
+      {"year": 2025, "month": 3, "city": "Bangalore", "variety": "Guntur", "model": "random_forest"},
+      {"year": 2025, "month": 7, "city": "Delhi", "variety": "Byadgi", "model": "xgboost"},
+      {"year": 2025, "month": 12, "city": "Mumbai", "variety": "Teja", "model": "unknown_model"}
+    ]
+  }
+  
+  response = requests.post(
+    f"{BASE_URL}/api/predict/batch",
+    json=payload
+  )
+  
+  assert response.status_code == 200, response.text
+  data = response.json()
+  assert data["total"] == 3
+  assert [item["index"] for item in data["results"]] == [0, 1, 2]
+  assert data["results"][2]["error"] is not None
+  for item in data["results"][:2]:
+    assert 20000 <= item["prediction"]["predicted_price"] <= 30000
+  
+  print(f"✅ Batch prediction successful!")
+  print(f"   Succeeded: {data['succeeded']}, Failed: {data['failed']}")
+
+
+def test_predict_stream():
+  """Test streaming bulk prediction endpoint"""
+  print("\n🔍 Testing /api/predict/stream endpoint...")
+  
+  upload = (
+    "city,variety,month,arrivals,rainfall,temperature\n"
+    "Bangalore,Guntur,3,2100,45.2,28.5\n"
+    "Delhi,Teja,7,1800,120.0,31.0\n"
+    "Mumbai,Byadgi,13,2000,50.0,28.0\n"
+  )
+  
+  response = requests.post(
+    f"{BASE_URL}/api/predict/stream?model=random_forest",
+    data=upload,
+    headers={"Content-Type": "text/csv"},
+    stream=True
+  )
+  
+  if response.status_code == 200:
+    rows = [json.loads(line) for line in response.iter_lines() if line]
+    failed = sum(1 for row in rows if "error" in row)
+    print(f"✅ Streaming prediction successful!")
+    print(f"   Rows: {len(rows)} ({failed} rejected)")
+  else:
+    print(f"❌ Streaming prediction failed: {response.status_code}")
+    print(f"   Error: {response.text}")
+
+
+def test_forecast():
+  """Test forecast grid endpoint"""
+  print("\n🔍 Testing /api/forecast endpoint...")
+  
+  payload = {
+    "cities": ["Bangalore", "Delhi", "Mumbai"],
+    "varieties": ["Guntur", "Byadgi"],
+    "start_year": 2025,
+    "start_month": 11,
+    "horizon": 14,
+    "model": "random_forest"
+  }
+  
+  response = requests.post(
+    f"{BASE_URL}/api/forecast",
+    json=payload
+  )
+  
+  assert response.status_code == 200, response.text
+  data = response.json()
+  assert data["periods"][0] == "2025-11"
+  assert data["periods"][-1] == "2026-12"
+  assert len(data["prices"]) == 3
+  assert len(data["prices"][0]) == 2
+  assert len(data["prices"][0][0]) == 14
+  
+  print(f"✅ Forecast successful!")
+  print(f"   Grid points: {3 * 2 * len(data['periods'])}")
+
+
 def test_insights():
   """Test insights endpoint"""
   print("\n🔍 Testing /api/insights endpoint...")
@@ -73,10 +165,37 @@ def test_insights():
     print(f"✅ Insights retrieved!")
     print(f"   Insights: {len(data['insights'])}")
     print(f"   Risk Alerts: {len(data['risk_alerts'])}")
+    if data.get("statistics"):
+      print(f"   Seasonal Index: {data['statistics']['seasonal_index']}")
   else:
     print(f"❌ Insights failed: {response.status_code}")
 
 
+def test_history():
+  """Test historical price query endpoint"""
+  print("\n🔍 Testing /api/history endpoint...")
+  
+  response = requests.get(
+    f"{BASE_URL}/api/history",
+    params={
+      "city": "Bangalore",
+      "variety": "Guntur",
+      "start_year": 2015,
+      "end_year": 2020,
+      "columns": "year,month,price",
+      "limit": 10
+    }
+  )
+  
+  if response.status_code == 200:
+    data = response.json()
+    print(f"✅ History retrieved!")
+    print(f"   Matching rows: {data['total']}")
+    print(f"   Page rows: {len(data['rows'])}")
+  else:
+    print(f"❌ History failed: {response.status_code}")
+
+
 def test_models():
   """Test models endpoint"""
   print("\n🔍 Testing /api/models endpoint...")
@@ -93,6 +212,20 @@ def test_models():
     print(f"❌ Models failed: {response.status_code}")
 
 
+def test_metrics():
+  """Test Prometheus metrics endpoint"""
+  print("\n🔍 Testing /metrics endpoint...")
+  
+  response = requests.get(f"{BASE_URL}/metrics")
+  
+  if response.status_code == 200:
+    lines = [line for line in response.text.splitlines() if not line.startswith("#")]
+    print(f"✅ Metrics retrieved!")
+    print(f"   Samples: {len(lines)}")
+  else:
+    print(f"❌ Metrics failed: {response.status_code}")
+
+
 def main():
   """Run all tests"""
   print("=" * 60)
@@ -105,8 +238,13 @@ def main():
   try:
     test_health()
     test_predict()
+    test_predict_batch()
+    test_predict_stream()
+    test_forecast()
     test_insights()
+    test_history()
     test_models()
+    test_metrics()
     
     print("\n" + "=" * 60)
     print("✨ All tests completed!")